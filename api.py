@@ -0,0 +1,406 @@
+"""Headless JSON/HTTP API over the Operations classes, for integrations.
+
+Every entity in ENTITY_OPERATIONS gets the same routes:
+
+    GET    /<entity>?limit=&cursor=&order_by=&desc=&count=&columns=
+                                                             keyset page (+ filters)
+    GET    /<entity>/stream?columns=                         every row, as NDJSON
+    GET    /<entity>/<id>                                    one row (table columns only)
+    POST   /<entity>                                         create
+    POST   /<entity>/bulk                                    bulk_create (JSON list)
+    PUT    /<entity>/<id>                                    update
+    DELETE /<entity>/<id>                                    delete
+    POST   /grant/full                                       create_full
+    GET    /health, /metrics
+
+Composite keys are comma separated (/grant_topic/12,3). Filter arguments of
+GrantOperations.filter and MilestoneOperations.filter are query parameters,
+lists comma separated (/grant?region_ids=1,2&min_amount=50000). columns
+narrows pages and streams to a comma separated projection of the entity's
+readable_columns (/grant?columns=grant_id,amount). Reads carry
+an ETag derived from the change sequences of the tables they depend on, so
+a matching If-None-Match is answered with 304 before any data is read.
+
+The API is a plain WSGI application. The built-in server pre-forks worker
+processes that share one listening socket, each with its own threads and
+connection pool; any WSGI server works too:
+
+    python api.py --port 8000 --workers 4 --threads 16
+    gunicorn -w 4 -k gthread --threads 16 -b :8000 api:application
+"""
+import argparse
+import base64
+import hashlib
+import inspect
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import typing
+from contextlib import closing
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer
+
+from db_operations import DatabaseConnection, ENTITY_OPERATIONS, configured_database
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+MAX_BODY_BYTES = 64 * 1024 * 1024
+STREAM_CHUNK_SIZE = 5000
+# Bump when the JSON shape changes, so clients' cached ETags stop matching
+RESPONSE_VERSION = 1
+PAGE_PARAMETERS = ('cursor', 'limit', 'order_by', 'desc', 'count', 'columns')
+
+class ApiError(Exception):
+    """Turned into a JSON error response with the given HTTP status"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+STATUS_TEXT = {200: 'OK', 201: 'Created', 304: 'Not Modified', 400: 'Bad Request',
+               404: 'Not Found', 405: 'Method Not Allowed', 413: 'Payload Too Large',
+               500: 'Internal Server Error'}
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, bytes):
+        return value.decode('utf-8', 'replace')
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+def to_json(value) -> bytes:
+    return json.dumps(value, default=_json_default, separators=(',', ':')).encode('utf-8')
+
+def encode_cursor(key: Optional[tuple]) -> Optional[str]:
+    """Opaque page cursor for a read_page next key"""
+    if key is None:
+        return None
+    return base64.urlsafe_b64encode(to_json(list(key))).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        return tuple(json.loads(base64.urlsafe_b64decode(padded)))
+    except (ValueError, TypeError):
+        raise ApiError(400, "Malformed cursor")
+
+def frame_json(frame) -> bytes:
+    """JSON list of row objects, serialised column by column without a per-row dict"""
+    # DATE columns arrive as datetime64; write them as plain dates, like read_by_id's
+    dates = {name: frame[name].dt.strftime('%Y-%m-%d') for name in frame.columns
+             if str(frame[name].dtype).startswith('datetime64')
+             and (frame[name].dropna().dt.normalize() == frame[name].dropna()).all()}
+    if dates:
+        frame = frame.assign(**dates)
+    return frame.to_json(orient='records', date_format='iso', date_unit='s').encode('utf-8')
+
+def _convert(name: str, annotation, raw: str):
+    """A query parameter as the type of the filter() argument it fills"""
+    try:
+        if typing.get_origin(annotation) in (list, List):
+            return [int(item) for item in raw.split(',') if item]
+        if annotation is int:
+            return int(raw)
+        if annotation is float:
+            return float(raw)
+        return raw
+    except ValueError:
+        raise ApiError(400, f"Invalid value for {name}: {raw!r}")
+
+class Api:
+    """WSGI application serving ENTITY_OPERATIONS over one DatabaseConnection"""
+
+    def __init__(self, db: DatabaseConnection):
+        self.db = db
+        self.ops = {name: cls(db) for name, cls in ENTITY_OPERATIONS.items()}
+
+    def __call__(self, environ, start_response):
+        try:
+            status, headers, body = self.dispatch(environ)
+        except ApiError as e:
+            status, headers, body = e.status, [], to_json({'ok': False, 'error': str(e)})
+        except Exception as e:
+            environ['wsgi.errors'].write(f"api: unhandled {type(e).__name__}: {e}\n")
+            status, headers, body = 500, [], to_json({'ok': False, 'error': "Internal error"})
+        headers = dict(headers)
+        headers.setdefault('Content-Type', 'application/json')
+        if isinstance(body, bytes):
+            headers['Content-Length'] = str(len(body))
+            body = [body]
+        start_response(f"{status} {STATUS_TEXT.get(status, '')}", list(headers.items()))
+        return body
+
+    def dispatch(self, environ) -> Tuple[int, list, object]:
+        method = environ['REQUEST_METHOD']
+        parts = [part for part in environ.get('PATH_INFO', '').split('/') if part]
+        if parts == ['health']:
+            return 200, [], to_json({'ok': True})
+        if parts == ['metrics']:
+            return 200, [('Content-Type', 'text/plain; version=0.0.4')], self.db.metrics_text().encode()
+        if not parts or parts[0] not in self.ops or len(parts) > 2:
+            raise ApiError(404, "Not found")
+        entity = self.ops[parts[0]]
+        action = parts[1] if len(parts) == 2 else None
+
+        if method == 'GET':
+            query = {name: values[-1] for name, values in
+                     parse_qs(environ.get('QUERY_STRING', ''), keep_blank_values=True).items()}
+            source = entity
+            if action is None:
+                # Checked before the ETag, so a bad request is never answered with a 304
+                limit = self.page_limit(query)
+                source = self.source(entity, query)
+            etag = self.etag(source, environ)
+            if etag is not None and etag in [t.strip() for t in environ.get('HTTP_IF_NONE_MATCH', '').split(',')]:
+                return 304, [('ETag', etag)], b''
+            headers = [('ETag', etag), ('Cache-Control', 'no-cache')] if etag else []
+            if action is None:
+                return 200, headers, self.read_page(entity, source, query, limit)
+            if action == 'stream':
+                return 200, headers + [('Content-Type', 'application/x-ndjson')], self.stream(entity, query)
+            return 200, headers, self.read_one(entity, action)
+        if method == 'POST' and action is None:
+            return self.write(201, entity.create, {}, self.body(environ))
+        if method == 'POST' and action == 'bulk':
+            rows = self.body(environ)
+            if not isinstance(rows, list):
+                raise ApiError(400, "Expected a JSON list of rows")
+            return 200, [], to_json(dict(entity.bulk_create(rows), ok=True))
+        if method == 'POST' and action == 'full' and hasattr(entity, 'create_full'):
+            return self.write(201, entity.create_full, {}, self.body(environ), returns_id=True)
+        if method == 'PUT' and action is not None and hasattr(entity, 'update'):
+            return self.write(200, entity.update, self.key_arguments(entity, entity.update, action),
+                              self.body(environ))
+        if method == 'DELETE' and action is not None and hasattr(entity, 'delete'):
+            return self.write(200, entity.delete, self.key_arguments(entity, entity.delete, action), {})
+        raise ApiError(405, f"{method} is not supported here")
+
+    def etag(self, source, environ) -> Optional[str]:
+        """Validator for a read: changes whenever a table the response depends on changes"""
+        # source is the entity or its FilteredQuery, whose tables include those the filters read
+        token = source.change_token()
+        if token is None:
+            return None
+        source = f"{RESPONSE_VERSION}|{environ.get('PATH_INFO')}?{environ.get('QUERY_STRING', '')}|{token}"
+        return '"' + hashlib.sha1(source.encode('utf-8')).hexdigest()[:24] + '"'
+
+    def source(self, entity, query: Dict[str, str]):
+        """The entity, or its FilteredQuery when the query string holds filters"""
+        filters = {name: value for name, value in query.items() if name not in PAGE_PARAMETERS}
+        if not filters:
+            return entity
+        if not hasattr(entity, 'filter'):
+            raise ApiError(400, f"{entity.table} does not support filters")
+        parameters = inspect.signature(entity.filter).parameters
+        unknown = sorted(set(filters) - set(parameters))
+        if unknown:
+            raise ApiError(400, f"Unknown filters: {', '.join(unknown)}")
+        # db_operations uses postponed annotations, so resolve them rather than read strings
+        hints = typing.get_type_hints(entity.filter)
+        return entity.filter(**{name: _convert(name, hints.get(name), value)
+                                for name, value in filters.items()})
+
+    def page_limit(self, query: Dict[str, str]) -> int:
+        """The limit parameter, capped at MAX_PAGE_SIZE; 400 unless it is an integer of at least 1"""
+        try:
+            limit = int(query.get('limit', DEFAULT_PAGE_SIZE))
+        except ValueError:
+            raise ApiError(400, "limit must be an integer")
+        if limit < 1:
+            raise ApiError(400, "limit must be at least 1")
+        return min(limit, MAX_PAGE_SIZE)
+
+    def read_page(self, entity, source, query: Dict[str, str], limit: int) -> bytes:
+        after_key = decode_cursor(query['cursor']) if query.get('cursor') else None
+        order_by = query.get('order_by') or None
+        descending = query.get('desc', '') in ('1', 'true')
+        columns = self.columns(query)
+        try:
+            if source is entity:
+                frame, next_key = entity.read_page(after_key, limit, order_by, descending,
+                                                   columns=columns)
+            else:
+                frame, next_key = source.order_by(order_by, descending).read_page(after_key, limit,
+                                                                                  columns)
+        except ValueError as e:
+            raise ApiError(400, str(e))
+        rows = frame_json(frame)
+        body = b'{"rows":' + rows + b',"next":' + to_json(encode_cursor(next_key))
+        if query.get('count', '') in ('1', 'true'):
+            body += b',"total":' + to_json(source.count())
+        return body + b'}'
+
+    def read_one(self, entity, key: str) -> bytes:
+        row = entity.read_by_id(*self.parse_key(entity, key))
+        if row is None:
+            raise ApiError(404, f"No {entity.table} row with key {key}")
+        return to_json(row.as_dict())
+
+    def columns(self, query: Dict[str, str]) -> Optional[List[str]]:
+        if not query.get('columns'):
+            return None
+        return [name.strip() for name in query['columns'].split(',') if name.strip()]
+
+    def stream(self, entity, query: Dict[str, str]) -> Iterator[bytes]:
+        """NDJSON lines for every row, read chunk by chunk from a server-side cursor"""
+        # Checked before the generator starts, so a bad projection is still a 400
+        try:
+            sql = entity.select_query(self.columns(query))
+        except ValueError as e:
+            raise ApiError(400, str(e))
+        return self._stream_rows(sql)
+
+    def _stream_rows(self, sql: str) -> Iterator[bytes]:
+        names = None
+        with closing(self.db.stream_query(sql, chunk_size=STREAM_CHUNK_SIZE)) as chunks:
+            for description, rows in chunks:
+                if names is None:
+                    names = [column[0] for column in description]
+                yield b''.join(to_json(dict(zip(names, row))) + b'\n' for row in rows)
+
+    def parse_key(self, entity, raw: str) -> list:
+        values = raw.split(',')
+        if len(values) != len(entity.key_columns):
+            raise ApiError(400, f"Key must have {len(entity.key_columns)} values: "
+                                f"{', '.join(entity.key_columns)}")
+        try:
+            return [int(value) for value in values]
+        except ValueError:
+            raise ApiError(400, f"Invalid key {raw!r}")
+
+    def key_arguments(self, entity, method, raw: str) -> Dict:
+        """The key values as keyword arguments, named as method's leading parameters"""
+        names = list(inspect.signature(method).parameters)[:len(entity.key_columns)]
+        return dict(zip(names, self.parse_key(entity, raw)))
+
+    def body(self, environ):
+        try:
+            length = int(environ.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            raise ApiError(400, "Invalid Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise ApiError(413, f"Body larger than {MAX_BODY_BYTES} bytes")
+        try:
+            return json.loads(environ['wsgi.input'].read(length) or b'{}')
+        except ValueError as e:
+            raise ApiError(400, f"Invalid JSON: {e}")
+
+    def write(self, status: int, method, key: Dict, fields, returns_id: bool = False):
+        """Call an Operations write with the key and JSON fields as arguments"""
+        if not isinstance(fields, dict):
+            raise ApiError(400, "Expected a JSON object")
+        try:
+            inspect.signature(method).bind(**key, **fields)
+        except TypeError as e:
+            raise ApiError(400, str(e))
+        success, result = method(**key, **fields)
+        if not success:
+            raise ApiError(400, result)
+        return status, [], to_json({'ok': True, 'id': result} if returns_id else {'ok': True, 'message': result})
+
+def create_db(pool_size: int = 8) -> DatabaseConnection:
+    db = configured_database(pool_min_size=1, pool_max_size=pool_size, cache_size=1024, cache_ttl=300)
+    success, msg = db.connect()
+    if not success:
+        raise RuntimeError(msg)
+    return db
+
+_application = None
+_application_lock = threading.Lock()
+
+def application(environ, start_response):
+    """WSGI entry point for external servers; each worker process opens its own pool on first use"""
+    global _application
+    if _application is None:
+        with _application_lock:
+            if _application is None:
+                _application = Api(create_db(int(os.environ.get('API_POOL_SIZE', 16))))
+    return _application(environ, start_response)
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass  # an access log line per request costs more than the request
+
+class ThreadingWSGIServer(socketserver.ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+def _serve(sock: socket.socket, app):
+    """Run a threaded WSGI server for app on an already listening socket"""
+    host, port = sock.getsockname()[:2]
+    server = ThreadingWSGIServer((host, port), _QuietHandler, bind_and_activate=False)
+    server.socket.close()
+    server.socket = sock
+    server.server_name, server.server_port = socket.getfqdn(host), port
+    server.setup_environ()
+    server.set_app(app)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+def serve(host: str = '0.0.0.0', port: int = 8000, workers: int = 1, threads: int = 16):
+    """Serve the API from workers pre-forked processes sharing one listening socket.
+    
+    Each worker handles a connection per thread, with up to threads pooled
+    database connections.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(1024)
+    if workers <= 1 or not hasattr(os, 'fork'):
+        _serve(sock, Api(create_db(threads)))
+        return
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            # Connections must be opened after the fork; pooled sockets cannot be shared
+            signal.signal(signal.SIGTERM, lambda *_: os._exit(0))
+            try:
+                _serve(sock, Api(create_db(threads)))
+            finally:
+                os._exit(1)
+        children.append(pid)
+    sock.close()
+    try:
+        for pid in children:
+            os.waitpid(pid, 0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve the Operations classes as a JSON API")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument('--threads', type=int, default=16,
+                        help="pooled database connections per worker")
+    args = parser.parse_args(argv)
+    try:
+        serve(args.host, args.port, args.workers, args.threads)
+    except (OSError, RuntimeError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,13 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime, date
+import asyncio
+import os
+import time
+import uuid
 from db_operations import *
+from async_operations import AsyncDatabase
+from export import FORMATS as EXPORT_FORMATS, export_entity
 
 # Page configuration
 st.set_page_config(
@@ -123,54 +129,431 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# Initialize database
+# Statements slower than this are logged with their EXPLAIN plan
+SLOW_QUERY_MS = 500
+
+# Initialize database; the backend, credentials and replicas come from config.py
 @st.cache_resource
 def init_db():
-    db = DatabaseConnection(host='localhost', user='root', password='root@123', database='grant_management')
-    db.create_database()
-    success, message = db.connect()
+    db = configured_database(pool_min_size=2, pool_max_size=10, cache_size=512, cache_ttl=300,
+                             slow_query_ms=SLOW_QUERY_MS)
+    # Creates the database/schema only when missing; otherwise a single version check
+    success, message = db.bootstrap('schema.sql')
     if not success:
         st.error(f"Database connection failed: {message}")
         return None
     return db
 
 def get_operations(db):
-    return {
-        'division': DivisionOperations(db),
-        'region': RegionOperations(db),
-        'topic': TopicOperations(db),
-        'grantee': GranteeOperations(db),
-        'grant': GrantOperations(db),
-        'beneficiary': GrantBeneficiaryOperations(db),
-        'milestone': MilestoneOperations(db),
-        'grantee_univs': GranteeUnivsOperations(db),
-        'grant_topic': GrantTopicOperations(db)
-    }
+    ops = {name: cls(db) for name, cls in ENTITY_OPERATIONS.items()}
+    ops['stats'] = StatsOperations(db)
+    ops['search'] = SearchOperations(db)
+    ops['rollup'] = RollupOperations(db)
+    ops['change'] = ChangeOperations(db)
+    return ops
+
+# Seconds before a concurrently loaded table gives up and its query is killed
+PAGE_LOAD_TIMEOUT = 15
+
+@st.cache_resource
+def init_async_db(_db):
+    return AsyncDatabase(_db, timeout=PAGE_LOAD_TIMEOUT)
+
+PAGE_SIZE = 50
+
+# Exports are written under Streamlit's static folder (enableStaticServing in
+# .streamlit/config.toml), so the browser downloads them streamed from disk
+EXPORT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'exports')
+EXPORT_URL = "app/static/exports"
+EXPORT_MAX_AGE = 3600
+
+def prepare_export(db, entity_name, fmt):
+    """(success, message, url) for entity_name exported to a new file under EXPORT_DIR.
+    
+    Exports older than EXPORT_MAX_AGE seconds are deleted first.
+    """
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    cutoff = time.time() - EXPORT_MAX_AGE
+    for name in os.listdir(EXPORT_DIR):
+        try:
+            path = os.path.join(EXPORT_DIR, name)
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass  # removed by another session meanwhile
+    name = f"{uuid.uuid4().hex}.{fmt}"
+    path = os.path.join(EXPORT_DIR, name)
+    success, msg = export_entity(db, entity_name, path, fmt)
+    if not success:
+        if os.path.exists(path):
+            os.remove(path)
+        return False, msg, None
+    return True, msg, f"{EXPORT_URL}/{name}"
+
+# Views that page through a table independently of each other
+CRUD_VIEW = "crud"
+TABLES_VIEW = "tables"
+
+def page_keys(view, entity_name, source=None):
+    """Stack of after_keys for one view of a table: the last entry is the key the current page starts after.
+    
+    The stack starts over on the first page whenever source's filters or sort
+    change, since keys taken under another sort have another shape.
+    """
+    state_key = f"page_keys_{view}_{entity_name}"
+    signature = source_signature(source)
+    state = st.session_state.get(state_key)
+    if state is None or state['signature'] != signature:
+        state = st.session_state[state_key] = {'signature': signature, 'keys': [None]}
+    return state['keys']
+
+def load_page(entity, after_key, page_size=PAGE_SIZE, columns=None):
+    """(total, page DataFrame, next_key) for one keyset page of an Operations object or FilteredQuery.
+    
+    columns narrows the page to those columns (None reads whole rows).
+    Safe to run off the script thread.
+    """
+    total = entity.count()
+    df, next_key = entity.read_page(after_key=after_key, limit=page_size, columns=columns)
+    return total, df, next_key
+
+# Session state key of this rerun's change sequences (see ChangeOperations.sequences)
+CHANGE_SEQUENCES_KEY = "change_sequences"
+
+def change_token(tables):
+    """Sequence numbers of tables as of this rerun, or None when change tracking is unavailable"""
+    sequences = st.session_state.get(CHANGE_SEQUENCES_KEY)
+    if sequences is None:
+        return None
+    return tuple(sequences.get(table, 0) for table in tables)
+
+def memo_by_changes(name, tables, load):
+    """load()'s result, kept in session state until one of tables changes"""
+    token = change_token(tables)
+    state_key = f"memo_{name}"
+    cached = st.session_state.get(state_key)
+    if token is not None and cached is not None and cached[0] == token:
+        return cached[1]
+    value = load()
+    st.session_state[state_key] = (token, value)
+    return value
+
+def source_signature(source):
+    """What a page's rows depend on besides the table data: the filters and sort of a FilteredQuery"""
+    if source is None:
+        return None
+    return source.conditions, source.order_column, source.descending
+
+def page_tables(entity, source=None):
+    """Tables a page's rows depend on: the entity's change_tables() plus those its filters read"""
+    return entity.change_tables() if source is None else source.change_tables()
+
+def mergeable(source):
+    """Whether a page of source can be patched with changes_since rather than re-read"""
+    return source is None or not (source.conditions or source.order_column)
+
+def merge_page(entity, source, cached, changes):
+    """The cached page with changes applied, or None when its rows have to be re-read.
+    
+    Only key-ordered, unfiltered pages are merged: a change to a key outside
+    the page's key range leaves the page as it is, an update to a row on the
+    page is merged in, and a row inserted into or deleted from the range
+    forces a reload.
+    """
+    if changes['expired'] or not mergeable(source):
+        return None
+    total, df, next_key = cached['page']
+    if df.empty:
+        return None
+    keys = list(entity.key_columns)
+    on_page = set(df[keys].itertuples(index=False, name=None))
+    after_key = cached['after_key']
+    last_key = max(on_page)
+    
+    def in_range(key):
+        return ((after_key is None or key > tuple(after_key))
+                and (next_key is None or key <= last_key))
+    
+    changed = changes['changed']
+    changed_keys = set(changed[keys].itertuples(index=False, name=None)) if not changed.empty else set()
+    if any(in_range(key) for key in changes['deleted']) or any(
+            in_range(key) and key not in on_page for key in changed_keys):
+        return None
+    if changed_keys - on_page or changes['deleted']:
+        # Rows elsewhere in the table came or went
+        total = (source or entity).count()
+    if changed_keys & on_page:
+        mask = pd.MultiIndex.from_frame(changed[keys]).isin(list(on_page))
+        df = entity.merge_changes(df, {'changed': changed[mask], 'deleted': []})
+    return total, df, next_key
+
+def refresh_page(entity, cached, after_key, token, source=None, page_size=PAGE_SIZE, columns=None):
+    """Page state for one table: the cached state when nothing it shows has changed, else merged or reloaded.
+    
+    cached is the state returned last time (or None); token is the current
+    change token of page_tables(entity, source); columns is the projection to show (None for whole
+    rows). Safe to run off the script thread.
+    """
+    signature = source_signature(source)
+    if (cached is not None and token is not None and cached['token'] is not None
+            and cached['after_key'] == after_key and cached['signature'] == signature
+            and cached.get('columns') == columns):
+        if cached['token'] == token:
+            return cached
+        # A filtered page's token also covers the tables its filters read, which
+        # changes_since does not take; such pages are re-read instead
+        if mergeable(source):
+            changes = entity.changes_since(cached['token'], columns)
+            page = merge_page(entity, source, cached, changes)
+            if page is not None:
+                return dict(cached, token=changes['token'], page=page)
+    page = load_page(source or entity, after_key, page_size, columns)
+    return {'after_key': after_key, 'signature': signature, 'token': token, 'page': page,
+            'columns': columns}
+
+def page_cache_key(view, entity_name):
+    return f"page_cache_{view}_{entity_name}"
+
+RERUN_MEMO_KEY = "rerun_memo"
+
+def memo_per_rerun(name, load):
+    """load()'s result, computed at most once per rerun; main() empties the memo at the top of each rerun"""
+    memo = st.session_state.setdefault(RERUN_MEMO_KEY, {})
+    if name not in memo:
+        memo[name] = load()
+    return memo[name]
+
+def entity_labels(ops, entity_name, limit=None):
+    """{id: label} for a picker or filter, fetched once per rerun however many widgets use it"""
+    return memo_per_rerun(('labels', entity_name, limit), lambda: ops[entity_name].labels(limit=limit))
+
+def plain_value(value):
+    """A DataFrame cell as the Python value read_by_id would have returned"""
+    if pd.isna(value):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.date() if value == value.normalize() else value.to_pydatetime()
+    return value.item() if hasattr(value, 'item') else value
+
+def loaded_record(ops, entity_name, record_id):
+    """Row record_id as a dict, taken from the View All page already loaded when that page is current"""
+    entity = ops[entity_name]
+    state = st.session_state.get(page_cache_key(CRUD_VIEW, entity_name))
+    token = change_token(entity.change_tables())
+    # A projected page holds only some of the columns the forms need
+    if (state is not None and token is not None and state['token'] == token
+            and state.get('columns') is None):
+        _, df, _ = state['page']
+        match = df[df[entity.key_columns[0]] == record_id]
+        if not match.empty:
+            return {column: plain_value(value) for column, value in match.iloc[0].items()}
+    return memo_per_rerun(('record', entity_name, record_id), lambda: entity.read_by_id(record_id) or {})
+
+def lazy_tabs(labels, key):
+    """Tab strip whose caller renders only the selected tab; st.tabs runs every tab's body on each rerun"""
+    return st.radio("Section", labels, key=key, horizontal=True, label_visibility="collapsed")
+
+def show_paged_table(entity_name, ops, empty_message, page_size=PAGE_SIZE, page=None, source=None,
+                     view=CRUD_VIEW):
+    """Render one keyset-paginated page of a table with next/prev navigation.
+    
+    page is an already loaded load_page() result; when omitted it is taken
+    from the session's cached page, refreshed from source (a FilteredQuery)
+    or the whole table as far as the data changed. view names the paging
+    position (and cached page) this table keeps apart from its other views.
+    """
+    keys = page_keys(view, entity_name, source)
+    if page is None:
+        entity = ops[entity_name]
+        state = refresh_page(entity, st.session_state.get(page_cache_key(view, entity_name)), keys[-1],
+                             change_token(page_tables(entity, source)), source, page_size)
+        st.session_state[page_cache_key(view, entity_name)] = state
+        page = state['page']
+    total, df, next_key = page
+    if df.empty:
+        st.info(empty_message)
+        return
+    
+    start = (len(keys) - 1) * page_size
+    st.caption(f"{total} records · showing {start + 1}–{start + len(df)}")
+    st.dataframe(df, use_container_width=True, hide_index=True)
+    
+    col1, col2, _ = st.columns([1, 1, 6])
+    with col1:
+        if st.button("← Prev", key=f"prev_{view}_{entity_name}", disabled=len(keys) == 1):
+            keys.pop()
+            st.rerun()
+    with col2:
+        if st.button("Next →", key=f"next_{view}_{entity_name}", disabled=next_key is None):
+            keys.append(next_key)
+            st.rerun()
+
+def sort_controls(entity_name, labels):
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        order_by = st.selectbox("Sort by", [None] + list(labels), key=f"sort_{entity_name}",
+                                format_func=lambda c: "ID" if c is None else labels[c])
+    with col2:
+        st.write("")
+        descending = st.checkbox("Descending", key=f"desc_{entity_name}")
+    return order_by, descending
+
+def grant_filter_bar(ops, entity_name):
+    with st.expander("Filters"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            regions = entity_labels(ops, 'region')
+            region_ids = st.multiselect("Region", list(regions), format_func=regions.get,
+                                        key="filter_grant_region")
+        with col2:
+            divisions = entity_labels(ops, 'division')
+            division_ids = st.multiselect("Division", list(divisions), format_func=divisions.get,
+                                          key="filter_grant_division")
+        with col3:
+            topics = entity_labels(ops, 'topic')
+            topic_ids = st.multiselect("Topic", list(topics), format_func=topics.get,
+                                       key="filter_grant_topic")
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            start_from = st.date_input("Starts from", value=None, key="filter_grant_start_from")
+        with col2:
+            start_to = st.date_input("Starts by", value=None, key="filter_grant_start_to")
+        with col3:
+            close_from = st.date_input("Closes from", value=None, key="filter_grant_close_from")
+        with col4:
+            close_to = st.date_input("Closes by", value=None, key="filter_grant_close_to")
+        col1, col2 = st.columns(2)
+        with col1:
+            min_amount = st.number_input("Min amount ($)", min_value=0.0, value=None, step=1000.0,
+                                         key="filter_grant_min_amount")
+        with col2:
+            max_amount = st.number_input("Max amount ($)", min_value=0.0, value=None, step=1000.0,
+                                         key="filter_grant_max_amount")
+        order_by, descending = sort_controls(entity_name, {
+            'date_awarded': "Date awarded", 'start_date': "Start date",
+            'close_date': "Close date", 'amount': "Amount"})
+    query = ops[entity_name].filter(region_ids, division_ids, topic_ids, start_from, start_to,
+                                    close_from, close_to, min_amount, max_amount)
+    return query.order_by(order_by, descending)
+
+def milestone_filter_bar(ops, entity_name):
+    with st.expander("Filters"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            regions = entity_labels(ops, 'region')
+            region_ids = st.multiselect("Grant region", list(regions), format_func=regions.get,
+                                        key="filter_milestone_region")
+        with col2:
+            divisions = entity_labels(ops, 'division')
+            division_ids = st.multiselect("Grant division", list(divisions), format_func=divisions.get,
+                                          key="filter_milestone_division")
+        with col3:
+            topics = entity_labels(ops, 'topic')
+            topic_ids = st.multiselect("Grant topic", list(topics), format_func=topics.get,
+                                       key="filter_milestone_topic")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            due_from = st.date_input("Due from", value=None, key="filter_milestone_due_from")
+        with col2:
+            due_to = st.date_input("Due by", value=None, key="filter_milestone_due_to")
+        with col3:
+            min_completion, max_completion = st.slider("Completion (%)", 0, 100, (0, 100),
+                                                       key="filter_milestone_completion")
+        order_by, descending = sort_controls(entity_name, {
+            'due_date': "Due date", 'completion': "Completion", 'grant_id': "Grant"})
+    # The full 0-100 range is no filter at all
+    min_completion = min_completion or None
+    max_completion = max_completion if max_completion < 100 else None
+    query = ops[entity_name].filter(None, region_ids, division_ids, topic_ids, due_from, due_to,
+                                    min_completion, max_completion)
+    return query.order_by(order_by, descending)
+
+SEARCH_LIMIT = 10
+AT_RISK_LIMIT = 500
+
+PICKER_THRESHOLD = 200
+PICKER_SEARCH_LIMIT = 50
+
+def show_performance_panel(db):
+    """Sidebar view of the hottest statements, including how often each ran this rerun"""
+    if not db.query_stats:
+        return
+    with st.sidebar.expander("Performance"):
+        this_rerun = db.query_stats.scope_counts()
+        rows = db.query_stats.snapshot()
+        st.caption(f"{sum(this_rerun.values())} statements this rerun, "
+                   f"{len(rows)} distinct statement/caller pairs since startup")
+        if rows:
+            st.dataframe(pd.DataFrame([{
+                'caller': row['caller'],
+                'rerun': this_rerun.get((row['fingerprint'], row['caller']), 0),
+                'calls': row['calls'],
+                'cached': row['cache_hits'],
+                'mean ms': round(row['mean_ms'], 1),
+                'p95 ms': round(row['p95_ms'], 1),
+                'rows': row['rows'],
+                'KB': round(row['bytes'] / 1024, 1),
+                'statement': row['fingerprint'],
+            } for row in rows[:25]]), hide_index=True, use_container_width=True)
+        pool = db.pool_stats()
+        if pool:
+            st.caption(f"Pool: {pool.get('in_use', 0)} in use / {pool.get('size', 0)} open, "
+                       f"max wait {pool.get('wait_max', 0) * 1000:.0f} ms")
+        for name, replica in db.replica_stats().items():
+            state = "down" if replica['down'] else (
+                f"{replica['lag']:.0f}s behind" if replica['lag'] >= 0 else "lag unknown")
+            st.caption(f"Replica {name}: {state}, {replica['latency_ms']:.0f} ms avg read")
+        if db.slow_queries and db.slow_queries.entries:
+            st.markdown(f"**Slow queries (> {db.slow_queries.threshold_ms:.0f} ms)**")
+            for entry in reversed(db.slow_queries.entries):
+                st.code(f"{entry['ms']:.0f} ms  {entry['caller']}\n{entry['query']}", language="sql")
+                if entry['plan']:
+                    st.dataframe(pd.DataFrame(entry['plan']), hide_index=True)
+        st.download_button("Prometheus metrics", db.metrics_text(), file_name="metrics.prom",
+                           mime="text/plain")
+        if st.button("Reset counters", key="perf_reset"):
+            db.query_stats.reset()
+            st.rerun()
+
+def record_picker(ops, entity_name, label, key, default=None):
+    """Selectbox over (id, label) pairs; switches to server-side search for large tables"""
+    entity = ops[entity_name]
+    choices = entity_labels(ops, entity_name, limit=PICKER_THRESHOLD + 1)
+    if len(choices) > PICKER_THRESHOLD:
+        term = st.text_input(f"Search {label.rstrip('*')}", key=f"{key}_search",
+                             placeholder="Type an ID or the start of a name")
+        choices = dict(entity.search_options(term, limit=PICKER_SEARCH_LIMIT))
+        if default is not None and default not in choices:
+            default_label = entity.label_for(default)
+            if default_label is not None:
+                choices = {default: default_label, **choices}
+    if not choices:
+        return None
+    ids = list(choices)
+    index = ids.index(default) if default in choices else 0
+    return st.selectbox(label, ids, index=index, key=key,
+                        format_func=lambda x: f"ID: {x} - {choices[x]}")
 
 def show_crud_operations(entity_name, ops, columns_config):
     """Generic CRUD interface"""
     st.markdown(f'<p class="sub-header">{columns_config["title"]}</p>', unsafe_allow_html=True)
     
-    tab1, tab2, tab3, tab4 = st.tabs(["View All", "Create", "Update", "Delete"])
+    # Only the selected tab runs, so only its queries are issued
+    tab = lazy_tabs(["View All", "Create", "Update", "Delete"], key=f"crud_tab_{entity_name}")
     
-    # VIEW ALL
-    with tab1:
-        df = ops[entity_name].read_all()
-        if not df.empty:
-            st.dataframe(df, use_container_width=True)
+    if tab == "View All":
+        filter_bar = columns_config.get("filter_bar")
+        if filter_bar:
+            query = filter_bar(ops, entity_name)
+            show_paged_table(entity_name, ops, f"No matching {entity_name} records found.",
+                             source=query)
         else:
-            st.info(f"No {entity_name} records found.")
-    
-    # CREATE
-    with tab2:
+            show_paged_table(entity_name, ops, f"No {entity_name} records found.")
+    elif tab == "Create":
         columns_config["create_form"](ops, entity_name)
-    
-    # UPDATE
-    with tab3:
+    elif tab == "Update":
         columns_config["update_form"](ops, entity_name)
-    
-    # DELETE
-    with tab4:
+    else:
         columns_config["delete_form"](ops, entity_name)
 
 # ==================== DIVISION ====================
@@ -185,11 +568,9 @@ def division_create_form(ops, entity_name):
                 if success: st.rerun()
 
 def division_update_form(ops, entity_name):
-    df = ops[entity_name].read_all()
-    if not df.empty:
-        div_id = st.selectbox("Select Division", df['division_id'].tolist(),
-                             format_func=lambda x: f"ID: {x} - {df[df['division_id']==x]['name'].values[0]}")
-        data = ops[entity_name].read_by_id(div_id)
+    div_id = record_picker(ops, entity_name, "Select Division", key=f"update_{entity_name}")
+    if div_id is not None:
+        data = loaded_record(ops, entity_name, div_id)
         with st.form("update_division"):
             name = st.text_input("Name*", value=data.get('name', ''))
             desc = st.text_area("Description", value=data.get('description', ''))
@@ -199,10 +580,8 @@ def division_update_form(ops, entity_name):
                 if success: st.rerun()
 
 def division_delete_form(ops, entity_name):
-    df = ops[entity_name].read_all()
-    if not df.empty:
-        div_id = st.selectbox("Select to Delete", df['division_id'].tolist(),
-                             format_func=lambda x: f"ID: {x} - {df[df['division_id']==x]['name'].values[0]}")
+    div_id = record_picker(ops, entity_name, "Select to Delete", key=f"delete_{entity_name}")
+    if div_id is not None:
         if st.button("Delete", type="primary"):
             success, msg = ops[entity_name].delete(div_id)
             st.success("Deleted!" if success else msg)
@@ -219,11 +598,9 @@ def region_create_form(ops, entity_name):
                 if success: st.rerun()
 
 def region_update_form(ops, entity_name):
-    df = ops[entity_name].read_all()
-    if not df.empty:
-        reg_id = st.selectbox("Select Region", df['region_id'].tolist(),
-                             format_func=lambda x: f"ID: {x} - {df[df['region_id']==x]['name'].values[0]}")
-        data = ops[entity_name].read_by_id(reg_id)
+    reg_id = record_picker(ops, entity_name, "Select Region", key=f"update_{entity_name}")
+    if reg_id is not None:
+        data = loaded_record(ops, entity_name, reg_id)
         with st.form("update_region"):
             name = st.text_input("Name*", value=data.get('name', ''))
             if st.form_submit_button("Update"):
@@ -232,10 +609,8 @@ def region_update_form(ops, entity_name):
                 if success: st.rerun()
 
 def region_delete_form(ops, entity_name):
-    df = ops[entity_name].read_all()
-    if not df.empty:
-        reg_id = st.selectbox("Select to Delete", df['region_id'].tolist(),
-                             format_func=lambda x: f"ID: {x} - {df[df['region_id']==x]['name'].values[0]}")
+    reg_id = record_picker(ops, entity_name, "Select to Delete", key=f"delete_{entity_name}")
+    if reg_id is not None:
         if st.button("Delete", type="primary"):
             success, msg = ops[entity_name].delete(reg_id)
             st.success("Deleted!" if success else msg)
@@ -253,11 +628,9 @@ def topic_create_form(ops, entity_name):
                 if success: st.rerun()
 
 def topic_update_form(ops, entity_name):
-    df = ops[entity_name].read_all()
-    if not df.empty:
-        topic_id = st.selectbox("Select Topic", df['topic_id'].tolist(),
-                               format_func=lambda x: f"ID: {x} - {df[df['topic_id']==x]['name'].values[0]}")
-        data = ops[entity_name].read_by_id(topic_id)
+    topic_id = record_picker(ops, entity_name, "Select Topic", key=f"update_{entity_name}")
+    if topic_id is not None:
+        data = loaded_record(ops, entity_name, topic_id)
         with st.form("update_topic"):
             name = st.text_input("Name*", value=data.get('name', ''))
             category = st.text_input("Category", value=data.get('category', ''))
@@ -267,10 +640,8 @@ def topic_update_form(ops, entity_name):
                 if success: st.rerun()
 
 def topic_delete_form(ops, entity_name):
-    df = ops[entity_name].read_all()
-    if not df.empty:
-        topic_id = st.selectbox("Select to Delete", df['topic_id'].tolist(),
-                               format_func=lambda x: f"ID: {x} - {df[df['topic_id']==x]['name'].values[0]}")
+    topic_id = record_picker(ops, entity_name, "Select to Delete", key=f"delete_{entity_name}")
+    if topic_id is not None:
         if st.button("Delete", type="primary"):
             success, msg = ops[entity_name].delete(topic_id)
             st.success("Deleted!" if success else msg)
@@ -294,11 +665,9 @@ def grantee_create_form(ops, entity_name):
                 if success: st.rerun()
 
 def grantee_update_form(ops, entity_name):
-    df = ops[entity_name].read_all()
-    if not df.empty:
-        g_id = st.selectbox("Select Grantee", df['grantee_id'].tolist(),
-                           format_func=lambda x: f"ID: {x} - {df[df['grantee_id']==x]['name'].values[0]}")
-        data = ops[entity_name].read_by_id(g_id)
+    g_id = record_picker(ops, entity_name, "Select Grantee", key=f"update_{entity_name}")
+    if g_id is not None:
+        data = loaded_record(ops, entity_name, g_id)
         with st.form("update_grantee"):
             col1, col2 = st.columns(2)
             with col1:
@@ -316,10 +685,8 @@ def grantee_update_form(ops, entity_name):
                 if success: st.rerun()
 
 def grantee_delete_form(ops, entity_name):
-    df = ops[entity_name].read_all()
-    if not df.empty:
-        g_id = st.selectbox("Select to Delete", df['grantee_id'].tolist(),
-                           format_func=lambda x: f"ID: {x} - {df[df['grantee_id']==x]['name'].values[0]}")
+    g_id = record_picker(ops, entity_name, "Select to Delete", key=f"delete_{entity_name}")
+    if g_id is not None:
         if st.button("Delete", type="primary"):
             success, msg = ops[entity_name].delete(g_id)
             st.success("Deleted!" if success else msg)
@@ -327,8 +694,9 @@ def grantee_delete_form(ops, entity_name):
 
 # ==================== GRANT ====================
 def grant_create_form(ops, entity_name):
-    regions_df = ops['region'].read_all()
-    divisions_df = ops['division'].read_all()
+    regions = entity_labels(ops, 'region')
+    divisions = entity_labels(ops, 'division')
+    topics = entity_labels(ops, 'topic')
     
     with st.form("create_grant"):
         purpose = st.text_area("Purpose*")
@@ -342,24 +710,26 @@ def grant_create_form(ops, entity_name):
         with col3:
             amount = st.number_input("Amount*", min_value=0.0, format="%.2f")
         
-        region_id = st.selectbox("Region", regions_df['region_id'].tolist() if not regions_df.empty else [])
-        division_id = st.selectbox("Division", divisions_df['division_id'].tolist() if not divisions_df.empty else [])
+        region_id = st.selectbox("Region", list(regions), format_func=lambda x: regions[x])
+        division_id = st.selectbox("Division", list(divisions), format_func=lambda x: divisions[x])
+        topic_ids = st.multiselect("Topics", list(topics), format_func=lambda x: topics[x])
         
         if st.form_submit_button("Create"):
             if purpose:
-                success, msg = ops[entity_name].create(purpose, date_awarded, duration, close_date,
-                                                      start_date, amount, region_id, division_id)
+                grant = {'purpose': purpose, 'date_awarded': date_awarded, 'duration': duration,
+                         'close_date': close_date, 'start_date': start_date, 'amount': amount,
+                         'region_id': region_id, 'division_id': division_id}
+                success, msg = ops[entity_name].create_full(grant, topics=topic_ids)
                 st.success("Created!" if success else msg)
                 if success: st.rerun()
 
 def grant_update_form(ops, entity_name):
-    df = ops[entity_name].read_all()
-    if not df.empty:
-        g_id = st.selectbox("Select Grant", df['grant_id'].tolist(),
-                           format_func=lambda x: f"ID: {x} - {df[df['grant_id']==x]['purpose'].values[0][:30]}...")
-        data = ops[entity_name].read_by_id(g_id)
-        regions_df = ops['region'].read_all()
-        divisions_df = ops['division'].read_all()
+    g_id = record_picker(ops, entity_name, "Select Grant", key=f"update_{entity_name}")
+    if g_id is not None:
+        data = loaded_record(ops, entity_name, g_id)
+        regions = entity_labels(ops, 'region')
+        divisions = entity_labels(ops, 'division')
+        region_ids, division_ids = list(regions), list(divisions)
         
         with st.form("update_grant"):
             purpose = st.text_area("Purpose*", value=data.get('purpose', ''))
@@ -373,8 +743,10 @@ def grant_update_form(ops, entity_name):
             with col3:
                 amount = st.number_input("Amount", min_value=0.0, value=float(data.get('amount', 0)), format="%.2f")
             
-            region_id = st.selectbox("Region", regions_df['region_id'].tolist() if not regions_df.empty else [])
-            division_id = st.selectbox("Division", divisions_df['division_id'].tolist() if not divisions_df.empty else [])
+            region_id = st.selectbox("Region", region_ids, format_func=lambda x: regions[x],
+                                     index=region_ids.index(data['region_id']) if data.get('region_id') in regions else 0)
+            division_id = st.selectbox("Division", division_ids, format_func=lambda x: divisions[x],
+                                       index=division_ids.index(data['division_id']) if data.get('division_id') in divisions else 0)
             
             if st.form_submit_button("Update"):
                 success, msg = ops[entity_name].update(g_id, purpose, date_awarded, duration, close_date,
@@ -383,10 +755,8 @@ def grant_update_form(ops, entity_name):
                 if success: st.rerun()
 
 def grant_delete_form(ops, entity_name):
-    df = ops[entity_name].read_all()
-    if not df.empty:
-        g_id = st.selectbox("Select to Delete", df['grant_id'].tolist(),
-                           format_func=lambda x: f"ID: {x} - {df[df['grant_id']==x]['purpose'].values[0][:30]}...")
+    g_id = record_picker(ops, entity_name, "Select to Delete", key=f"delete_{entity_name}")
+    if g_id is not None:
         if st.button("Delete", type="primary"):
             success, msg = ops[entity_name].delete(g_id)
             st.success("Deleted!" if success else msg)
@@ -394,15 +764,10 @@ def grant_delete_form(ops, entity_name):
 
 # ==================== MILESTONE ====================
 def milestone_create_form(ops, entity_name):
-    grants_df = ops['grant'].read_all()
+    grant_id = record_picker(ops, 'grant', "Grant*", key="create_milestone_grant")
+    if grant_id is None:
+        st.warning("Create a grant first")
     with st.form("create_milestone"):
-        if not grants_df.empty:
-            grant_id = st.selectbox("Grant*", grants_df['grant_id'].tolist(),
-                                   format_func=lambda x: f"ID: {x} - {grants_df[grants_df['grant_id']==x]['purpose'].values[0][:30]}...")
-        else:
-            st.warning("Create a grant first")
-            grant_id = None
-        
         milestone_desc = st.text_area("Description*")
         col1, col2 = st.columns(2)
         with col1:
@@ -417,19 +782,15 @@ def milestone_create_form(ops, entity_name):
                 if success: st.rerun()
 
 def milestone_update_form(ops, entity_name):
-    df = ops[entity_name].read_all()
-    if not df.empty:
-        m_id = st.selectbox("Select Milestone", df['milestone_id'].tolist(),
-                           format_func=lambda x: f"ID: {x} - {df[df['milestone_id']==x]['milestone_desc'].values[0][:30]}...")
-        data = ops[entity_name].read_by_id(m_id)
-        grants_df = ops['grant'].read_all()
+    m_id = record_picker(ops, entity_name, "Select Milestone", key=f"update_{entity_name}")
+    if m_id is not None:
+        data = loaded_record(ops, entity_name, m_id)
+        grant_id = record_picker(ops, 'grant', "Grant*", key="update_milestone_grant",
+                                 default=data.get('grant_id'))
+        if grant_id is None:
+            grant_id = data.get('grant_id')
         
         with st.form("update_milestone"):
-            if not grants_df.empty:
-                grant_id = st.selectbox("Grant*", grants_df['grant_id'].tolist())
-            else:
-                grant_id = data.get('grant_id')
-            
             milestone_desc = st.text_area("Description*", value=data.get('milestone_desc', ''))
             col1, col2 = st.columns(2)
             with col1:
@@ -443,10 +804,8 @@ def milestone_update_form(ops, entity_name):
                 if success: st.rerun()
 
 def milestone_delete_form(ops, entity_name):
-    df = ops[entity_name].read_all()
-    if not df.empty:
-        m_id = st.selectbox("Select to Delete", df['milestone_id'].tolist(),
-                           format_func=lambda x: f"ID: {x} - {df[df['milestone_id']==x]['milestone_desc'].values[0][:30]}...")
+    m_id = record_picker(ops, entity_name, "Select to Delete", key=f"delete_{entity_name}")
+    if m_id is not None:
         if st.button("Delete", type="primary"):
             success, msg = ops[entity_name].delete(m_id)
             st.success("Deleted!" if success else msg)
@@ -454,15 +813,10 @@ def milestone_delete_form(ops, entity_name):
 
 # ==================== BENEFICIARY ====================
 def beneficiary_create_form(ops, entity_name):
-    grantees_df = ops['grantee'].read_all()
+    grantee_id = record_picker(ops, 'grantee', "Grantee*", key="create_beneficiary_grantee")
+    if grantee_id is None:
+        st.warning("Create a grantee first")
     with st.form("create_beneficiary"):
-        if not grantees_df.empty:
-            grantee_id = st.selectbox("Grantee*", grantees_df['grantee_id'].tolist(),
-                                     format_func=lambda x: f"ID: {x} - {grantees_df[grantees_df['grantee_id']==x]['name'].values[0]}")
-        else:
-            st.warning("Create a grantee first")
-            grantee_id = None
-        
         institution = st.text_input("Institution*")
         description = st.text_area("Description")
         county = st.text_input("County of Institute")
@@ -474,19 +828,15 @@ def beneficiary_create_form(ops, entity_name):
                 if success: st.rerun()
 
 def beneficiary_update_form(ops, entity_name):
-    df = ops[entity_name].read_all()
-    if not df.empty:
-        b_id = st.selectbox("Select Beneficiary", df['beneficiary_id'].tolist(),
-                           format_func=lambda x: f"ID: {x} - {df[df['beneficiary_id']==x]['institution'].values[0]}")
-        data = ops[entity_name].read_by_id(b_id)
-        grantees_df = ops['grantee'].read_all()
+    b_id = record_picker(ops, entity_name, "Select Beneficiary", key=f"update_{entity_name}")
+    if b_id is not None:
+        data = loaded_record(ops, entity_name, b_id)
+        grantee_id = record_picker(ops, 'grantee', "Grantee*", key="update_beneficiary_grantee",
+                                   default=data.get('grantee_id'))
+        if grantee_id is None:
+            grantee_id = data.get('grantee_id')
         
         with st.form("update_beneficiary"):
-            if not grantees_df.empty:
-                grantee_id = st.selectbox("Grantee*", grantees_df['grantee_id'].tolist())
-            else:
-                grantee_id = data.get('grantee_id')
-            
             institution = st.text_input("Institution*", value=data.get('institution', ''))
             description = st.text_area("Description", value=data.get('description', ''))
             county = st.text_input("County", value=data.get('county_of_institute', ''))
@@ -497,10 +847,8 @@ def beneficiary_update_form(ops, entity_name):
                 if success: st.rerun()
 
 def beneficiary_delete_form(ops, entity_name):
-    df = ops[entity_name].read_all()
-    if not df.empty:
-        b_id = st.selectbox("Select to Delete", df['beneficiary_id'].tolist(),
-                           format_func=lambda x: f"ID: {x} - {df[df['beneficiary_id']==x]['institution'].values[0]}")
+    b_id = record_picker(ops, entity_name, "Select to Delete", key=f"delete_{entity_name}")
+    if b_id is not None:
         if st.button("Delete", type="primary"):
             success, msg = ops[entity_name].delete(b_id)
             st.success("Deleted!" if success else msg)
@@ -515,11 +863,32 @@ def main():
         return
     
     ops = get_operations(db)
+    if db.query_stats:
+        db.query_stats.begin_scope()
+    st.session_state[RERUN_MEMO_KEY] = {}
+    # Keeps this browser session on the primary right after it writes
+    db.begin_session(st.session_state.setdefault('db_session', uuid.uuid4().hex))
+    # One probe per rerun tells which tables changed since the data this session holds
+    st.session_state[CHANGE_SEQUENCES_KEY] = ops['change'].sequences()
     
     # Initialize session state for page navigation
     if 'current_page' not in st.session_state:
         st.session_state.current_page = "Home"
     
+    # Global search (in sidebar); a hit opens the management page of its entity
+    search_text = st.sidebar.text_input("Search", key="global_search",
+                                        placeholder="Grants, milestones, beneficiaries, grantees")
+    if search_text.strip():
+        hits = ops['search'].search(search_text, limit=SEARCH_LIMIT)
+        if not hits:
+            st.sidebar.caption("No matches (words need at least 3 letters).")
+        for i, hit in enumerate(hits):
+            label = f"{hit['entity'].title()} #{hit['id']}: {hit['title']}"
+            if st.sidebar.button(label, key=f"search_hit_{i}", help=hit['detail'] or None,
+                                 use_container_width=True):
+                st.session_state.current_page = hit['entity']
+                st.rerun()
+    
     # Database Setup (in sidebar for admin)
     with st.sidebar.expander("Database Setup"):
         if st.button("Initialize Schema"):
@@ -528,6 +897,18 @@ def main():
                 st.success(msg)
             else:
                 st.error(msg)
+        if st.button("Apply Migrations"):
+            success, msg = db.migrate()
+            if success:
+                st.success(msg)
+            else:
+                st.error(msg)
+        if st.button("Rebuild Funding Rollups"):
+            success, msg = ops['rollup'].rebuild()
+            if success:
+                st.success(msg)
+            else:
+                st.error(msg)
     
     # Entity configurations
     configs = {
@@ -539,11 +920,11 @@ def main():
                  'create_form': topic_create_form, 'update_form': topic_update_form, 'delete_form': topic_delete_form},
         'grantee': {'title': 'Grantee Management',
                    'create_form': grantee_create_form, 'update_form': grantee_update_form, 'delete_form': grantee_delete_form},
-        'grant': {'title': 'Grant Management',
+        'grant': {'title': 'Grant Management', 'filter_bar': grant_filter_bar,
                  'create_form': grant_create_form, 'update_form': grant_update_form, 'delete_form': grant_delete_form},
         'beneficiary': {'title': 'Beneficiary Management',
                        'create_form': beneficiary_create_form, 'update_form': beneficiary_update_form, 'delete_form': beneficiary_delete_form},
-        'milestone': {'title': 'Milestone Management',
+        'milestone': {'title': 'Milestone Management', 'filter_bar': milestone_filter_bar,
                      'create_form': milestone_create_form, 'update_form': milestone_update_form, 'delete_form': milestone_delete_form},
     }
     
@@ -557,15 +938,42 @@ def main():
         st.markdown('<div class="stats-container">', unsafe_allow_html=True)
         st.markdown('<h2 style="margin-bottom: 1rem;">Dashboard Overview</h2>', unsafe_allow_html=True)
         
+        # Active grants depend on today's date as well as the data
+        stats = memo_by_changes(f"stats_{date.today()}",
+                                ('GRANT_TABLE', 'GRANTEE', 'TOTAL_MILESTONE', 'TOPIC'),
+                                ops['stats'].summary)
         col1, col2, col3, col4 = st.columns(4)
         with col1:
-            st.metric("Total Grants", len(ops['grant'].read_all()))
+            st.metric("Total Grants", stats.get('total_grants', 0))
         with col2:
-            st.metric("Total Grantees", len(ops['grantee'].read_all()))
+            st.metric("Total Grantees", stats.get('total_grantees', 0))
         with col3:
-            st.metric("Total Milestones", len(ops['milestone'].read_all()))
+            st.metric("Total Milestones", stats.get('total_milestones', 0))
         with col4:
-            st.metric("Total Topics", len(ops['topic'].read_all()))
+            st.metric("Total Topics", stats.get('total_topics', 0))
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Total Awarded", f"${float(stats.get('total_awarded', 0)):,.2f}")
+        with col2:
+            st.metric("Active Grants", stats.get('active_grants', 0))
+        with col3:
+            st.metric("Avg. Milestone Completion", f"{float(stats.get('avg_completion', 0)):.1f}%")
+        
+        # Funding breakdowns read from the maintained rollups: one row per group
+        region_tab, division_tab, topic_tab = st.tabs(["Funding by Region", "Funding by Division",
+                                                       "Funding by Topic"])
+        for tab, group in ((region_tab, 'region'), (division_tab, 'division'), (topic_tab, 'topic')):
+            with tab:
+                _, dimension, _ = ops['rollup'].GROUPS[group]
+                tables = ('GRANT_TABLE', dimension) + (('GRANT_TOPIC',) if group == 'topic' else ())
+                funding = memo_by_changes(f"funding_{group}", tables,
+                                          lambda g=group: ops['rollup'].by_group(g))
+                if funding.empty:
+                    st.info("No funded grants yet.")
+                else:
+                    st.bar_chart(funding.set_index('name')['total_amount'])
+                    st.dataframe(funding, use_container_width=True, hide_index=True)
         
         st.markdown('</div>', unsafe_allow_html=True)
         
@@ -623,6 +1031,9 @@ def main():
             if st.button("View All Tables", use_container_width=True, key="nav_view_all", type="primary"):
                 st.session_state.current_page = "view_all"
                 st.rerun()
+            if st.button("At Risk Grants", use_container_width=True, key="nav_at_risk"):
+                st.session_state.current_page = "at_risk"
+                st.rerun()
         
     elif page in ["division", "region", "topic", "grantee", "grant", "beneficiary", "milestone"]:
         # Show CRUD operations for selected entity
@@ -642,61 +1053,42 @@ def main():
             st.session_state.current_page = "Home"
             st.rerun()
         
-        # Relationship tabs
-        rel_tab1, rel_tab2 = st.tabs(["Grantee-Grant Links", "Grant-Topic Links"])
+        # Relationship tabs; only the selected one runs
+        relationship = lazy_tabs(["Grantee-Grant Links", "Grant-Topic Links"], key="relationship_tab")
         
-        with rel_tab1:
+        if relationship == "Grantee-Grant Links":
             st.markdown('<p class="sub-header">Grantee-Grant Relationships</p>', unsafe_allow_html=True)
-            tab1, tab2 = st.tabs(["View All", "Create Link"])
-            
-            with tab1:
-                df = ops['grantee_univs'].read_all()
-                if not df.empty:
-                    st.dataframe(df, use_container_width=True)
-                else:
-                    st.info("No relationships found.")
-        
-        with tab2:
-            grantees = ops['grantee'].read_all()
-            grants = ops['grant'].read_all()
+            tab = lazy_tabs(["View All", "Create Link"], key="crud_tab_grantee_univs")
             
-            with st.form("link_grantee_grant"):
-                if not grantees.empty and not grants.empty:
-                    grantee_id = st.selectbox("Grantee*", grantees['grantee_id'].tolist(),
-                                             format_func=lambda x: f"{grantees[grantees['grantee_id']==x]['name'].values[0]}")
-                    grant_id = st.selectbox("Grant*", grants['grant_id'].tolist(),
-                                           format_func=lambda x: f"ID: {x} - {grants[grants['grant_id']==x]['purpose'].values[0][:30]}")
-                    assoc_body = st.text_input("Associated Body")
-                    
-                    if st.form_submit_button("Create Link"):
-                        success, msg = ops['grantee_univs'].create(grantee_id, grant_id, assoc_body)
-                        st.success("Link created!" if success else msg)
-                        if success: st.rerun()
-                else:
-                    st.warning("Please create grantees and grants first")
+            if tab == "View All":
+                show_paged_table('grantee_univs', ops, "No relationships found.")
+            else:
+                grantee_id = record_picker(ops, 'grantee', "Grantee*", key="link_grantee_grant_grantee")
+                grant_id = record_picker(ops, 'grant', "Grant*", key="link_grantee_grant_grant")
+                
+                with st.form("link_grantee_grant"):
+                    if grantee_id is not None and grant_id is not None:
+                        assoc_body = st.text_input("Associated Body")
+                        
+                        if st.form_submit_button("Create Link"):
+                            success, msg = ops['grantee_univs'].create(grantee_id, grant_id, assoc_body)
+                            st.success("Link created!" if success else msg)
+                            if success: st.rerun()
+                    else:
+                        st.warning("Please create grantees and grants first")
         
-        with rel_tab2:
+        else:
             st.markdown('<p class="sub-header">Grant-Topic Relationships</p>', unsafe_allow_html=True)
-            tab1, tab2 = st.tabs(["View All", "Create Link"])
+            tab = lazy_tabs(["View All", "Create Link"], key="crud_tab_grant_topic")
             
-            with tab1:
-                df = ops['grant_topic'].read_all()
-                if not df.empty:
-                    st.dataframe(df, use_container_width=True)
-                else:
-                    st.info("No relationships found.")
-            
-            with tab2:
-                grants = ops['grant'].read_all()
-                topics = ops['topic'].read_all()
+            if tab == "View All":
+                show_paged_table('grant_topic', ops, "No relationships found.")
+            else:
+                grant_id = record_picker(ops, 'grant', "Grant*", key="link_grant_topic_grant")
+                topic_id = record_picker(ops, 'topic', "Topic*", key="link_grant_topic_topic")
                 
                 with st.form("link_grant_topic"):
-                    if not grants.empty and not topics.empty:
-                        grant_id = st.selectbox("Grant*", grants['grant_id'].tolist(),
-                                               format_func=lambda x: f"ID: {x} - {grants[grants['grant_id']==x]['purpose'].values[0][:30]}")
-                        topic_id = st.selectbox("Topic*", topics['topic_id'].tolist(),
-                                               format_func=lambda x: f"{topics[topics['topic_id']==x]['name'].values[0]}")
-                        
+                    if grant_id is not None and topic_id is not None:
                         if st.form_submit_button("Create Link"):
                             success, msg = ops['grant_topic'].create(grant_id, topic_id)
                             st.success("Link created!" if success else msg)
@@ -704,105 +1096,118 @@ def main():
                     else:
                         st.warning("Please create grants and topics first")
     
-    elif page == "view_all":
-        st.markdown('<h1 class="main-header">View All Tables</h1>', unsafe_allow_html=True)
-        st.markdown('<p style="text-align: center; color: #6e6e73; font-size: 1.1rem; margin-bottom: 2rem;">Read-only view of all database tables</p>', unsafe_allow_html=True)
+    elif page == "at_risk":
+        st.markdown('<h1 class="main-header">At Risk Grants</h1>', unsafe_allow_html=True)
         
         # Back button
         if st.button("← Back to Home", use_container_width=False):
             st.session_state.current_page = "Home"
             st.rerun()
         
-        # Display all tables with separators
-        st.markdown("---")
-        
-        # DIVISION
-        st.markdown('<p class="sub-header">Division</p>', unsafe_allow_html=True)
-        division_df = ops['division'].read_all()
-        if not division_df.empty:
-            st.dataframe(division_df, use_container_width=True, hide_index=True)
-        else:
-            st.info("No division records found.")
+        milestones = ops['milestone']
+        st.caption(f"A grant is at risk when the share of its duration already elapsed runs "
+                   f"{milestones.RISK_MARGIN} points ahead of its weighted milestone completion, "
+                   f"or when {milestones.RISK_SLIP_RATE:.0%} or more of the milestones due so far are overdue.")
         
-        st.markdown("---")
-        
-        # REGION
-        st.markdown('<p class="sub-header">Region</p>', unsafe_allow_html=True)
-        region_df = ops['region'].read_all()
-        if not region_df.empty:
-            st.dataframe(region_df, use_container_width=True, hide_index=True)
-        else:
-            st.info("No region records found.")
-        
-        st.markdown("---")
-        
-        # TOPIC
-        st.markdown('<p class="sub-header">Topic</p>', unsafe_allow_html=True)
-        topic_df = ops['topic'].read_all()
-        if not topic_df.empty:
-            st.dataframe(topic_df, use_container_width=True, hide_index=True)
-        else:
-            st.info("No topic records found.")
-        
-        st.markdown("---")
-        
-        # GRANTEE
-        st.markdown('<p class="sub-header">Grantee</p>', unsafe_allow_html=True)
-        grantee_df = ops['grantee'].read_all()
-        if not grantee_df.empty:
-            st.dataframe(grantee_df, use_container_width=True, hide_index=True)
-        else:
-            st.info("No grantee records found.")
-        
-        st.markdown("---")
-        
-        # GRANT
-        st.markdown('<p class="sub-header">Grant</p>', unsafe_allow_html=True)
-        grant_df = ops['grant'].read_all()
-        if not grant_df.empty:
-            st.dataframe(grant_df, use_container_width=True, hide_index=True)
-        else:
-            st.info("No grant records found.")
-        
-        st.markdown("---")
+        # One set-based query over every milestone; only the flagged grants are transferred
+        health = memo_by_changes(f"at_risk_{date.today()}", ('GRANT_TABLE', 'TOTAL_MILESTONE'),
+                                 lambda: milestones.grant_health(at_risk_only=True, limit=AT_RISK_LIMIT))
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Grants at risk", f"{len(health)}{'+' if len(health) == AT_RISK_LIMIT else ''}")
+        with col2:
+            st.metric("Overdue milestones", int(health['overdue'].sum()) if not health.empty else 0)
+        with col3:
+            st.metric("Avg. weighted completion",
+                      f"{health['weighted_completion'].mean():.1f}%" if not health.empty else "—")
         
-        # BENEFICIARY
-        st.markdown('<p class="sub-header">Beneficiary</p>', unsafe_allow_html=True)
-        beneficiary_df = ops['beneficiary'].read_all()
-        if not beneficiary_df.empty:
-            st.dataframe(beneficiary_df, use_container_width=True, hide_index=True)
+        if health.empty:
+            st.success("No grants are currently at risk.")
         else:
-            st.info("No beneficiary records found.")
+            st.dataframe(health.drop(columns=['at_risk']), use_container_width=True, hide_index=True,
+                         column_config={
+                             'weighted_completion': st.column_config.ProgressColumn(
+                                 "Weighted completion", format="%.0f%%", min_value=0, max_value=100),
+                             'elapsed': st.column_config.ProgressColumn(
+                                 "Schedule elapsed", format="%.0f%%", min_value=0, max_value=100),
+                             'slip_rate': st.column_config.NumberColumn("Slip rate", format="%.2f"),
+                             'risk_gap': st.column_config.NumberColumn("Risk gap", format="%.1f"),
+                         })
         
-        st.markdown("---")
-        
-        # MILESTONE
-        st.markdown('<p class="sub-header">Milestone</p>', unsafe_allow_html=True)
-        milestone_df = ops['milestone'].read_all()
-        if not milestone_df.empty:
-            st.dataframe(milestone_df, use_container_width=True, hide_index=True)
-        else:
-            st.info("No milestone records found.")
+        with st.expander("Overdue milestones"):
+            overdue = milestones.overdue(limit=AT_RISK_LIMIT)
+            if overdue.empty:
+                st.info("No overdue milestones.")
+            else:
+                st.dataframe(overdue, use_container_width=True, hide_index=True)
+    
+    elif page == "view_all":
+        st.markdown('<h1 class="main-header">View All Tables</h1>', unsafe_allow_html=True)
+        st.markdown('<p style="text-align: center; color: #6e6e73; font-size: 1.1rem; margin-bottom: 2rem;">Read-only view of all database tables</p>', unsafe_allow_html=True)
         
-        st.markdown("---")
+        # Back button
+        if st.button("← Back to Home", use_container_width=False):
+            st.session_state.current_page = "Home"
+            st.rerun()
         
-        # GRANTEE-GRANT RELATIONSHIPS
-        st.markdown('<p class="sub-header">Grantee-Grant Relationships</p>', unsafe_allow_html=True)
-        grantee_univs_df = ops['grantee_univs'].read_all()
-        if not grantee_univs_df.empty:
-            st.dataframe(grantee_univs_df, use_container_width=True, hide_index=True)
-        else:
-            st.info("No grantee-grant relationships found.")
+        # Streaming export of any table, including its display joins
+        with st.expander("Export"):
+            col1, col2, col3 = st.columns([2, 1, 1])
+            with col1:
+                export_entity_name = st.selectbox("Table", list(ENTITY_OPERATIONS), key="export_entity")
+            with col2:
+                export_format = st.selectbox("Format", list(EXPORT_FORMATS), key="export_format")
+            with col3:
+                st.write("")
+                prepare = st.button("Prepare export", key="export_prepare")
+            if prepare:
+                success, msg, url = prepare_export(db, export_entity_name, export_format)
+                if success:
+                    # A plain link: st.download_button would hold the whole file in memory
+                    file_name = f"{export_entity_name}.{export_format}"
+                    st.markdown(f'<a href="{url}" download="{file_name}">Download {file_name}</a>',
+                                unsafe_allow_html=True)
+                    st.caption(msg)
+                else:
+                    st.error(msg)
         
+        # Display all tables with separators
         st.markdown("---")
         
-        # GRANT-TOPIC RELATIONSHIPS
-        st.markdown('<p class="sub-header">Grant-Topic Relationships</p>', unsafe_allow_html=True)
-        grant_topic_df = ops['grant_topic'].read_all()
-        if not grant_topic_df.empty:
-            st.dataframe(grant_topic_df, use_container_width=True, hide_index=True)
-        else:
-            st.info("No grant-topic relationships found.")
+        tables = [
+            ('division', 'Division', "No division records found."),
+            ('region', 'Region', "No region records found."),
+            ('topic', 'Topic', "No topic records found."),
+            ('grantee', 'Grantee', "No grantee records found."),
+            ('grant', 'Grant', "No grant records found."),
+            ('beneficiary', 'Beneficiary', "No beneficiary records found."),
+            ('milestone', 'Milestone', "No milestone records found."),
+            ('grantee_univs', 'Grantee-Grant Relationships', "No grantee-grant relationships found."),
+            ('grant_topic', 'Grant-Topic Relationships', "No grant-topic relationships found."),
+        ]
+        # Refresh every table concurrently, so the page waits for the slowest query only;
+        # tables unchanged since this session last showed them cost no query at all
+        adb = init_async_db(db)
+        states = adb.run_sync(adb.gather(
+            *[adb.run(refresh_page, ops[entity],
+                      st.session_state.get(page_cache_key(TABLES_VIEW, entity)),
+                      page_keys(TABLES_VIEW, entity)[-1], change_token(ops[entity].change_tables()))
+              for entity, _, _ in tables],
+            return_exceptions=True))
+        for i, ((entity, title, empty_message), state) in enumerate(zip(tables, states)):
+            if i:
+                st.markdown("---")
+            st.markdown(f'<p class="sub-header">{title}</p>', unsafe_allow_html=True)
+            if isinstance(state, asyncio.TimeoutError):
+                st.error(f"Loading {title} timed out after {PAGE_LOAD_TIMEOUT}s.")
+            elif isinstance(state, BaseException):
+                st.error(f"Could not load {title}: {state}")
+            else:
+                st.session_state[page_cache_key(TABLES_VIEW, entity)] = state
+                show_paged_table(entity, ops, empty_message, page=state['page'], view=TABLES_VIEW)
+    
+    # Rendered last so the per-rerun counts include this page's queries
+    show_performance_panel(db)
 
 if __name__ == "__main__":
     main()
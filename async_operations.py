@@ -0,0 +1,123 @@
+"""Asyncio facade over the Operations classes for concurrent reads.
+
+Each call runs on a thread pool sized to the connection pool, so independent
+datasets load in parallel and a page takes as long as its slowest query rather
+than the sum of all of them:
+
+    adb = AsyncDatabase(db)
+    grants, milestones = adb.run_sync(adb.gather(
+        adb.grant.read_all(), adb.milestone.read_all(), timeout=10))
+
+A call that times out or is cancelled has its running statement aborted on
+the server with KILL QUERY, so it does not keep a pooled connection busy.
+"""
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from db_operations import DatabaseConnection, ENTITY_OPERATIONS, StatsOperations
+
+# Timeout argument meaning "the facade's default", so that None can mean no limit
+DEFAULT_TIMEOUT = object()
+
+class AsyncOperations:
+    """Awaitable proxy for one Operations object; every public method becomes a coroutine"""
+
+    def __init__(self, adb: 'AsyncDatabase', ops, timeout=DEFAULT_TIMEOUT):
+        self._adb = adb
+        self._ops = ops
+        self._timeout = timeout
+
+    def with_timeout(self, timeout: Optional[float]) -> 'AsyncOperations':
+        """Same proxy with a different per-call timeout in seconds (None for no limit)"""
+        return AsyncOperations(self._adb, self._ops, timeout)
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._ops, name)
+        if name.startswith('_') or not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def call(*args, **kwargs):
+            return await self._adb.run(attr, *args, timeout=self._timeout, **kwargs)
+        return call
+
+class AsyncDatabase:
+    """Runs Operations methods concurrently on pooled connections"""
+
+    def __init__(self, db: DatabaseConnection, max_workers: Optional[int] = None,
+                 timeout: Optional[float] = 30.0):
+        self.db = db
+        self.timeout = timeout
+        # More workers than pooled connections would only queue inside the pool
+        self.max_workers = max_workers or db.pool_max_size
+        self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix='db-worker')
+        self._ops: Dict[str, AsyncOperations] = {
+            name: AsyncOperations(self, cls(db)) for name, cls in ENTITY_OPERATIONS.items()
+        }
+        self._ops['stats'] = AsyncOperations(self, StatsOperations(db))
+
+    def __getattr__(self, name: str) -> AsyncOperations:
+        ops = self.__dict__.get('_ops', {})
+        if name in ops:
+            return ops[name]
+        raise AttributeError(name)
+
+    def __getitem__(self, name: str) -> AsyncOperations:
+        return self._ops[name]
+
+    async def run(self, fn: Callable, *args, timeout=DEFAULT_TIMEOUT, **kwargs):
+        """Run a blocking callable on the worker pool.
+
+        Raises asyncio.TimeoutError after timeout seconds (default: the
+        facade's timeout; None waits without limit); the statement it was
+        running is killed.
+        """
+        state = {'thread': None, 'done': False}
+        lock = threading.Lock()
+        context = contextvars.copy_context()
+
+        def work():
+            with lock:
+                state['thread'] = threading.get_ident()
+            try:
+                return context.run(fn, *args, **kwargs)
+            finally:
+                with lock:
+                    state['done'] = True
+
+        future = asyncio.get_running_loop().run_in_executor(self._executor, work)
+        limit = self.timeout if timeout is DEFAULT_TIMEOUT else timeout
+        try:
+            return await asyncio.wait_for(future, limit)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            # Kill while still holding the lock: until it is released the worker
+            # cannot finish this call and pick up another, whose statement the
+            # kill would hit instead
+            with lock:
+                if state['thread'] is not None and not state['done']:
+                    self.db.kill_queries(state['thread'])
+            raise
+
+    async def gather(self, *aws, timeout: Optional[float] = None,
+                     return_exceptions: bool = False) -> List:
+        """Await several calls concurrently, optionally bounding the whole group.
+
+        With return_exceptions=True a failed or timed-out call yields its
+        exception in place of a result instead of cancelling its siblings.
+        """
+        group = asyncio.gather(*aws, return_exceptions=return_exceptions)
+        if timeout is None:
+            return await group
+        return await asyncio.wait_for(group, timeout)
+
+    def run_sync(self, coro):
+        """Drive a coroutine to completion from synchronous code such as a Streamlit script"""
+        return asyncio.run(coro)
+
+    def close(self):
+        """Stop the worker threads; calls already running finish first"""
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,342 @@
+"""Microbenchmarks for the public methods of the Operations classes.
+
+Run against a database filled by datagen.py. Every public method of
+DivisionOperations through GrantTopicOperations is timed. Results (p50/p95/p99
+latency, rows/s and peak RSS) are written to a JSON file, which can be
+compared with an earlier run to catch regressions.
+
+Usage:
+    python benchmark.py --out bench.json
+    python benchmark.py --out bench.json --writes        # also time create/update/delete/bulk_*
+    python benchmark.py --compare base.json bench.json --threshold 0.15
+"""
+import argparse
+import inspect
+import json
+import math
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import date, datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from db_operations import (DatabaseConnection, ENTITY_OPERATIONS, RollupOperations, SearchOperations,
+                           TableOperations, configured_database)
+
+# Sample values used to build the arguments of each call
+SAMPLE_ROWS = {
+    'division': {'name': "Bench Division", 'description': "Benchmark row"},
+    'region': {'name': "Bench Region"},
+    'topic': {'name': "Bench Topic", 'category': "Research"},
+    'grantee': {'name': "Bench Grantee", 'email': "bench@example.org", 'addr': "1 Bench St",
+                'phone': "555-0000", 'grantee_type': "University"},
+    'grant': {'purpose': "Benchmark grant", 'date_awarded': date(2024, 1, 1), 'duration': 12,
+              'close_date': date(2025, 1, 1), 'start_date': date(2024, 1, 1), 'amount': 100000.0},
+    'beneficiary': {'institution': "Bench Campus", 'description': "Benchmark row",
+                    'county_of_institute': "Kings County"},
+    'milestone': {'milestone_desc': "Benchmark milestone", 'due_date': date(2024, 6, 1), 'completion': 50},
+    'grantee_univs': {'associated_body': "Bench Department"},
+    'grant_topic': {},
+}
+WRITE_METHODS = {'create', 'update', 'delete', 'bulk_create', 'bulk_upsert'}
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(fraction * len(sorted_values))
+    return sorted_values[min(len(sorted_values), max(rank, 1)) - 1]
+
+def rows_in(result) -> int:
+    """Number of rows a method returned (or wrote), whatever its return shape"""
+    if isinstance(result, pd.DataFrame):
+        return len(result)
+    if isinstance(result, tuple) and result and isinstance(result[0], pd.DataFrame):
+        return len(result[0])  # read_page
+    if isinstance(result, tuple) and len(result) == 2 and isinstance(result[0], bool):
+        return 1 if result[0] else 0  # (success, message) from writes
+    if isinstance(result, dict):
+        if 'succeeded' in result and 'failed' in result:
+            return result['succeeded']  # bulk write report
+        if result and all(isinstance(k, int) for k in result):
+            return len(result)  # labels()
+        return 1 if result else 0  # a single row
+    if isinstance(result, list):
+        return len(result)
+    return 1 if result is not None else 0
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def time_calls(call: Callable[[int], object], iterations: int, warmup: int) -> Dict:
+    for i in range(warmup):
+        call(i)
+    latencies, total_rows = [], 0
+    for i in range(iterations):
+        started = time.perf_counter()
+        result = call(warmup + i)
+        latencies.append(time.perf_counter() - started)
+        total_rows += rows_in(result)
+    latencies.sort()
+    elapsed = sum(latencies)
+    return {
+        'iterations': iterations,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'mean_ms': elapsed / iterations * 1000 if iterations else 0.0,
+        'rows': total_rows // max(iterations, 1),
+        'rows_per_s': total_rows / elapsed if elapsed else 0.0,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+def public_methods(cls) -> List[str]:
+    return sorted(name for name, member in inspect.getmembers(cls, inspect.isfunction)
+                  if not name.startswith('_'))
+
+def _middle_key(db: DatabaseConnection, ops: TableOperations) -> Optional[tuple]:
+    """Key of a row roughly in the middle of the table, by primary key order"""
+    n = ops.count()
+    if not n:
+        return None
+    columns = ", ".join(ops.key_columns)
+    success, result = db.fetch_query(
+        f"SELECT {columns} FROM {ops.table} ORDER BY {columns} LIMIT 1 OFFSET %s", (n // 2,), use_cache=False)
+    return tuple(result[0][c] for c in ops.key_columns) if success and result else None
+
+def read_cases(db: DatabaseConnection, entity: str, ops: TableOperations,
+               full_read_iterations: int) -> List[Tuple[str, Callable, Optional[int]]]:
+    """(case name, call, iterations override) for every read method of an entity"""
+    key = _middle_key(db, ops)
+    if key is None:
+        return []
+    mid_id = key[0]
+    sample_grant = _middle_key(db, ENTITY_OPERATIONS['grant'](db))
+    sample_grantee = _middle_key(db, ENTITY_OPERATIONS['grantee'](db))
+    cases = [
+        ('read_all', lambda i: ops.read_all(), full_read_iterations),
+        ('count', lambda i: ops.count(), None),
+        ('select_query', lambda i: ops.select_query(), None),
+        ('read_page', lambda i: ops.read_page(limit=50), None),
+        ('read_page[after_key]', lambda i: ops.read_page(after_key=key, limit=50), None),
+        ('read_page[columns=key]', lambda i: ops.read_page(after_key=key, limit=50,
+                                                           columns=ops.key_columns), None),
+    ]
+    for column in ops.sort_columns:
+        cases.append((f'read_page[order_by={column}]',
+                      lambda i, c=column: ops.read_page(limit=50, order_by=c), None))
+    cases.append(('read_records', lambda i: ops.read_records(after_key=key, limit=50), None))
+    if len(ops.key_columns) == 1:
+        cases.append(('read_by_id', lambda i: ops.read_by_id(mid_id), None))
+    if ops.label_column:
+        cases += [
+            ('options', lambda i: ops.options(limit=201), None),
+            ('labels', lambda i: ops.labels(limit=201), None),
+            ('label_for', lambda i: ops.label_for(mid_id), None),
+            ('search_options', lambda i: ops.search_options("Re", limit=50), None),
+        ]
+    if hasattr(ops, 'read_by_grant') and sample_grant:
+        cases.append(('read_by_grant', lambda i: ops.read_by_grant(sample_grant[0]), None))
+    if hasattr(ops, 'read_by_grantee') and sample_grantee:
+        cases.append(('read_by_grantee', lambda i: ops.read_by_grantee(sample_grantee[0]), None))
+    if hasattr(ops, 'grant_health'):
+        cases.append(('grant_health', lambda i: ops.grant_health(), full_read_iterations))
+        cases.append(('grant_health[at_risk_only]',
+                      lambda i: ops.grant_health(at_risk_only=True, limit=500), full_read_iterations))
+        cases.append(('overdue', lambda i: ops.overdue(limit=500), None))
+    token = ops.change_token()
+    if token is not None:
+        cases.append(('change_token', lambda i: ops.change_token(), None))
+        cases.append(('changes_since', lambda i: ops.changes_since(token), None))
+    if hasattr(ops, 'filter'):
+        sort = ops.sort_columns[-1]
+        cases.append((f'filter[order_by={sort}]',
+                      lambda i: ops.filter().order_by(sort, True).read_page(limit=50), None))
+    return cases
+
+# Mixes of common, rare and multi-word terms from datagen's vocabulary
+SEARCH_TERMS = ("research", "renewable energy", "clinical pilot", "water", "youth training")
+
+def _new_keys(db: DatabaseConnection, ops: TableOperations, n: int) -> List[tuple]:
+    columns = ", ".join(ops.key_columns)
+    order = ", ".join(f"{c} DESC" for c in ops.key_columns)
+    success, result = db.fetch_query(f"SELECT {columns} FROM {ops.table} ORDER BY {order} LIMIT %s",
+                                     (n,), use_cache=False)
+    return [tuple(row[c] for c in ops.key_columns) for row in result] if success else []
+
+def _free_pairs(db: DatabaseConnection, entity: str, n: int) -> List[tuple]:
+    """Key pairs not yet present in a junction table, for write benchmarks"""
+    if entity == 'grant_topic':
+        query = """SELECT g.grant_id, t.topic_id FROM GRANT_TABLE g CROSS JOIN TOPIC t
+                   WHERE NOT EXISTS (SELECT 1 FROM GRANT_TOPIC x
+                                     WHERE x.grant_id = g.grant_id AND x.topic_id = t.topic_id)
+                   LIMIT %s"""
+        key = ('grant_id', 'topic_id')
+    else:
+        query = """SELECT e.grantee_id, g.grant_id FROM GRANTEE e CROSS JOIN GRANT_TABLE g
+                   WHERE NOT EXISTS (SELECT 1 FROM GRANTEE_UNIVS x
+                                     WHERE x.grantee_id = e.grantee_id AND x.grant_id = g.grant_id)
+                   LIMIT %s"""
+        key = ('grantee_id', 'grant_id')
+    success, result = db.fetch_query(query, (n,), use_cache=False)
+    return [tuple(row[c] for c in key) for row in result] if success else []
+
+def write_rows(db: DatabaseConnection, entity: str, n: int) -> List[Dict]:
+    """n insertable rows for entity, with valid foreign keys"""
+    ops = ENTITY_OPERATIONS[entity](db)
+    base = dict(SAMPLE_ROWS[entity])
+    if entity in ('grantee_univs', 'grant_topic'):
+        return [dict(base, **dict(zip(ops.key_columns, pair))) for pair in _free_pairs(db, entity, n)]
+    grant = _middle_key(db, ENTITY_OPERATIONS['grant'](db))
+    grantee = _middle_key(db, ENTITY_OPERATIONS['grantee'](db))
+    if entity == 'milestone' and grant:
+        base['grant_id'] = grant[0]
+    if entity == 'beneficiary' and grantee:
+        base['grantee_id'] = grantee[0]
+    return [dict(base) for _ in range(n)]
+
+def run_writes(db: DatabaseConnection, entity: str, iterations: int, bulk_size: int) -> Dict[str, Dict]:
+    """Time create, update and delete on fresh rows, then bulk_create/bulk_upsert; cleans up after itself"""
+    ops = ENTITY_OPERATIONS[entity](db)
+    results = {}
+    rows = write_rows(db, entity, iterations)
+    if len(rows) < iterations:
+        return results
+    keyed = entity in ('grantee_univs', 'grant_topic')
+
+    def create(i):
+        row = rows[i]
+        return ops.create(**row)
+    results['create'] = time_calls(create, iterations, 0)
+
+    keys = [tuple(row[c] for c in ops.key_columns) for row in rows] if keyed else _new_keys(db, ops, iterations)
+    if hasattr(ops, 'update'):
+        def update(i):
+            row = {k: v for k, v in rows[i].items() if k not in ops.key_columns}
+            return ops.update(*keys[i], **row)
+        results['update'] = time_calls(update, iterations, 0)
+    results['delete'] = time_calls(lambda i: ops.delete(*keys[i]), iterations, 0)
+
+    bulk = write_rows(db, entity, bulk_size)
+    if bulk:
+        results['bulk_create'] = time_calls(lambda i: ops.bulk_create(bulk), 1, 0)
+        created = [tuple(row[c] for c in ops.key_columns) for row in bulk] if keyed \
+            else _new_keys(db, ops, len(bulk))
+        upserts = [dict(row, **dict(zip(ops.key_columns, key))) for row, key in zip(bulk, created)]
+        results['bulk_upsert'] = time_calls(lambda i: ops.bulk_upsert(upserts), 1, 0)
+        for key in created:
+            ops.delete(*key)
+    return results
+
+def run(db: DatabaseConnection, iterations: int = 20, warmup: int = 2, full_read_iterations: int = 3,
+        writes: bool = False, bulk_size: int = 1000, progress=print) -> Dict:
+    results, skipped = {}, []
+    for entity, cls in ENTITY_OPERATIONS.items():
+        ops = cls(db)
+        covered = set()
+        for name, call, override in read_cases(db, entity, ops, full_read_iterations):
+            n = override or iterations
+            results[f"{entity}.{name}"] = stats = time_calls(call, n, min(warmup, n))
+            covered.add(name.split('[')[0])
+            progress(f"{entity + '.' + name:<48} p50 {stats['p50_ms']:9.2f} ms  "
+                     f"p99 {stats['p99_ms']:9.2f} ms  {stats['rows_per_s']:>12.0f} rows/s")
+        if writes:
+            for name, stats in run_writes(db, entity, iterations, bulk_size).items():
+                results[f"{entity}.{name}"] = stats
+                covered.add(name)
+                progress(f"{entity + '.' + name:<48} p50 {stats['p50_ms']:9.2f} ms")
+        for method in public_methods(cls):
+            if method not in covered and (writes or method not in WRITE_METHODS):
+                skipped.append(f"{entity}.{method}")
+    search = SearchOperations(db)
+    for term in SEARCH_TERMS:
+        name = f"search.search[{term}]"
+        results[name] = stats = time_calls(lambda i, t=term: search.search(t, limit=20),
+                                           iterations, min(warmup, iterations))
+        progress(f"{name:<48} p50 {stats['p50_ms']:9.2f} ms  p99 {stats['p99_ms']:9.2f} ms")
+    rollups = RollupOperations(db)
+    for group in list(rollups.GROUPS) + ['totals']:
+        name = f"rollup.{group}"
+        call = rollups.totals if group == 'totals' else (lambda g=group: rollups.by_group(g))
+        results[name] = stats = time_calls(lambda i, c=call: c(), iterations, min(warmup, iterations))
+        progress(f"{name:<48} p50 {stats['p50_ms']:9.2f} ms  p99 {stats['p99_ms']:9.2f} ms")
+    return {'results': results, 'skipped': skipped}
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def table_sizes(db: DatabaseConnection) -> Dict[str, int]:
+    return {entity: cls(db).count() for entity, cls in ENTITY_OPERATIONS.items()}
+
+def compare(base: Dict, current: Dict, threshold: float, metric: str = 'p50_ms') -> List[str]:
+    """Cases whose metric grew by more than threshold (a fraction) between two runs"""
+    regressions = []
+    for name, stats in sorted(current['results'].items()):
+        old = base['results'].get(name)
+        if not old or not old.get(metric):
+            continue
+        change = stats[metric] / old[metric] - 1
+        if change > threshold:
+            regressions.append(f"{name:<48} {old[metric]:9.2f} -> {stats[metric]:9.2f} ms ({change:+.0%})")
+    return regressions
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the Operations classes")
+    parser.add_argument('--out', default='bench_results.json')
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--full-read-iterations', type=int, default=3,
+                        help="iterations for whole-table reads such as read_all")
+    parser.add_argument('--writes', action='store_true', help="also benchmark write methods")
+    parser.add_argument('--bulk-size', type=int, default=1000)
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'CURRENT'),
+                        help="compare two result files instead of running")
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help="relative p50 slowdown reported as a regression")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            base = json.load(f)
+        with open(args.compare[1]) as f:
+            current = json.load(f)
+        regressions = compare(base, current, args.threshold)
+        print("\n".join(regressions) if regressions else "No regressions")
+        return 1 if regressions else 0
+
+    db = configured_database(pool_min_size=1, pool_max_size=2)
+    success, msg = db.connect()
+    if not success:
+        print(msg, file=sys.stderr)
+        return 1
+    try:
+        report = run(db, args.iterations, args.warmup, args.full_read_iterations,
+                     args.writes, args.bulk_size)
+        report['meta'] = {
+            'commit': _git_commit(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'table_sizes': table_sizes(db),
+            'iterations': args.iterations,
+        }
+    finally:
+        db.disconnect()
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    if report['skipped']:
+        print(f"No benchmark case for: {', '.join(report['skipped'])}")
+    print(f"Results written to {args.out}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,10 +4,22 @@
 DB_CONFIG = {
     'host': 'localhost',
     'user': 'root',
-    'password': '',  # Add your MySQL root password here
+    'password': '',  # Add your MySQL root password here (the app used to hard-code 'root@123')
     'database': 'grant_management'
 }
 
+# 'mysql', or 'sqlite' to keep everything in the local database file named by
+# SQLITE_CONFIG instead (no server needed; see sqlite_backend.py)
+DB_BACKEND = 'mysql'
+
+SQLITE_CONFIG = {
+    'database': 'grant_management.db'
+}
+
+# Optional read replicas, e.g. [{'host': 'localhost', 'port': 3307}]; user,
+# password and database default to the primary's. MySQL backend only
+DB_REPLICAS = []
+
 # Streamlit Configuration
 STREAMLIT_CONFIG = {
     'page_title': 'Grant Management System',
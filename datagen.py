@@ -0,0 +1,219 @@
+"""Deterministic synthetic data generator for all nine tables.
+
+Fills the database at production-like scale so the Operations classes can be
+benchmarked and EXPLAIN-checked. The same seed and scale always produce the
+same rows. Existing rows in the nine tables are deleted first.
+
+Usage:
+    python datagen.py --grants 1000000 --milestones-per-grant 5 --yes
+    python datagen.py --grants 10000 --seed 7 --yes
+"""
+import argparse
+import math
+import random
+import sys
+import time
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional
+
+from db_operations import (ChangeOperations, DatabaseConnection, ENTITY_OPERATIONS, RollupOperations,
+                           configured_database)
+
+GRANTEE_TYPES = (("University", 40), ("Institute", 25), ("Foundation", 15),
+                 ("NGO", 12), ("Corporation", 5), ("Other", 3))
+TOPIC_CATEGORIES = ("Education", "Research", "Environment", "Technology", "Health", "Community")
+WORDS = ("advanced", "community", "research", "education", "health", "digital", "renewable",
+         "energy", "conservation", "innovation", "literacy", "program", "initiative", "study",
+         "regional", "climate", "water", "youth", "training", "infrastructure", "access",
+         "biodiversity", "clinical", "partnership", "development", "pilot", "network")
+COUNTIES = tuple(f"{name} County" for name in (
+    "Kings", "Queens", "Bronx", "Suffolk", "Nassau", "Orange", "Erie", "Monroe", "Albany", "Essex"))
+EPOCH = date(2015, 1, 1)
+DAYS = (date(2026, 12, 31) - EPOCH).days
+
+# Insert order respects the foreign keys in schema.sql; delete order is the reverse
+LOAD_ORDER = ('division', 'region', 'topic', 'grantee', 'grant',
+              'beneficiary', 'milestone', 'grantee_univs', 'grant_topic')
+
+class Scale:
+    """Row counts for one generated dataset"""
+
+    def __init__(self, grants: int = 10000, milestones_per_grant: float = 5.0,
+                 topics_per_grant: float = 2.0, grantees_per_grant: float = 1.5,
+                 grantees: Optional[int] = None, divisions: int = 12, regions: int = 20,
+                 topics: int = 200):
+        self.grants = grants
+        self.milestones_per_grant = milestones_per_grant
+        self.topics_per_grant = topics_per_grant
+        self.grantees_per_grant = grantees_per_grant
+        self.grantees = grantees or max(10, grants // 10)
+        self.beneficiaries = self.grantees * 2
+        self.divisions = divisions
+        self.regions = regions
+        self.topics = topics
+
+    def as_dict(self) -> Dict:
+        return dict(vars(self))
+
+def _sentence(rng: random.Random, low: int, high: int) -> str:
+    words = rng.choices(WORDS, k=rng.randint(low, high))
+    return " ".join(words).capitalize()
+
+def _poisson(rng: random.Random, mean: float) -> int:
+    # Knuth's method; means here are small
+    limit, k, p = math.exp(-mean), 0, 1.0
+    while True:
+        p *= rng.random()
+        if p <= limit:
+            return k
+        k += 1
+
+def _grant_schedule(seed: int, grant_id: int):
+    """(date_awarded, start_date, duration) of a grant, shared by the grant and milestone streams"""
+    rng = random.Random(seed * 1_000_003 + grant_id)
+    awarded = EPOCH + timedelta(days=rng.randrange(DAYS))
+    start = awarded + timedelta(days=rng.randint(0, 90))
+    duration = rng.choice((6, 12, 12, 18, 24, 24, 36, 48, 60))
+    return awarded, start, duration
+
+def generate(entity: str, scale: Scale, seed: int) -> Iterator[tuple]:
+    """Rows for one table, in the column order of insert_sql(entity).
+
+    Each table draws from its own seeded stream, so generating one table never
+    changes another's rows.
+    """
+    rng = random.Random(f"{seed}:{entity}")
+    if entity == 'division':
+        for i in range(1, scale.divisions + 1):
+            yield i, f"Division {i}", _sentence(rng, 4, 10)
+    elif entity == 'region':
+        for i in range(1, scale.regions + 1):
+            yield i, f"Region {i}"
+    elif entity == 'topic':
+        for i in range(1, scale.topics + 1):
+            yield i, f"{_sentence(rng, 1, 3)} {i}", rng.choice(TOPIC_CATEGORIES)
+    elif entity == 'grantee':
+        types, weights = zip(*GRANTEE_TYPES)
+        for i in range(1, scale.grantees + 1):
+            grantee_type = rng.choices(types, weights)[0]
+            yield (i, f"{_sentence(rng, 1, 3)} {grantee_type} {i}", f"contact{i}@example.org",
+                   f"{rng.randint(1, 9999)} {rng.choice(WORDS).capitalize()} Street",
+                   f"555-{rng.randint(0, 9999):04d}", grantee_type)
+    elif entity == 'grant':
+        for i in range(1, scale.grants + 1):
+            awarded, start, duration = _grant_schedule(seed, i)
+            close = start + timedelta(days=duration * 30)
+            # Award sizes are heavy-tailed: median around $150k
+            amount = round(min(rng.lognormvariate(11.9, 0.9), 25_000_000), 2)
+            region = rng.randint(1, scale.regions) if rng.random() > 0.02 else None
+            division = rng.randint(1, scale.divisions) if rng.random() > 0.02 else None
+            yield (i, _sentence(rng, 5, 40), awarded, duration, close, start, amount, region, division)
+    elif entity == 'beneficiary':
+        for i in range(1, scale.beneficiaries + 1):
+            yield (i, rng.randint(1, scale.grantees), f"{_sentence(rng, 1, 3)} Campus {i}",
+                   _sentence(rng, 8, 30), rng.choice(COUNTIES))
+    elif entity == 'milestone':
+        milestone_id = 0
+        for grant_id in range(1, scale.grants + 1):
+            # Due dates fall inside the grant's own schedule
+            _, start, duration = _grant_schedule(seed, grant_id)
+            for _ in range(_poisson(rng, scale.milestones_per_grant)):
+                milestone_id += 1
+                due = start + timedelta(days=rng.randint(30, duration * 30))
+                completion = min(100, int(rng.betavariate(2.0, 1.2) * 101))
+                yield milestone_id, grant_id, _sentence(rng, 4, 20), due, completion
+    elif entity == 'grantee_univs':
+        for grant_id in range(1, scale.grants + 1):
+            count = max(1, _poisson(rng, scale.grantees_per_grant))
+            for grantee_id in rng.sample(range(1, scale.grantees + 1), min(count, scale.grantees)):
+                yield grantee_id, grant_id, f"{rng.choice(WORDS).capitalize()} Department"
+    elif entity == 'grant_topic':
+        for grant_id in range(1, scale.grants + 1):
+            count = max(1, _poisson(rng, scale.topics_per_grant))
+            for topic_id in rng.sample(range(1, scale.topics + 1), min(count, scale.topics)):
+                yield grant_id, topic_id
+    else:
+        raise ValueError(f"Unknown entity {entity!r}")
+
+def insert_sql(entity: str) -> str:
+    cls = ENTITY_OPERATIONS[entity]
+    columns = list(dict.fromkeys(cls.key_columns + cls.insert_columns))
+    placeholders = ", ".join(["%s"] * len(columns))
+    return f"INSERT INTO {cls.table} ({', '.join(columns)}) VALUES ({placeholders})"
+
+def _chunks(rows: Iterator[tuple], size: int) -> Iterator[List[tuple]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def populate(db: DatabaseConnection, scale: Scale, seed: int = 42,
+             chunk_size: int = 5000, progress=print) -> Dict[str, int]:
+    """Replace the contents of all nine tables with generated rows; returns row counts"""
+    for entity in reversed(LOAD_ORDER):
+        success, msg = db.execute_query(f"DELETE FROM {ENTITY_OPERATIONS[entity].table}")
+        if not success:
+            raise RuntimeError(msg)
+    counts = {}
+    for entity in LOAD_ORDER:
+        started = time.perf_counter()
+        query = insert_sql(entity)
+        total = 0
+        for chunk in _chunks(generate(entity, scale, seed), chunk_size):
+            success, msg = db.execute_batch(query, chunk)
+            if not success:
+                raise RuntimeError(f"{entity}: {msg}")
+            total += len(chunk)
+        counts[entity] = total
+        elapsed = time.perf_counter() - started
+        progress(f"{entity:<14} {total:>10} rows  {elapsed:7.1f}s  {total / max(elapsed, 1e-9):>10.0f} rows/s")
+    # Rows were loaded with raw batches, so the funding rollups are recomputed once at the end
+    success, msg = RollupOperations(db).rebuild()
+    if not success:
+        raise RuntimeError(f"rollups: {msg}")
+    # The old rows' tombstones are useless after a full reload; dropping them
+    # also expires every change token, so clients re-read instead of merging
+    success, msg = ChangeOperations(db).prune(keep_days=0)
+    if not success:
+        raise RuntimeError(f"tombstones: {msg}")
+    return counts
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Populate all tables with deterministic synthetic data")
+    parser.add_argument('--grants', type=int, default=10000)
+    parser.add_argument('--milestones-per-grant', type=float, default=5.0)
+    parser.add_argument('--topics-per-grant', type=float, default=2.0)
+    parser.add_argument('--grantees-per-grant', type=float, default=1.5)
+    parser.add_argument('--grantees', type=int, help="default: grants / 10")
+    parser.add_argument('--topics', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    parser.add_argument('--yes', action='store_true', help="confirm deleting the existing rows")
+    args = parser.parse_args(argv)
+
+    if not args.yes:
+        print("This deletes every row in the nine application tables; re-run with --yes.", file=sys.stderr)
+        return 1
+    scale = Scale(grants=args.grants, milestones_per_grant=args.milestones_per_grant,
+                  topics_per_grant=args.topics_per_grant, grantees_per_grant=args.grantees_per_grant,
+                  grantees=args.grantees, topics=args.topics)
+    db = configured_database(pool_min_size=1, pool_max_size=1)
+    success, msg = db.bootstrap()
+    if not success:
+        print(msg, file=sys.stderr)
+        return 1
+    try:
+        populate(db, scale, args.seed, args.chunk_size)
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 1
+    finally:
+        db.disconnect()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
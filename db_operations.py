@@ -1,123 +1,2304 @@
+from __future__ import annotations
+
 import pymysql
 from pymysql import Error
-import pandas as pd
-from typing import List, Dict, Optional, Tuple
+from pymysql.constants import CLIENT, ER, FIELD_TYPE
+import importlib
+import itertools
+import os
+import logging
+import random
+import re
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from collections import OrderedDict, deque, namedtuple
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
+from decimal import Decimal
+
+logger = logging.getLogger(__name__)
+
+class _LazyModule:
+    """Stands in for a module and imports it on first attribute access.
+    
+    pandas and NumPy take most of a second to import; scripts that only use
+    records never pay for them. Looked-up attributes are kept on the proxy.
+    """
+    
+    def __init__(self, name: str):
+        self._name = name
+    
+    def __getattr__(self, attr: str):
+        value = getattr(importlib.import_module(self._name), attr)
+        setattr(self, attr, value)
+        return value
+
+np = _LazyModule('numpy')
+pd = _LazyModule('pandas')
+
+MIGRATIONS_DIR = 'migrations'
+_MIGRATION_FILE = re.compile(r'^(\d+)_(\w+)\.sql$')
+
+def list_migrations(directory: str = MIGRATIONS_DIR) -> List[Tuple[int, str, str]]:
+    """(version, name, path) for every NNN_name.sql file in directory, by version"""
+    if not os.path.isdir(directory):
+        return []
+    found = []
+    for filename in os.listdir(directory):
+        match = _MIGRATION_FILE.match(filename)
+        if match:
+            found.append((int(match.group(1)), match.group(2), os.path.join(directory, filename)))
+    return sorted(found)
+
+_DELIMITER_COMMAND = re.compile(r'DELIMITER[ \t]+(\S+)[ \t]*(?:\r?\n|$)', re.IGNORECASE)
+
+def split_sql_statements(script: str) -> List[str]:
+    """Split a SQL script into statements.
+    
+    Semicolons inside quoted strings, backquoted identifiers and comments do
+    not end a statement. Comments are dropped (except /*! ... */ version
+    comments, which MySQL executes), and empty statements are skipped. As in
+    the mysql client, a DELIMITER line changes the terminator, so trigger
+    bodies with BEGIN ... END can hold semicolons.
+    """
+    statements, current = [], []
+    delimiter = ';'
+    i, n = 0, len(script)
+    while i < n:
+        ch = script[i]
+        if ch in ("'", '"', '`'):
+            # Copy the quoted run verbatim, honouring backslash and doubled-quote escapes
+            j = i + 1
+            while j < n:
+                if script[j] == '\\' and ch != '`':
+                    j += 2
+                    continue
+                if script[j] == ch:
+                    if j + 1 < n and script[j + 1] == ch:
+                        j += 2
+                        continue
+                    break
+                j += 1
+            current.append(script[i:j + 1])
+            i = j + 1
+        elif script.startswith('--', i) and (i + 2 == n or script[i + 2] in ' \t\r\n') or ch == '#':
+            j = script.find('\n', i)
+            i = n if j == -1 else j
+        elif script.startswith('/*', i) and not script.startswith('/*!', i):
+            j = script.find('*/', i + 2)
+            i = n if j == -1 else j + 2
+            current.append(' ')
+        elif ch in 'dD' and (i == 0 or script[i - 1] == '\n') and _DELIMITER_COMMAND.match(script, i):
+            match = _DELIMITER_COMMAND.match(script, i)
+            delimiter = match.group(1)
+            i = match.end()
+        elif script.startswith(delimiter, i):
+            statement = ''.join(current).strip()
+            if statement:
+                statements.append(statement)
+            current = []
+            i += len(delimiter)
+        else:
+            current.append(ch)
+            i += 1
+    statement = ''.join(current).strip()
+    if statement:
+        statements.append(statement)
+    return statements
+
+def batch_sql_statements(statements: List[str], max_bytes: int = 512 * 1024) -> List[str]:
+    """Join statements into multi-statement batches of at most max_bytes each"""
+    batches, current, size = [], [], 0
+    for statement in statements:
+        length = len(statement.encode('utf-8')) + 2
+        if current and size + length > max_bytes:
+            batches.append(';\n'.join(current))
+            current, size = [], 0
+        current.append(statement)
+        size += length
+    if current:
+        batches.append(';\n'.join(current))
+    return batches
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of MySQL connections"""
+    
+    def __init__(self, factory, min_size: int = 1, max_size: int = 10, timeout: float = 30.0):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size and max_size >= 1")
+        self.factory = factory
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle = deque()
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._stats = {
+            'checkouts': 0,
+            'timeouts': 0,
+            'reconnects': 0,
+            'created': 0,
+            'wait_total': 0.0,
+            'wait_max': 0.0,
+        }
+    
+    def fill(self):
+        """Open connections until the pool holds min_size of them"""
+        while True:
+            with self._cond:
+                if self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                conn = self.factory()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._stats['created'] += 1
+                self._idle.append(conn)
+                self._cond.notify()
+    
+    def acquire(self):
+        """Check out a healthy connection, waiting up to timeout for one to free up"""
+        started = time.perf_counter()
+        conn = None
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise Error("Connection pool is closed")
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                remaining = self.timeout - (time.perf_counter() - started)
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise Error(f"Timed out after {self.timeout}s waiting for a pooled connection")
+                self._cond.wait(remaining)
+        
+        try:
+            if conn is None:
+                conn = self.factory()
+                with self._cond:
+                    self._stats['created'] += 1
+            else:
+                self._check_health(conn)
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        
+        waited = time.perf_counter() - started
+        with self._cond:
+            self._stats['checkouts'] += 1
+            self._stats['wait_total'] += waited
+            self._stats['wait_max'] = max(self._stats['wait_max'], waited)
+        return conn
+    
+    def _check_health(self, conn):
+        """Ping the connection, transparently reconnecting if the server dropped it"""
+        was_open = conn.open
+        conn.ping(reconnect=True)
+        if not was_open:
+            with self._cond:
+                self._stats['reconnects'] += 1
+    
+    def release(self, conn, discard: bool = False):
+        """Return a connection to the pool, closing it instead if discard is set"""
+        with self._cond:
+            if discard or self._closed or not conn.open:
+                self._size -= 1
+                self._close_quietly(conn)
+            else:
+                self._idle.append(conn)
+            self._cond.notify()
+    
+    @contextmanager
+    def connection(self):
+        """Context manager that checks a connection out for the duration of a block"""
+        conn = self.acquire()
+        discard = False
+        try:
+            yield conn
+        except (pymysql.err.OperationalError, pymysql.err.InterfaceError):
+            discard = True
+            raise
+        finally:
+            self.release(conn, discard=discard)
+    
+    def close(self):
+        """Close every idle connection and refuse further checkouts"""
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                self._size -= 1
+                self._close_quietly(self._idle.pop())
+            self._cond.notify_all()
+    
+    def stats(self) -> Dict:
+        """Snapshot of pool size and checkout-wait metrics"""
+        with self._cond:
+            stats = dict(self._stats)
+            stats['size'] = self._size
+            stats['idle'] = len(self._idle)
+            stats['in_use'] = self._size - len(self._idle)
+            stats['wait_avg'] = stats['wait_total'] / stats['checkouts'] if stats['checkouts'] else 0.0
+            return stats
+    
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+# Tables whose rows change when a row of the key table is deleted or re-keyed,
+# through ON DELETE CASCADE / SET NULL foreign keys in schema.sql
+CASCADES = {
+    'DIVISION': {'GRANT_TABLE', 'ROLLUP_DIVISION'},
+    'REGION': {'GRANT_TABLE', 'ROLLUP_REGION'},
+    'TOPIC': {'GRANT_TOPIC', 'ROLLUP_TOPIC'},
+    'GRANTEE': {'GRANTBENEFICIARY', 'GRANTEE_UNIVS'},
+    'GRANT_TABLE': {'TOTAL_MILESTONE', 'GRANTEE_UNIVS', 'GRANT_TOPIC'},
+}
+
+_TABLE_REF = re.compile(r'\b(?:FROM|JOIN|INTO|UPDATE|TABLE)\s+`?([A-Za-z_][A-Za-z0-9_]*)`?', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+def tables_in(query: str) -> set:
+    """Upper-cased names of the tables a statement reads from or writes to"""
+    return {name.upper() for name in _TABLE_REF.findall(query)}
+
+def normalize_sql(query: str) -> str:
+    """Collapse whitespace so formatting differences share a cache entry"""
+    return _WHITESPACE.sub(' ', query).strip()
+
+class QueryCache:
+    """Thread-safe LRU + TTL cache of SELECT results, invalidated per table"""
+    
+    def __init__(self, max_entries: int = 256, ttl: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, tables, rows)
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+        self._version = 0  # bumped on every invalidation
+        self._invalidated_at = float('-inf')
+    
+    @staticmethod
+    def make_key(query: str, params: tuple = None) -> tuple:
+        return normalize_sql(query), tuple(params) if params else ()
+    
+    def version(self) -> int:
+        """Token to take before running a query whose result will be put()"""
+        with self._lock:
+            return self._version
+    
+    def get(self, key: tuple):
+        """Cached rows for key, or None on a miss or expired entry"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                    self._stats['evictions'] += 1
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry[2]
+    
+    def put(self, key: tuple, rows, version: int = None, settle: float = 0.0):
+        """Store rows, unless an invalidation happened since version was taken.
+        
+        Rows read from a replica pass settle, its tolerated lag: they may predate
+        a write invalidated up to settle seconds ago, so they are not stored then.
+        """
+        with self._lock:
+            if version is not None and version != self._version:
+                return
+            if settle and time.monotonic() - self._invalidated_at < settle:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, tables_in(key[0]), rows)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+    
+    def invalidate(self, tables) -> int:
+        """Drop every entry that reads any of tables (or their cascade targets)"""
+        affected = set()
+        for table in tables:
+            table = table.upper()
+            affected.add(table)
+            affected |= CASCADES.get(table, set())
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if entry[1] & affected]
+            for key in stale:
+                del self._entries[key]
+            self._stats['invalidations'] += len(stale)
+            self._version += 1
+            self._invalidated_at = time.monotonic()
+            return len(stale)
+    
+    def clear(self):
+        with self._lock:
+            self._stats['invalidations'] += len(self._entries)
+            self._entries.clear()
+            self._version += 1
+            self._invalidated_at = time.monotonic()
+    
+    def stats(self) -> Dict:
+        """Hit/miss/eviction counters and current size"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+            lookups = stats['hits'] + stats['misses']
+            stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+            return stats
+
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\"")
+_NUMBER_LITERAL = re.compile(r'(?<![\w.])-?\d+(?:\.\d+)?\b')
+_PLACEHOLDER_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+
+def fingerprint_sql(query: str) -> str:
+    """Statement shape with literals and placeholders replaced by ?, so runs of one query group together"""
+    text = _STRING_LITERAL.sub('?', normalize_sql(query))
+    text = _NUMBER_LITERAL.sub('?', text.replace('%s', '?'))
+    # IN (...) lists and multi-row VALUES differ only in length
+    return _PLACEHOLDER_LIST.sub('(?+)', text)
+
+def _calling_operation(depth: int = 2) -> str:
+    """Outermost Operations method on the current call stack, e.g. 'GrantOperations.read_page'"""
+    frame = sys._getframe(depth)
+    caller = 'unknown'
+    while frame is not None:
+        owner = frame.f_locals.get('self')
+        if owner is not None and type(owner).__name__.endswith('Operations'):
+            caller = f"{type(owner).__name__}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return caller
+
+def _estimate_bytes(rows, sample: int = 100) -> int:
+    """Approximate wire size of a result set, extrapolated from its first rows"""
+    if not rows:
+        return 0
+    head = rows[:sample]
+    total = 0
+    for row in head:
+        for value in (row.values() if isinstance(row, dict) else row):
+            total += len(value) if isinstance(value, (str, bytes)) else 8
+    return total * len(rows) // len(head)
+
+# Narrowest NumPy integer type for each MySQL integer column type
+_INT_DTYPES = {
+    FIELD_TYPE.TINY: 'int8',
+    FIELD_TYPE.SHORT: 'int16',
+    FIELD_TYPE.INT24: 'int32',
+    FIELD_TYPE.LONG: 'int32',
+    FIELD_TYPE.LONGLONG: 'int64',
+    FIELD_TYPE.YEAR: 'int16',
+}
+_DATE_TYPES = (FIELD_TYPE.DATE, FIELD_TYPE.NEWDATE)
+_DATETIME_TYPES = (FIELD_TYPE.DATETIME, FIELD_TYPE.TIMESTAMP)
+_DECIMAL_TYPES = (FIELD_TYPE.DECIMAL, FIELD_TYPE.NEWDECIMAL)
+
+def _typed_column(values: tuple, type_code: int, decimals: str) -> pd.Series:
+    """One chunk of a result column as a typed Series, from the raw values pymysql returned"""
+    count = len(values)
+    if type_code in _INT_DTYPES or (type_code in _DECIMAL_TYPES and decimals == 'cents'):
+        if type_code in _DECIMAL_TYPES:
+            dtype = 'int64'
+            values = tuple(None if v is None else int(round(v * 100)) for v in values)
+        else:
+            dtype = _INT_DTYPES[type_code]
+        mask = np.fromiter((v is None for v in values), bool, count)
+        if mask.any():
+            data = np.fromiter((0 if v is None else v for v in values), dtype, count)
+            return pd.Series(pd.arrays.IntegerArray(data, mask))
+        return pd.Series(np.fromiter(values, dtype, count))
+    if type_code in _DECIMAL_TYPES or type_code in (FIELD_TYPE.FLOAT, FIELD_TYPE.DOUBLE):
+        return pd.Series(np.array(values, dtype='float64'))
+    if type_code in _DATE_TYPES:
+        return pd.Series(np.array(values, dtype='datetime64[D]'))
+    if type_code in _DATETIME_TYPES:
+        return pd.Series(np.array(values, dtype='datetime64[us]'))
+    return pd.Series(np.array(values, dtype=object))
+
+class Record:
+    """Mixin for the compact row types: a named tuple per row instead of a dict.
+    
+    Fields read as attributes (grant.amount) or by name with get(), so code
+    written against the old dict rows keeps working.
+    """
+    __slots__ = ()
+    
+    def get(self, name: str, default=None):
+        return getattr(self, name, default)
+    
+    def as_dict(self) -> Dict:
+        return dict(zip(self._fields, self))
+
+def record_class(name: str, fields) -> type:
+    """A Record type: a namedtuple subclass with no per-instance __dict__"""
+    return type(name, (Record, namedtuple(name, fields)), {'__slots__': ()})
+
+_ROW_TYPES = {}
+
+def _row_type(names: tuple) -> type:
+    """Record type for an ad-hoc result, shared by every query with the same columns"""
+    row_type = _ROW_TYPES.get(names)
+    if row_type is None:
+        row_type = _ROW_TYPES[names] = record_class('Row', names)
+    return row_type
+
+class RecordList(list):
+    """Records of one query, with the cursor description needed to build a typed frame"""
+    
+    def __init__(self, records=(), description=(), categories: tuple = ()):
+        super().__init__(records)
+        self.description = tuple(description)
+        self.categories = tuple(categories)
+    
+    def to_frame(self, decimals: str = 'float') -> pd.DataFrame:
+        """The records as a DataFrame typed like fetch_frame's; the first call imports pandas"""
+        names = [column[0] for column in self.description]
+        if not self:
+            return pd.DataFrame(columns=names)
+        frame = pd.DataFrame({column[0]: _typed_column(values, column[1], decimals)
+                              for values, column in zip(zip(*self), self.description)})
+        for name in self.categories:
+            if name in frame:
+                frame[name] = frame[name].astype('category')
+        return frame
+
+# Upper bounds in seconds, as used by Prometheus client libraries
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class QueryStats:
+    """Query hook aggregating latency histograms, rows and bytes per (fingerprint, caller)"""
+    
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._series = {}  # (fingerprint, caller) -> counters
+        self._lock = threading.Lock()
+        # Per-scope execution counts; a ContextVar so worker threads started with
+        # contextvars.copy_context() count towards the scope that spawned them
+        self._scope = ContextVar(f"query_scope_{id(self)}", default=None)
+    
+    def __call__(self, event: Dict):
+        key = (event['fingerprint'], event['caller'])
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {
+                    'kind': event['kind'], 'count': 0, 'cache_hits': 0, 'errors': 0,
+                    'seconds': 0.0, 'max_seconds': 0.0, 'rows': 0, 'bytes': 0,
+                    'buckets': [0] * (len(self.buckets) + 1),
+                }
+            if event['cached']:
+                series['cache_hits'] += 1
+            else:
+                seconds = event['seconds']
+                series['count'] += 1
+                series['seconds'] += seconds
+                series['max_seconds'] = max(series['max_seconds'], seconds)
+                series['buckets'][self._bucket(seconds)] += 1
+                series['errors'] += 0 if event['ok'] else 1
+            series['rows'] += event['rows']
+            series['bytes'] += event['bytes']
+            counts = self._scope.get()
+            if counts is not None:
+                counts[key] = counts.get(key, 0) + 1
+    
+    def _bucket(self, seconds: float) -> int:
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                return i
+        return len(self.buckets)
+    
+    def begin_scope(self):
+        """Start counting this context's queries, e.g. at the top of a Streamlit rerun"""
+        self._scope.set({})
+    
+    def scope_counts(self) -> Dict[tuple, int]:
+        """Executions per (fingerprint, caller) in this context since begin_scope()"""
+        with self._lock:
+            return dict(self._scope.get() or {})
+    
+    def quantile(self, key: tuple, q: float) -> float:
+        """Latency quantile estimated from the histogram (upper bucket bound)"""
+        with self._lock:
+            series = self._series.get(key)
+            if not series or not series['count']:
+                return 0.0
+            target = q * series['count']
+            running = 0
+            for i, count in enumerate(series['buckets']):
+                running += count
+                if running >= target:
+                    return self.buckets[i] if i < len(self.buckets) else series['max_seconds']
+            return series['max_seconds']
+    
+    def snapshot(self) -> List[Dict]:
+        """One dict per (fingerprint, caller), slowest total time first"""
+        with self._lock:
+            items = [(key, dict(series, buckets=list(series['buckets'])))
+                     for key, series in self._series.items()]
+        rows = []
+        for (fingerprint, caller), series in items:
+            count = series['count']
+            rows.append({
+                'fingerprint': fingerprint, 'caller': caller, 'kind': series['kind'],
+                'calls': count, 'cache_hits': series['cache_hits'], 'errors': series['errors'],
+                'total_ms': series['seconds'] * 1000,
+                'mean_ms': series['seconds'] * 1000 / count if count else 0.0,
+                'p95_ms': self.quantile((fingerprint, caller), 0.95) * 1000,
+                'max_ms': series['max_seconds'] * 1000,
+                'rows': series['rows'], 'bytes': series['bytes'],
+                'buckets': series['buckets'],
+            })
+        rows.sort(key=lambda row: row['total_ms'], reverse=True)
+        return rows
+    
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+    
+    def prometheus_text(self, prefix: str = 'grants_db') -> str:
+        """Histogram and counters in the Prometheus text exposition format"""
+        lines = [
+            f"# HELP {prefix}_query_seconds Query latency by statement fingerprint and calling method",
+            f"# TYPE {prefix}_query_seconds histogram",
+        ]
+        snapshot = self.snapshot()
+        for row in snapshot:
+            labels = _prometheus_labels(row)
+            running = 0
+            for bound, count in zip(self.buckets + ('+Inf',), row['buckets']):
+                running += count
+                lines.append(f'{prefix}_query_seconds_bucket{{{labels},le="{bound}"}} {running}')
+            lines.append(f"{prefix}_query_seconds_sum{{{labels}}} {row['total_ms'] / 1000:.6f}")
+            lines.append(f"{prefix}_query_seconds_count{{{labels}}} {row['calls']}")
+        for name, field, help_text in (
+                ('query_rows_total', 'rows', 'Rows returned or affected'),
+                ('query_bytes_total', 'bytes', 'Approximate result bytes transferred'),
+                ('query_errors_total', 'errors', 'Statements that raised a database error'),
+                ('query_cache_hits_total', 'cache_hits', 'Reads served from the query cache')):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for row in snapshot:
+                lines.append(f"{prefix}_{name}{{{_prometheus_labels(row)}}} {row[field]}")
+        return "\n".join(lines) + "\n"
+
+def _prometheus_labels(row: Dict) -> str:
+    statement = row['fingerprint'][:200].replace('\\', '\\\\').replace('"', '\\"')
+    return f'caller="{row["caller"]}",kind="{row["kind"]}",statement="{statement}"'
+
+class SlowQueryLog:
+    """Query hook that logs statements slower than a threshold together with their EXPLAIN plan"""
+    
+    def __init__(self, db: 'DatabaseConnection', threshold_ms: float = 500.0,
+                 keep: int = 50, explain: bool = True):
+        self.db = db
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self.entries = deque(maxlen=keep)
+    
+    def __call__(self, event: Dict):
+        if event['cached'] or event['seconds'] * 1000 < self.threshold_ms:
+            return
+        plan = self.db.explain(event['query'], event['params']) if self.explain else []
+        entry = {
+            'at': datetime.now(), 'caller': event['caller'], 'ms': event['seconds'] * 1000,
+            'rows': event['rows'], 'query': normalize_sql(event['query']), 'plan': plan,
+        }
+        self.entries.append(entry)
+        logger.warning("Slow query (%.0f ms, %d rows) from %s: %s%s", entry['ms'], entry['rows'],
+                       entry['caller'], entry['query'],
+                       "".join(f"\n    {row}" for row in plan))
+
+class _TrackedCursor:
+    """Cursor used by run_in_transaction: records the tables it writes and the query events to emit"""
+    
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.tables = set()
+        self.events = []
+    
+    def execute(self, query: str, params: tuple = None) -> int:
+        return self._run('write', query, params, self._cursor.execute, params or None)
+    
+    def executemany(self, query: str, param_rows: List[tuple]) -> int:
+        """Multi-row INSERT for many parameter rows, as in DatabaseConnection.execute_batch"""
+        return self._run('batch', query, None, self._cursor.executemany, param_rows)
+    
+    def _run(self, kind: str, query: str, params, method, args) -> int:
+        started = time.perf_counter()
+        try:
+            result = method(query, args)
+        except Error:
+            self.events.append((kind, query, params, started, time.perf_counter(), False, 0))
+            raise
+        if not query.lstrip().upper().startswith('SELECT'):
+            self.tables |= tables_in(query)
+        self.events.append((kind, query, params, started, time.perf_counter(), True,
+                            max(self._cursor.rowcount, 0)))
+        return result
+    
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+# Errors after which rerunning the whole transaction can succeed
+RETRYABLE_ERRORS = (ER.LOCK_DEADLOCK, ER.LOCK_WAIT_TIMEOUT)
+
+class _Transaction:
+    """One thread's open transaction: its connection, savepoint depth and pending cache invalidations"""
+    
+    def __init__(self, conn):
+        self.conn = conn
+        self.depth = 0
+        self.failures = [None]   # first error inside each open block, outermost first
+        self.lost = None         # error after which the server had already rolled everything back
+        self.tables = set()      # written tables, invalidated in the query cache on commit
+    
+    def fail(self, error: Error):
+        """Doom the innermost open block: it rolls back and raises error when it exits"""
+        if self.failures[-1] is None:
+            self.failures[-1] = error
+        if (error.args and error.args[0] == ER.LOCK_DEADLOCK) or not self.conn.open:
+            self.lost = self.lost or error
+    
+    def execute(self, statement: str):
+        with self.conn.cursor() as cursor:
+            cursor.execute(statement)
+
+def _is_connection_failure(error: Error) -> bool:
+    """Whether error means the server could not be reached, rather than that the statement failed"""
+    if isinstance(error, pymysql.err.InterfaceError):
+        return True
+    code = error.args[0] if error.args and isinstance(error.args[0], int) else None
+    # 2xxx are client-side (CR_*) errors: refused, gone away, lost during query
+    return code is None or code >= 2000 or code == ER.CON_COUNT_ERROR
+
+class Replica:
+    """A read-only endpoint: its connection pool plus the lag and latency used to route reads to it"""
+    
+    def __init__(self, host='localhost', port: int = 3306, user: str = None, password: str = None,
+                 database: str = None):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.database = database
+        self.pool = None
+        self.latency = None              # moving average of read seconds
+        self.lag = None                  # seconds behind the primary at the last check
+        self.checked_at = float('-inf')
+        self.down_until = 0.0
+        self.failures = 0
+        self._lock = threading.Lock()
+    
+    @property
+    def name(self) -> str:
+        return f"{self.host}:{self.port}"
+    
+    def new_connection(self):
+        return pymysql.connect(
+            host=self.host,
+            port=self.port,
+            user=self.user,
+            password=self.password,
+            database=self.database
+        )
+    
+    def usable(self, max_lag: float, check_interval: float) -> bool:
+        """Whether reads may go here: reachable and at most max_lag seconds behind.
+        
+        The lag is re-read at most every check_interval seconds, by whichever
+        thread gets there first; the others use the last reading.
+        """
+        now = time.monotonic()
+        if now < self.down_until:
+            return False
+        if now - self.checked_at >= check_interval and self._lock.acquire(blocking=False):
+            try:
+                self._check_lag()
+            finally:
+                self._lock.release()
+        return self.lag is not None and self.lag <= max_lag
+    
+    def _check_lag(self):
+        try:
+            with self.pool.connection() as conn:
+                with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+                    try:
+                        cursor.execute("SHOW REPLICA STATUS")
+                    except Error:
+                        cursor.execute("SHOW SLAVE STATUS")  # before MySQL 8.0.22
+                    status = cursor.fetchone()
+        except Error as e:
+            self.mark_down(e)
+            return
+        self.checked_at = time.monotonic()
+        if status is None:
+            # Not replicating from anything, e.g. a second local instance loaded with the same data
+            self.lag = 0.0
+        else:
+            lag = status.get('Seconds_Behind_Source', status.get('Seconds_Behind_Master'))
+            # NULL means the replication threads are stopped
+            self.lag = float(lag) if lag is not None else None
+    
+    def record(self, seconds: float):
+        self.latency = seconds if self.latency is None else 0.8 * self.latency + 0.2 * seconds
+        self.failures = 0
+    
+    def mark_down(self, error: Error, retry_after: float = 30.0):
+        """Stop routing reads here for retry_after seconds, doubling on repeated failures"""
+        self.failures += 1
+        self.lag = None
+        self.checked_at = float('-inf')
+        self.down_until = time.monotonic() + min(retry_after * 2 ** (self.failures - 1), 600.0)
+        logger.warning("Replica %s unavailable, reading from the primary: %s", self.name, error)
+    
+    def stats(self) -> Dict:
+        stats = {
+            'lag': self.lag if self.lag is not None else -1,
+            'latency_ms': (self.latency or 0.0) * 1000,
+            'down': int(time.monotonic() < self.down_until),
+        }
+        if self.pool:
+            stats['in_use'] = self.pool.stats()['in_use']
+        return stats
 
 class DatabaseConnection:
     """Handle MySQL database connection and operations"""
     
-    def __init__(self, host='localhost', user='root', password='', database='grant_management'):
+    # SQL dialect of schema_<dialect>.sql and migrations/<dialect>/, which replace
+    # the MySQL files where present; see _dialect_schema() and _migration_files()
+    dialect = 'mysql'
+    
+    def __init__(self, host='localhost', user='root', password='', database='grant_management',
+                 pool_min_size: int = 1, pool_max_size: int = 10, pool_timeout: float = 30.0,
+                 cache_size: int = 0, cache_ttl: float = 60.0,
+                 instrument: bool = True, slow_query_ms: Optional[float] = None,
+                 replicas: List[Dict] = (), replica_policy: str = 'round_robin',
+                 max_replica_lag: float = 5.0, lag_check_interval: float = 1.0):
         self.host = host
         self.user = user
         self.password = password
         self.database = database
-        self.connection = None
+        self.pool_min_size = pool_min_size
+        self.pool_max_size = pool_max_size
+        self.pool_timeout = pool_timeout
+        self.pool = None
+        # Thread ident -> connections it has checked out, so its statements can be killed
+        self._active = {}
+        self._active_lock = threading.Lock()
+        # Shared by every session using this connection; disabled when cache_size is 0
+        self.cache = QueryCache(cache_size, cache_ttl) if cache_size else None
+        # Called with an event dict after every statement; see _emit()
+        self.hooks = []
+        self.query_stats = QueryStats() if instrument else None
+        if self.query_stats:
+            self.add_query_hook(self.query_stats)
+        self.slow_queries = SlowQueryLog(self, slow_query_ms) if slow_query_ms is not None else None
+        if self.slow_queries:
+            self.add_query_hook(self.slow_queries)
+        # Last change sequence seen per table; see note_change_sequences()
+        self._change_sequences = {}
+        # The transaction() block open on each thread, if any
+        self._local = threading.local()
+        # Read replicas; each dict may override host, port, user, password and database
+        if replica_policy not in ('round_robin', 'least_latency'):
+            raise ValueError(f"replica_policy must be 'round_robin' or 'least_latency', not {replica_policy!r}")
+        self.replicas = [Replica(**{'user': user, 'password': password, 'database': database, **config})
+                         for config in replicas]
+        self.replica_policy = replica_policy
+        self.max_replica_lag = max_replica_lag
+        self.lag_check_interval = lag_check_interval
+        self._round_robin = itertools.count()
+        # Session -> monotonic time of its last write, for read-your-writes; see begin_session()
+        self._session = ContextVar(f"read_session_{id(self)}", default=None)
+        self._last_write = {}
+        self._last_write_lock = threading.Lock()
+    
+    def _new_connection(self):
+        return pymysql.connect(
+            host=self.host,
+            user=self.user,
+            password=self.password,
+            database=self.database
+        )
         
+    def _open_pool(self):
+        if self.pool is None:
+            self.pool = ConnectionPool(self._new_connection, self.pool_min_size,
+                                       self.pool_max_size, self.pool_timeout)
+        self.pool.fill()
+        for replica in self.replicas:
+            # Opened lazily, so an unreachable replica never stops the app from starting
+            if replica.pool is None:
+                replica.pool = ConnectionPool(replica.new_connection, 0, self.pool_max_size,
+                                              self.pool_timeout)
+    
     def connect(self):
-        """Establish database connection"""
+        """Create the connection pool and open its minimum number of connections"""
         try:
-            self.connection = pymysql.connect(
-                host=self.host,
-                user=self.user,
-                password=self.password,
-                database=self.database
-            )
-            if self.connection.open:
-                return True, "Connected to MySQL database"
+            self._open_pool()
+            with self.pool.connection() as conn:
+                if conn.open:
+                    return True, "Connected to MySQL database"
+            return False, "Error: connection is not open"
         except Error as e:
             return False, f"Error: {str(e)}"
     
     def disconnect(self):
-        """Close database connection"""
-        if self.connection and self.connection.open:
-            self.connection.close()
+        """Close all pooled connections"""
+        if self.pool:
+            self.pool.close()
+            self.pool = None
+        for replica in self.replicas:
+            if replica.pool:
+                replica.pool.close()
+                replica.pool = None
+    
+    @contextmanager
+    def connection(self, replica: Replica = None):
+        """Check out a pooled connection (from replica's pool if given) for the duration of a with block"""
+        pool = replica.pool if replica is not None else self.pool
+        if pool is None:
+            raise Error("Not connected; call connect() first")
+        owner = threading.get_ident()
+        with pool.connection() as conn:
+            entry = (conn, replica)
+            with self._active_lock:
+                self._active.setdefault(owner, []).append(entry)
+            try:
+                yield conn
+            finally:
+                with self._active_lock:
+                    held = self._active[owner]
+                    held.remove(entry)
+                    if not held:
+                        del self._active[owner]
+    
+    def kill_queries(self, thread_ident: int) -> int:
+        """Abort the statements running on connections held by a thread (KILL QUERY).
+        
+        Uses fresh connections, since the pool may be exhausted. The KILLs are
+        sent while holding the registry lock, so a connection the thread
+        releases meanwhile cannot be killed under its next user. The killed
+        statements fail with a database error in their own thread.
+        """
+        with self._active_lock:
+            servers = {replica for _, replica in self._active.get(thread_ident, ())}
+        # KILL QUERY only works on the server that runs the statement; connect outside the lock
+        killers = {}
+        for replica in servers:
+            try:
+                killers[replica] = replica.new_connection() if replica is not None else self._new_connection()
+            except Error:
+                continue
+        killed = 0
+        try:
+            with self._active_lock:
+                for conn, replica in self._active.get(thread_ident, ()):
+                    if replica not in killers:
+                        continue
+                    try:
+                        with killers[replica].cursor() as cursor:
+                            cursor.execute("KILL QUERY %s", (conn.thread_id(),))
+                        killed += 1
+                    except Error:
+                        pass  # finished in the meantime
+        finally:
+            for killer in killers.values():
+                killer.close()
+        return killed
+    
+    def pool_stats(self) -> Dict:
+        """Pool size and checkout-wait metrics"""
+        return self.pool.stats() if self.pool else {}
+    
+    def replica_stats(self) -> Dict[str, Dict]:
+        """Lag, read latency and availability per replica, keyed by host:port"""
+        return {replica.name: replica.stats() for replica in self.replicas}
+    
+    def begin_session(self, session_id):
+        """Tie this context's statements to a session, e.g. at the top of a Streamlit rerun.
+        
+        A session's reads go to the primary for a while after it writes, so it
+        never reads a replica that has not applied its own writes yet. Without
+        a session the thread is the unit.
+        """
+        self._session.set(session_id)
+    
+    def _session_key(self):
+        session = self._session.get()
+        return session if session is not None else threading.get_ident()
+    
+    def _sticky_window(self) -> float:
+        # A usable replica is at most max_replica_lag behind, as of up to one check ago
+        return self.max_replica_lag + self.lag_check_interval
+    
+    def _note_write(self):
+        if not self.replicas:
+            return
+        now = time.monotonic()
+        with self._last_write_lock:
+            self._last_write[self._session_key()] = now
+            if len(self._last_write) > 1000:
+                window = self._sticky_window()
+                self._last_write = {k: t for k, t in self._last_write.items() if now - t < window}
+    
+    def _pick_replica(self) -> Optional[Replica]:
+        """Replica to read from, or None for the primary"""
+        if not self.replicas or self.pool is None or self.in_transaction():
+            return None
+        last_write = self._last_write.get(self._session_key())
+        if last_write is not None and time.monotonic() - last_write < self._sticky_window():
+            return None
+        candidates = [replica for replica in self.replicas
+                      if replica.usable(self.max_replica_lag, self.lag_check_interval)]
+        if not candidates:
+            return None
+        if self.replica_policy == 'least_latency':
+            # Unmeasured replicas count as fastest, so each gets tried
+            return min(candidates, key=lambda replica: replica.latency or 0.0)
+        return candidates[next(self._round_robin) % len(candidates)]
+    
+    def _route_read(self, run):
+        """(result, replica) of run(connection) on a replica if one is usable, else on the primary.
+        
+        A replica that cannot be reached is skipped for a while and the read
+        is retried on the primary; statement errors are raised as they are.
+        """
+        replica = self._pick_replica()
+        if replica is not None:
+            started = time.perf_counter()
+            try:
+                with self.connection(replica) as conn:
+                    result = run(conn)
+                replica.record(time.perf_counter() - started)
+                return result, replica
+            except Error as e:
+                if not _is_connection_failure(e):
+                    raise
+                replica.mark_down(e)
+        with self._statement_connection() as (conn, _):
+            return run(conn), None
+    
+    def cache_stats(self) -> Dict:
+        """Query cache hit/miss counters"""
+        return self.cache.stats() if self.cache else {}
+    
+    def add_query_hook(self, hook):
+        """Register a callable that receives an event dict after every statement.
+        
+        Event keys: kind ('read', 'write', 'batch' or 'stream'), query, params,
+        fingerprint, caller, seconds, rows, bytes, ok and cached. Hooks run on
+        the querying thread after its connection is returned to the pool.
+        """
+        self.hooks.append(hook)
+    
+    def remove_query_hook(self, hook):
+        if hook in self.hooks:
+            self.hooks.remove(hook)
+    
+    def _emit(self, kind: str, query: str, params, started: float, ok: bool = True,
+              rows: int = 0, nbytes: int = 0, cached: bool = False, seconds: float = None):
+        if not self.hooks:
+            return
+        event = {
+            'kind': kind, 'query': query, 'params': params,
+            'fingerprint': fingerprint_sql(query), 'caller': _calling_operation(3),
+            'seconds': time.perf_counter() - started if seconds is None else seconds,
+            'rows': rows, 'bytes': nbytes,
+            'ok': ok, 'cached': cached,
+        }
+        for hook in list(self.hooks):
+            try:
+                hook(event)
+            except Exception:
+                # Instrumentation must never break the query path
+                logger.exception("Query hook %r failed", hook)
+    
+    def note_change_sequences(self, sequences: Dict[str, int]) -> List[str]:
+        """Invalidate cached reads of every table whose change sequence moved since it was last seen.
+        
+        Writes made by other processes never reach this process's query cache,
+        so callers that poll the sequences (ChangeOperations.sequences) keep the
+        cache coherent with them. Returns the tables that moved.
+        """
+        moved = [table for table, seq in sequences.items() if self._change_sequences.get(table) != seq]
+        self._change_sequences.update(sequences)
+        if self.cache and moved:
+            self.cache.invalidate(moved)
+        return moved
+    
+    def explain(self, query: str, params: tuple = None) -> List[Dict]:
+        """EXPLAIN plan rows for a DML statement, bypassing the cache and query hooks"""
+        if normalize_sql(query).split(' ', 1)[0].upper() not in ('SELECT', 'INSERT', 'UPDATE',
+                                                                  'DELETE', 'REPLACE'):
+            return []
+        try:
+            with self.connection() as conn:
+                with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+                    cursor.execute("EXPLAIN " + query, params or None)
+                    return list(cursor.fetchall())
+        except Error as e:
+            return [{'error': str(e)}]
+    
+    def metrics_text(self) -> str:
+        """Query, pool and cache metrics in the Prometheus text exposition format"""
+        text = self.query_stats.prometheus_text() if self.query_stats else ""
+        lines = []
+        for group, stats in (('pool', self.pool_stats()), ('cache', self.cache_stats())):
+            for name, value in stats.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    lines.append(f"# TYPE grants_db_{group}_{name} gauge")
+                    lines.append(f"grants_db_{group}_{name} {value}")
+        replicas = self.replica_stats()
+        for name in next(iter(replicas.values()), {}):
+            lines.append(f"# TYPE grants_db_replica_{name} gauge")
+            for replica, stats in replicas.items():
+                lines.append(f'grants_db_replica_{name}{{replica="{replica}"}} {stats.get(name, 0)}')
+        return text + ("\n".join(lines) + "\n" if lines else "")
+    
+    def in_transaction(self) -> bool:
+        """Whether this thread is inside a transaction() block"""
+        return getattr(self._local, 'transaction', None) is not None
+    
+    @contextmanager
+    def transaction(self):
+        """Run every statement this thread issues inside the block as one transaction.
+        
+        Operations methods called in the block use its connection, see its
+        uncommitted writes and bypass the query cache; the commit happens
+        when the outermost block exits. A nested block is a savepoint and
+        rolls back on its own when it raises. Any statement that fails in a
+        block, even one whose Operations method only returned (False, msg),
+        makes that block roll back and raise the error on exit. The block's
+        code cannot be re-run from here, so deadlocks are retried by
+        run_in_transaction, not by this context manager.
+        """
+        tx = getattr(self._local, 'transaction', None)
+        if tx is None:
+            with self.connection() as conn:
+                tx = _Transaction(conn)
+                self._local.transaction = tx
+                try:
+                    conn.begin()
+                    yield tx
+                    failure = tx.lost or tx.failures[0]
+                    if failure is not None:
+                        raise failure
+                    conn.commit()
+                except BaseException:
+                    try:
+                        conn.rollback()
+                    except Error:
+                        pass  # the connection is gone, taking the transaction with it
+                    raise
+                finally:
+                    self._local.transaction = None
+            if tx.tables:
+                self._note_write()
+            if self.cache:
+                self.cache.invalidate(tx.tables)
+            return
+        
+        savepoint = f"sp_{tx.depth}"
+        tx.execute(f"SAVEPOINT {savepoint}")
+        tx.depth += 1
+        tx.failures.append(None)
+        try:
+            yield tx
+            failure = tx.lost or tx.failures[-1]
+            if failure is not None:
+                raise failure
+        except BaseException as e:
+            if isinstance(e, Error):
+                tx.fail(e)
+            if tx.lost is None:
+                tx.execute(f"ROLLBACK TO SAVEPOINT {savepoint}")
+            raise
+        else:
+            tx.execute(f"RELEASE SAVEPOINT {savepoint}")
+        finally:
+            tx.depth -= 1
+            tx.failures.pop()
+    
+    @contextmanager
+    def _statement_connection(self):
+        """Yield (connection, transaction): the open transaction's connection, or a pooled one"""
+        tx = getattr(self._local, 'transaction', None)
+        if tx is not None:
+            yield tx.conn, tx
+        else:
+            with self.connection() as conn:
+                yield conn, None
+    
+    def _written(self, tx: Optional[_Transaction], tables):
+        """Invalidate cached reads of tables now, or when the open transaction commits"""
+        if tx is not None:
+            tx.tables |= set(tables)
+            return
+        self._note_write()
+        if self.cache:
+            self.cache.invalidate(tables)
+    
+    def _failed(self, error: Error):
+        tx = getattr(self._local, 'transaction', None)
+        if tx is not None:
+            tx.fail(error)
     
     def execute_query(self, query: str, params: tuple = None) -> Tuple[bool, str]:
         """Execute INSERT, UPDATE, DELETE queries"""
+        started = time.perf_counter()
         try:
-            cursor = self.connection.cursor()
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-            self.connection.commit()
-            cursor.close()
+            with self._statement_connection() as (conn, tx):
+                cursor = conn.cursor()
+                try:
+                    if params:
+                        cursor.execute(query, params)
+                    else:
+                        cursor.execute(query)
+                    if tx is None:
+                        conn.commit()
+                    affected = cursor.rowcount
+                except Error:
+                    if tx is None:
+                        conn.rollback()
+                    raise
+                finally:
+                    cursor.close()
+            self._written(tx, tables_in(query))
+            self._emit('write', query, params, started, rows=max(affected, 0))
             return True, "Query executed successfully"
         except Error as e:
+            self._failed(e)
+            self._emit('write', query, params, started, ok=False)
             return False, f"Error: {str(e)}"
     
-    def fetch_query(self, query: str, params: tuple = None) -> Tuple[bool, any]:
-        """Execute SELECT queries and return results"""
+    def run_in_transaction(self, work, retries: int = 3, backoff: float = 0.05) -> Tuple[bool, any]:
+        """Call work(cursor) in a transaction and commit, or roll back on a database error.
+        
+        Returns (True, work's result) or (False, error message). On its own,
+        a deadlock or lock wait timeout reruns work up to retries times after
+        an exponential, jittered backoff; inside a transaction() block it
+        becomes a savepoint, and a failure dooms the enclosing block instead.
+        Tables the statements wrote to are invalidated in the query cache.
+        """
+        outermost = not self.in_transaction()
+        attempt = 0
+        while True:
+            tracked = None
+            try:
+                with self.transaction() as tx:
+                    tracked = _TrackedCursor(tx.conn.cursor())
+                    try:
+                        result = work(tracked)
+                    finally:
+                        tracked.close()
+                        tx.tables |= tracked.tables
+                return True, result
+            except Error as e:
+                if outermost and attempt < retries and e.args and e.args[0] in RETRYABLE_ERRORS:
+                    attempt += 1
+                    time.sleep(backoff * 2 ** (attempt - 1) * (1 + random.random()))
+                    continue
+                self._failed(e)
+                return False, f"Error: {str(e)}"
+            finally:
+                if tracked is not None:
+                    for kind, query, params, started, ended, ok, rows in tracked.events:
+                        self._emit(kind, query, params, started, ok=ok, rows=rows,
+                                   seconds=ended - started)
+    
+    def max_allowed_packet(self) -> int:
+        """Server max_allowed_packet in bytes, read once per connection object"""
+        if getattr(self, '_max_allowed_packet', None) is None:
+            success, result = self.fetch_query("SELECT @@max_allowed_packet AS v", use_cache=False)
+            self._max_allowed_packet = int(result[0]['v']) if success and result else 4 * 1024 * 1024
+        return self._max_allowed_packet
+    
+    def execute_batch(self, query: str, param_rows: List[tuple]) -> Tuple[bool, str]:
+        """Execute one INSERT ... VALUES statement for many parameter rows in a single transaction.
+        
+        pymysql rewrites the statement into multi-row INSERTs, each kept below
+        the server's max_allowed_packet.
+        """
+        stmt_limit = max(1024, min(self.max_allowed_packet() - 4096, 8 * 1024 * 1024))
+        started = time.perf_counter()
         try:
-            cursor = self.connection.cursor(pymysql.cursors.DictCursor)
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-            result = cursor.fetchall()
-            cursor.close()
+            with self._statement_connection() as (conn, tx):
+                cursor = conn.cursor()
+                cursor.max_stmt_length = stmt_limit
+                try:
+                    cursor.executemany(query, param_rows)
+                    if tx is None:
+                        conn.commit()
+                except Error:
+                    if tx is None:
+                        conn.rollback()
+                    raise
+                finally:
+                    cursor.close()
+            self._written(tx, tables_in(query))
+            self._emit('batch', query, None, started, rows=len(param_rows),
+                       nbytes=_estimate_bytes(param_rows))
+            return True, f"{len(param_rows)} rows written"
+        except Error as e:
+            self._failed(e)
+            self._emit('batch', query, None, started, ok=False)
+            return False, f"Error: {str(e)}"
+    
+    def fetch_query(self, query: str, params: tuple = None, use_cache: bool = True) -> Tuple[bool, any]:
+        """Execute SELECT queries and return results.
+        
+        Results are served from the query cache when one is configured; cached
+        rows are shared between callers and must be treated as read-only.
+        Inside a transaction() block the cache is bypassed. Reads go to a
+        replica when one is configured and usable; see _pick_replica().
+        """
+        started = time.perf_counter()
+        key = None
+        if self.cache and use_cache and not self.in_transaction():
+            key = QueryCache.make_key(query, params)
+            cached = self.cache.get(key)
+            if cached is not None:
+                self._emit('read', query, params, started, rows=len(cached), cached=True)
+                return True, cached
+            version = self.cache.version()
+        
+        def run(conn):
+            cursor = conn.cursor(pymysql.cursors.DictCursor)
+            try:
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+        try:
+            result, replica = self._route_read(run)
+            if key is not None:
+                self.cache.put(key, result, version, settle=self._sticky_window() if replica else 0.0)
+            self._emit('read', query, params, started, rows=len(result),
+                       nbytes=_estimate_bytes(result))
             return True, result
         except Error as e:
+            self._failed(e)
+            self._emit('read', query, params, started, ok=False)
+            return False, f"Error: {str(e)}"
+    
+    def fetch_records(self, query: str, params: tuple = None, record_type: type = None,
+                      categories: tuple = (), use_cache: bool = True) -> Tuple[bool, any]:
+        """Execute a SELECT and return its rows as a RecordList of record_type.
+        
+        Rows come from a plain tuple cursor and become named tuples without
+        an intermediate dict; record_type's fields must match the SELECT list
+        (by default a type is made from the column names). pandas is not
+        needed unless the caller asks for .to_frame(). Cached lists are shared
+        between callers and must be treated as read-only.
+        """
+        started = time.perf_counter()
+        key = None
+        if self.cache and use_cache and not self.in_transaction():
+            key = QueryCache.make_key(query, params) + ('records', record_type, tuple(categories))
+            cached = self.cache.get(key)
+            if cached is not None:
+                self._emit('read', query, params, started, rows=len(cached), cached=True)
+                return True, cached
+            version = self.cache.version()
+        
+        def run(conn):
+            cursor = conn.cursor()
+            try:
+                cursor.execute(query, params or None)
+                return cursor.description, cursor.fetchall()
+            finally:
+                cursor.close()
+        try:
+            (description, rows), replica = self._route_read(run)
+            make = (record_type or _row_type(tuple(column[0] for column in description)))._make
+            records = RecordList(map(make, rows), description, categories)
+            if key is not None:
+                self.cache.put(key, records, version, settle=self._sticky_window() if replica else 0.0)
+            self._emit('read', query, params, started, rows=len(records),
+                       nbytes=_estimate_bytes(rows))
+            return True, records
+        except Error as e:
+            self._failed(e)
+            self._emit('read', query, params, started, ok=False)
+            return False, f"Error: {str(e)}"
+    
+    def fetch_frame(self, query: str, params: tuple = None, categories: tuple = (),
+                    decimals: str = 'float', chunk_size: int = 10000,
+                    use_cache: bool = True) -> Tuple[bool, any]:
+        """Execute a SELECT and return a typed DataFrame built column by column.
+        
+        Rows are read as tuples in chunks and converted straight into NumPy
+        columns: integers keep their MySQL width (INT -> int32, nullable Int32
+        when NULLs occur), DECIMAL becomes float64 (or int64 cents with
+        decimals='cents'), DATE becomes datetime64 and the named categories
+        columns become categoricals. Cached frames are shared between callers
+        and must be treated as read-only.
+        """
+        if decimals not in ('float', 'cents'):
+            raise ValueError(f"decimals must be 'float' or 'cents', not {decimals!r}")
+        started = time.perf_counter()
+        key = None
+        if self.cache and use_cache and not self.in_transaction():
+            key = QueryCache.make_key(query, params) + ('frame', tuple(categories), decimals)
+            cached = self.cache.get(key)
+            if cached is not None:
+                self._emit('read', query, params, started, rows=len(cached), cached=True)
+                return True, cached
+            version = self.cache.version()
+        
+        def run(conn):
+            nbytes = 0
+            chunks = []
+            cursor = conn.cursor(pymysql.cursors.SSCursor)
+            try:
+                cursor.execute(query, params or None)
+                description = cursor.description
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    nbytes += _estimate_bytes(rows)
+                    chunks.append([_typed_column(values, column[1], decimals)
+                                   for values, column in zip(zip(*rows), description)])
+            finally:
+                cursor.close()
+            return description, chunks, nbytes
+        try:
+            (description, chunks, nbytes), replica = self._route_read(run)
+            names = [column[0] for column in description]
+            if not chunks:
+                frame = pd.DataFrame(columns=names)
+            else:
+                frame = pd.DataFrame({
+                    name: (chunks[0][i] if len(chunks) == 1
+                           else pd.concat([chunk[i] for chunk in chunks], ignore_index=True))
+                    for i, name in enumerate(names)
+                })
+            for name in categories:
+                if name in frame:
+                    frame[name] = frame[name].astype('category')
+            if key is not None:
+                self.cache.put(key, frame, version, settle=self._sticky_window() if replica else 0.0)
+            self._emit('read', query, params, started, rows=len(frame), nbytes=nbytes)
+            return True, frame
+        except Error as e:
+            self._failed(e)
+            self._emit('read', query, params, started, ok=False)
             return False, f"Error: {str(e)}"
     
+    def stream_query(self, query: str, params: tuple = None,
+                     chunk_size: int = 10000) -> Iterator[Tuple[tuple, List[tuple]]]:
+        """Yield (cursor.description, rows) chunks from an unbuffered server-side cursor.
+        
+        Only one chunk is held in memory at a time; an empty result yields a
+        single chunk with no rows, so its columns are still known. The pooled
+        connection stays checked out until the generator is exhausted or closed. Streams always
+        use a connection of their own, so they do not see the uncommitted
+        writes of an open transaction() block. They read from a replica when
+        one is usable; a replica that fails is skipped from then on, but the
+        failed stream is not restarted.
+        """
+        started = time.perf_counter()
+        total = nbytes = 0
+        ok = True
+        replica = self._pick_replica()
+        try:
+            with self.connection(replica) as conn:
+                cursor = conn.cursor(pymysql.cursors.SSCursor)
+                try:
+                    cursor.execute(query, params)
+                    while True:
+                        rows = cursor.fetchmany(chunk_size)
+                        if not rows:
+                            break
+                        total += len(rows)
+                        nbytes += _estimate_bytes(rows)
+                        yield cursor.description, rows
+                    if not total and cursor.description:
+                        yield cursor.description, []
+                finally:
+                    cursor.close()
+        except Error as e:
+            ok = False
+            if replica is not None and _is_connection_failure(e):
+                replica.mark_down(e)
+            raise
+        finally:
+            # Emitted after the connection is released; covers time spent by the consumer too
+            self._emit('stream', query, params, started, ok=ok, rows=total, nbytes=nbytes)
+    
+    @contextmanager
+    def _script_connection(self, use_database: bool = True):
+        """Dedicated connection with multi-statement support, for running SQL scripts.
+        
+        Kept out of the pool so ordinary queries never run with multi-statements on.
+        """
+        conn = pymysql.connect(
+            host=self.host,
+            user=self.user,
+            password=self.password,
+            database=self.database if use_database else None,
+            client_flag=CLIENT.MULTI_STATEMENTS
+        )
+        try:
+            yield conn
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def _run_script(conn, statements: List[str]):
+        """Run statements and commit, batched into multi-statement round trips when the connection allows it"""
+        if conn.client_flag & CLIENT.MULTI_STATEMENTS:
+            statements = batch_sql_statements(statements)
+        cursor = conn.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+                # Errors in later statements of a batch surface while draining the results
+                while cursor.nextset():
+                    pass
+            conn.commit()
+        finally:
+            cursor.close()
+    
     def create_database(self) -> Tuple[bool, str]:
         """Create the database if it doesn't exist"""
         try:
-            conn = pymysql.connect(
-                host=self.host,
-                user=self.user,
-                password=self.password
-            )
-            cursor = conn.cursor()
-            cursor.execute(f"CREATE DATABASE IF NOT EXISTS {self.database}")
-            cursor.close()
-            conn.close()
+            with self._script_connection(use_database=False) as conn:
+                self._run_script(conn, [f"CREATE DATABASE IF NOT EXISTS `{self.database}`"])
             return True, f"Database {self.database} created/verified"
         except Error as e:
             return False, f"Error: {str(e)}"
     
+    def _dialect_schema(self, schema_file: str) -> str:
+        """schema_file, or its schema_<dialect>.sql sibling when there is one"""
+        root, ext = os.path.splitext(schema_file)
+        candidate = f"{root}_{self.dialect}{ext}"
+        return candidate if os.path.exists(candidate) else schema_file
+    
+    def _migration_files(self, directory: str) -> List[Tuple[int, str, str]]:
+        """list_migrations(directory), with same-numbered files from directory/<dialect> taking precedence"""
+        overrides = {version: (version, name, path)
+                     for version, name, path in list_migrations(os.path.join(directory, self.dialect))}
+        return [overrides.get(version, (version, name, path))
+                for version, name, path in list_migrations(directory)]
+    
+    def _install_schema(self, conn, schema_file: str) -> int:
+        """Run the baseline schema then every migration on conn; returns migrations applied"""
+        with open(self._dialect_schema(schema_file), 'r') as file:
+            self._run_script(conn, split_sql_statements(file.read()))
+        return self._apply_migrations(conn, os.path.join(os.path.dirname(schema_file), MIGRATIONS_DIR))
+    
     def initialize_schema(self, schema_file: str = 'schema.sql') -> Tuple[bool, str]:
         """Execute schema.sql file to create tables"""
         try:
-            with open(schema_file, 'r') as file:
-                sql_script = file.read()
-            
-            # Split by semicolons and execute each statement
-            statements = sql_script.split(';')
-            cursor = self.connection.cursor()
-            
-            for statement in statements:
-                statement = statement.strip()
-                if statement:
-                    cursor.execute(statement)
+            with self._script_connection() as conn:
+                applied = self._install_schema(conn, schema_file)
+        except Error as e:
+            return False, f"Error: {str(e)}"
+        except FileNotFoundError:
+            return False, "schema.sql file not found"
+        finally:
+            if self.cache:
+                self.cache.clear()
+        return True, f"Schema initialized successfully; {applied} migration(s) applied"
+    
+    def bootstrap(self, schema_file: str = 'schema.sql') -> Tuple[bool, str]:
+        """Connect and make sure the schema is current, doing no DDL when it already is.
+        
+        The database, baseline schema and migrations are only created when
+        missing. When the stored schema version is current this costs one
+        query on a pooled connection.
+        """
+        directory = os.path.join(os.path.dirname(schema_file), MIGRATIONS_DIR)
+        available = self._migration_files(directory)
+        try:
+            try:
+                self._open_pool()
+            except pymysql.err.OperationalError as e:
+                if e.args[0] != ER.BAD_DB_ERROR:
+                    raise
+                self.disconnect()
+                with self._script_connection(use_database=False) as conn:
+                    self._run_script(conn, [f"CREATE DATABASE IF NOT EXISTS `{self.database}`",
+                                            f"USE `{self.database}`"])
+                    self._install_schema(conn, schema_file)
+                self._open_pool()
+                return True, "Database created and schema installed"
             
-            self.connection.commit()
-            cursor.close()
-            return True, "Schema initialized successfully"
+            applied_count, applied_max = self._stored_schema_version()
+            if applied_count is not None:
+                if (applied_count, applied_max) == (len(available), max((v for v, _, _ in available), default=0)):
+                    return True, "Schema is up to date"
+                return self.migrate(directory)
+            if self._has_baseline_tables():
+                # Tables predate migration tracking: upgrade in place, keeping the data
+                return self.migrate(directory)
+            with self._script_connection() as conn:
+                self._install_schema(conn, schema_file)
+            if self.cache:
+                self.cache.clear()
+            return True, "Schema installed"
         except Error as e:
             return False, f"Error: {str(e)}"
         except FileNotFoundError:
             return False, "schema.sql file not found"
+    
+    def _stored_schema_version(self) -> Tuple[Optional[int], int]:
+        """(number of applied migrations, highest version), or (None, 0) if untracked"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SELECT COUNT(*), COALESCE(MAX(version), 0) FROM schema_migrations")
+                count, version = cursor.fetchone()
+                return int(count), int(version)
+            except pymysql.err.ProgrammingError as e:
+                if e.args[0] != ER.NO_SUCH_TABLE:
+                    raise
+                return None, 0
+            finally:
+                cursor.close()
+    
+    def _has_baseline_tables(self) -> bool:
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("""SELECT COUNT(*) FROM information_schema.tables
+                                  WHERE table_schema = DATABASE() AND table_name = 'GRANT_TABLE'""")
+                return cursor.fetchone()[0] > 0
+            finally:
+                cursor.close()
+    
+    def _ensure_migrations_table(self, cursor):
+        cursor.execute("""CREATE TABLE IF NOT EXISTS schema_migrations (
+                              version INT PRIMARY KEY,
+                              name VARCHAR(255) NOT NULL,
+                              applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                          )""")
+    
+    def _apply_migrations(self, conn, directory: str) -> int:
+        """Apply every migration in directory not yet recorded on conn's database"""
+        cursor = conn.cursor()
+        try:
+            self._ensure_migrations_table(cursor)
+            cursor.execute("SELECT version FROM schema_migrations")
+            done = {int(row[0]) for row in cursor.fetchall()}
+        finally:
+            cursor.close()
+        pending = [(v, name, path) for v, name, path in self._migration_files(directory) if v not in done]
+        for version, name, path in pending:
+            with open(path, 'r') as file:
+                statements = split_sql_statements(file.read())
+            statements.append(f"INSERT INTO schema_migrations (version, name) "
+                              f"VALUES ({int(version)}, {conn.escape(name)})")
+            self._run_script(conn, statements)
+        return len(pending)
+    
+    def migration_status(self, directory: str = MIGRATIONS_DIR) -> Tuple[List[Tuple[int, str]], List[Tuple[int, str]]]:
+        """(applied, pending) lists of (version, name) migrations"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                self._ensure_migrations_table(cursor)
+                conn.commit()
+                cursor.execute("SELECT version, name FROM schema_migrations ORDER BY version")
+                applied = [(int(v), n) for v, n in cursor.fetchall()]
+            finally:
+                cursor.close()
+        done = {v for v, _ in applied}
+        pending = [(v, n) for v, n, _ in self._migration_files(directory) if v not in done]
+        return applied, pending
+    
+    def migrate(self, directory: str = MIGRATIONS_DIR) -> Tuple[bool, str]:
+        """Apply pending versioned migrations in order, without touching existing data.
+        
+        MySQL auto-commits DDL, so each migration is recorded as soon as it has
+        run; a failure leaves the earlier ones applied and stops there.
+        """
+        try:
+            with self.connection() as conn:
+                applied = self._apply_migrations(conn, directory)
+            if self.cache and applied:
+                self.cache.clear()
+            return True, f"{applied} migration(s) applied"
+        except Error as e:
+            return False, f"Error: {str(e)}"
+        except FileNotFoundError as e:
+            return False, f"Error: {str(e)}"
 
-# ==================== DIVISION OPERATIONS ====================
-class DivisionOperations:
+# Backend name -> "module:class" of its DatabaseConnection, imported on first use
+BACKENDS = {
+    'mysql': 'db_operations:DatabaseConnection',
+    'sqlite': 'sqlite_backend:SQLiteConnection',
+}
+
+def open_database(backend: str = 'mysql', **settings) -> DatabaseConnection:
+    """A DatabaseConnection for one of BACKENDS, constructed from settings"""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}; expected one of {list(BACKENDS)}")
+    module, name = BACKENDS[backend].split(':')
+    return getattr(importlib.import_module(module), name)(**settings)
+
+def configured_database(**settings) -> DatabaseConnection:
+    """open_database() for config.py's DB_BACKEND and connection settings.
+    
+    settings (pool sizes, cache, ...) are passed through; DB_REPLICAS apply to
+    the MySQL backend only. The app, api.py and export.py all connect here.
+    """
+    from config import DB_BACKEND, DB_CONFIG, DB_REPLICAS, SQLITE_CONFIG
+    
+    if DB_BACKEND == 'sqlite':
+        return open_database('sqlite', **SQLITE_CONFIG, **settings)
+    return open_database(DB_BACKEND, **DB_CONFIG, replicas=DB_REPLICAS, **settings)
+
+# ==================== SHARED TABLE OPERATIONS ====================
+# Maintained on every table by migrations/005_change_tracking.sql
+TRACKING_COLUMNS = ('updated_at', 'row_version')
+
+class TableOperations:
+    """Behaviour shared by the per-table Operations classes"""
+    
+    table = None           # table name in schema.sql
+    alias = None           # alias used for the table in select_sql
+    key_columns = ()       # primary key columns, in index order
+    sort_columns = ()      # columns read_page may order by (tie-broken by the key)
+    select_sql = None      # base SELECT with every display join; built from display_joins
+    label_column = None    # column used for picker labels and type-ahead search
+    label_length = 40      # labels are truncated to this many characters in SQL
+    label_fulltext = False  # label_column is TEXT with a FULLTEXT index (migrations/002_fulltext_search.sql)
+    insert_columns = ()    # writable non-key columns, in INSERT order
+    category_columns = ()  # low-cardinality text columns returned as categoricals
+    display_joins = ()     # (table, alias, ON condition) triples LEFT JOINed for display columns
+    display_columns = {}   # joined display column -> (join alias, column of the joined table)
+    readable_columns = ()  # what a columns= projection may name: own columns, then display columns
+    maintains_rollups = False  # writes feed the funding rollups (see RollupOperations)
+    record_name = None     # name of the Record type for the table's own columns
+    record_type = None     # built from key_columns + insert_columns for each subclass
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.record_name:
+            cls.record_type = record_class(cls.record_name,
+                                           list(dict.fromkeys(cls.key_columns + cls.insert_columns)))
+        if cls.table:
+            cls.readable_columns = tuple(dict.fromkeys(
+                cls.key_columns + cls.insert_columns + TRACKING_COLUMNS + tuple(cls.display_columns)))
+        if cls.display_joins:
+            cls.select_sql = cls._select_sql(f"{cls.alias}.*", list(cls.display_columns),
+                                             [alias for _, alias, _ in cls.display_joins])
+    
+    @classmethod
+    def _select_sql(cls, own: str, display: List[str], aliases: List[str]) -> str:
+        """SELECT of own (a column list) plus the display columns, joining only the given aliases"""
+        select = [own] if own else []
+        select += [f"{cls.display_columns[c][0]}.{cls.display_columns[c][1]} AS {c}" for c in display]
+        joins = [f"LEFT JOIN {table} {alias} ON {on}" for table, alias, on in cls.display_joins
+                 if alias in aliases]
+        source = f"{cls.table} {cls.alias}" if cls.alias else cls.table
+        return f"SELECT {', '.join(select)} FROM {' '.join([source] + joins)}"
+    
     def __init__(self, db: DatabaseConnection):
         self.db = db
     
-    def create(self, name: str, description: str = None) -> Tuple[bool, str]:
-        query = "INSERT INTO DIVISION (name, description) VALUES (%s, %s)"
-        return self.db.execute_query(query, (name, description))
+    def _record_select(self, columns=None) -> str:
+        if columns is None:
+            return f"SELECT {', '.join(self.record_type._fields)} FROM {self.table}"
+        columns = self._projection(columns, self.key_columns)
+        joined = [c for c in columns if c in self.display_columns]
+        if joined:
+            raise ValueError(f"Records hold {self.table}'s own columns only, not {', '.join(joined)}")
+        return f"SELECT {', '.join(columns)} FROM {self.table}"
+    
+    def read_by_id(self, *key) -> Optional[Record]:
+        """The row with the given key values (in key_columns order) as a record, or None"""
+        if len(key) != len(self.key_columns):
+            raise ValueError(f"Expected {len(self.key_columns)} key values: {self.key_columns}")
+        where = " AND ".join(f"{column} = %s" for column in self.key_columns)
+        success, result = self.db.fetch_records(f"{self._record_select()} WHERE {where}", key,
+                                                self.record_type)
+        return result[0] if success and result else None
     
-    def read_all(self) -> pd.DataFrame:
-        success, result = self.db.fetch_query("SELECT * FROM DIVISION")
-        return pd.DataFrame(result) if success else pd.DataFrame()
+    def read_records(self, after_key: tuple = None, limit: int = None, columns=None) -> RecordList:
+        """The table's own columns as records in key order, keyset-paginated like read_page.
+        
+        The lightweight counterpart of read_all: no display joins and no
+        pandas; call .to_frame() on the result if a DataFrame is needed.
+        columns narrows the records to those of the table's own columns (the
+        key is always included); the records are then ad-hoc Row types.
+        """
+        query = self._record_select(columns)
+        params = []
+        if after_key is not None:
+            condition, params = _keyset_condition(list(self.key_columns), list(after_key), False)
+            query += f" WHERE {condition}"
+        query += " ORDER BY " + ", ".join(self.key_columns)
+        if limit is not None:
+            query += " LIMIT %s"
+            params.append(int(limit))
+        success, result = self.db.fetch_records(query, tuple(params),
+                                                self.record_type if columns is None else None,
+                                                self.category_columns)
+        return result if success else RecordList()
     
-    def read_by_id(self, division_id: int) -> Dict:
+    def _read_frame(self, query: str, params: tuple = None) -> pd.DataFrame:
+        success, result = self.db.fetch_frame(query, params, categories=self.category_columns)
+        return result if success else pd.DataFrame()
+    
+    def _qualify(self, column: str) -> str:
+        return f"{self.alias}.{column}" if self.alias else column
+    
+    def _projection(self, columns, required: tuple = ()) -> tuple:
+        """columns checked against readable_columns, with any missing required columns put first"""
+        if isinstance(columns, str):
+            columns = [columns]
+        columns = tuple(dict.fromkeys(columns))
+        unknown = [c for c in columns if c not in self.readable_columns]
+        if unknown:
+            raise ValueError(f"Cannot select {', '.join(map(repr, unknown))} from {self.table}; "
+                             f"choose from {', '.join(self.readable_columns)}")
+        if not columns:
+            raise ValueError("columns must name at least one column")
+        return tuple(c for c in required if c not in columns) + columns
+    
+    def _base_select(self, columns=None, where=()) -> str:
+        """The View All SELECT, or a projection of it when columns is given.
+        
+        A projection joins only the display tables its columns come from, plus
+        any whose alias the where conditions refer to, so a narrow read never
+        touches the other tables or the unselected (possibly TEXT) columns.
+        """
+        if columns is None:
+            return self.select_sql or f"SELECT * FROM {self.table}"
+        columns = self._projection(columns)
+        prefix = f"{self.alias}." if self.alias else ""
+        own = ", ".join(prefix + c for c in columns if c not in self.display_columns)
+        display = [c for c in columns if c in self.display_columns]
+        aliases = {self.display_columns[c][0] for c in display}
+        aliases.update(alias for _, alias, _ in self.display_joins
+                       if any(re.search(rf"\b{alias}\.", condition) for condition, _ in where))
+        return self._select_sql(own, display, aliases)
+    
+    def count(self) -> int:
+        """Total number of rows in the table"""
+        success, result = self.db.fetch_query(f"SELECT COUNT(*) AS n FROM {self.table}")
+        return int(result[0]['n']) if success and result else 0
+    
+    def read_all(self, columns=None) -> pd.DataFrame:
+        """Every row with its display columns, or only the given readable_columns"""
+        return self._read_frame(self._base_select(columns))
+    
+    def read_page(self, after_key: tuple = None, limit: int = 50, order_by: str = None,
+                  descending: bool = False, where: List[Tuple[str, tuple]] = (),
+                  columns=None) -> Tuple[pd.DataFrame, Optional[tuple]]:
+        """Keyset-paginated read.
+        
+        after_key is the key returned for the previous page (None for the first
+        page) and limit, at least 1, the most rows to return. Returns the page
+        and the key to pass for the next one, or None when there are no more
+        rows. where holds extra (condition, params)
+        pairs ANDed into the query, as built by FilteredQuery. columns limits
+        the page to those readable_columns; the key and order_by columns are
+        always included, since the next key is read from them.
+        """
+        if int(limit) < 1:
+            raise ValueError(f"limit must be at least 1, not {limit}")
+        page_key = list(self.key_columns)
+        if order_by and order_by not in self.key_columns:
+            if order_by not in self.sort_columns:
+                raise ValueError(f"Cannot order {self.table} by {order_by!r}")
+            page_key.insert(0, order_by)
+        qualified = [self._qualify(c) for c in page_key]
+        direction = "DESC" if descending else "ASC"
+        
+        conditions = [condition for condition, _ in where]
+        params = [value for _, values in where for value in values]
+        if after_key is not None:
+            if len(after_key) != len(page_key):
+                raise ValueError(f"after_key must have {len(page_key)} values: {page_key}")
+            condition, key_params = _keyset_condition(qualified, list(after_key), descending)
+            conditions.append(condition)
+            params.extend(key_params)
+        if columns is not None:
+            columns = self._projection(columns, tuple(page_key))
+        query = self._base_select(columns, where)
+        if conditions:
+            query += " WHERE " + " AND ".join(f"({c})" for c in conditions)
+        query += " ORDER BY " + ", ".join(f"{c} {direction}" for c in qualified)
+        query += " LIMIT %s"
+        params.append(int(limit) + 1)
+        
+        frame = self._read_frame(query, tuple(params))
+        if len(frame) <= limit:
+            return frame, None
+        page = frame.iloc[:limit]
+        return page, tuple(_key_value(page[c].iloc[-1]) for c in page_key)
+
+    def select_query(self, columns=None) -> str:
+        """The SELECT (with display joins) that read_all runs, for the same columns"""
+        return self._base_select(columns)
+    
+    def _label_sql(self) -> str:
+        if not self.label_column or len(self.key_columns) != 1:
+            raise ValueError(f"{self.table} has no single-column id/label pair")
+        n = int(self.label_length)
+        return (f"CASE WHEN CHAR_LENGTH({self.label_column}) > {n} "
+                f"THEN CONCAT(LEFT({self.label_column}, {n}), '...') "
+                f"ELSE COALESCE({self.label_column}, '') END")
+    
+    def options(self, limit: int = None) -> List[Tuple[int, str]]:
+        """(id, short_label) pairs ordered by id, without reading any other column"""
+        key = self.key_columns[0]
+        query = f"SELECT {key} AS id, {self._label_sql()} AS label FROM {self.table} ORDER BY {key}"
+        params = None
+        if limit is not None:
+            query += " LIMIT %s"
+            params = (int(limit),)
+        success, result = self.db.fetch_query(query, params)
+        return [(row['id'], row['label']) for row in result] if success else []
+    
+    def labels(self, limit: int = None) -> Dict[int, str]:
+        """Dict of id -> short label, for O(1) lookups in selectbox format_func"""
+        return dict(self.options(limit))
+    
+    def label_for(self, record_id: int) -> Optional[str]:
+        """Short label of a single row, or None if it does not exist"""
+        key = self.key_columns[0]
         success, result = self.db.fetch_query(
-            "SELECT * FROM DIVISION WHERE division_id = %s", (division_id,)
+            f"SELECT {self._label_sql()} AS label FROM {self.table} WHERE {key} = %s", (record_id,)
         )
-        return result[0] if success and result else {}
+        return result[0]['label'] if success and result else None
+    
+    def search_options(self, term: str, limit: int = 20, prefix: bool = True) -> List[Tuple[int, str]]:
+        """Type-ahead search returning at most limit (id, short_label) pairs.
+        
+        Matches the label column by prefix (index-friendly) or, with
+        prefix=False, anywhere in the text. A numeric term also matches the id.
+        A label_fulltext label is matched through its FULLTEXT index instead:
+        every word of the term must start a word of the label, and words
+        shorter than SearchOperations.MIN_TOKEN_LENGTH are ignored.
+        """
+        term = (term or '').strip()
+        if not term:
+            return self.options(limit)
+        key = self.key_columns[0]
+        if self.label_fulltext and prefix:
+            return self._search_fulltext(term, limit)
+        escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        pattern = f"{escaped}%" if prefix else f"%{escaped}%"
+        where = f"{self.label_column} LIKE %s"
+        params = [pattern]
+        if term.isdigit():
+            where = f"{key} = %s OR {where}"
+            params.insert(0, int(term))
+        query = (f"SELECT {key} AS id, {self._label_sql()} AS label FROM {self.table} "
+                 f"WHERE {where} ORDER BY {key} LIMIT %s")
+        params.append(int(limit))
+        success, result = self.db.fetch_query(query, tuple(params))
+        return [(row['id'], row['label']) for row in result] if success else []
+    
+    def _search_fulltext(self, term: str, limit: int) -> List[Tuple[int, str]]:
+        # A TEXT column has no B-tree index for LIKE to use, and OR-ing the id
+        # match into MATCH() would stop MySQL using either index, so each
+        # branch is its own indexed SELECT
+        key = self.key_columns[0]
+        branches, params = [], []
+        against = SearchOperations.boolean_query(term)
+        for where, value in ((f"{key} = %s", int(term) if term.isdigit() else None),
+                             (f"MATCH({self.label_column}) AGAINST (%s IN BOOLEAN MODE)", against or None)):
+            if value is not None:
+                branches.append(f"(SELECT {key} AS id, {self._label_sql()} AS label FROM {self.table} "
+                                f"WHERE {where} ORDER BY {key} LIMIT %s)")
+                params += [value, int(limit)]
+        if not branches:
+            return []
+        query = " UNION ".join(branches) + " ORDER BY id LIMIT %s"
+        params.append(int(limit))
+        success, result = self.db.fetch_query(query, tuple(params))
+        return [(row['id'], row['label']) for row in result] if success else []
+
+    def change_tables(self) -> Tuple[str, ...]:
+        """The table plus its display joins: every table whose changes can alter a read_all row"""
+        return (self.table,) + tuple(table for table, _, _ in self.display_joins)
+    
+    def change_token(self, tables: Tuple[str, ...] = None) -> Optional[tuple]:
+        """Current change sequences of change_tables(), to pass to changes_since later.
+        
+        Take the token before the read it describes, so a change racing with
+        that read is delivered again rather than lost. tables widens the token
+        to what a filtered read depends on (FilteredQuery.change_tables());
+        such a token only works as a validator, not with changes_since. None
+        when the sequences cannot be read.
+        """
+        tables = tables or self.change_tables()
+        sequences = ChangeOperations(self.db).sequences(tables)
+        if sequences is None:
+            return None
+        return tuple(sequences.get(table, 0) for table in tables)
+    
+    def changes_since(self, token: tuple, columns=None) -> Dict:
+        """Rows inserted, updated or deleted since token was taken.
+        
+        Returns a dict with changed (a frame shaped like read_all(columns)'s
+        holding the new version of every changed row, including rows whose
+        joined display columns changed), deleted (key tuples), token (for the
+        next call) and expired. expired is True when tombstones the caller needs
+        have been pruned or the sequences cannot be read; the caller must then
+        re-read everything. Only tables whose sequence moved are queried, so
+        the cost follows the number of changes, not the table size.
+        """
+        tables = self.change_tables()
+        if token is None or len(token) != len(tables):
+            raise ValueError(f"token must hold one sequence number per table in {tables}")
+        placeholders = ", ".join(["%s"] * len(tables))
+        success, rows = self.db.fetch_query(
+            f"SELECT table_name, last_seq, pruned_seq FROM CHANGE_SEQUENCE "
+            f"WHERE table_name IN ({placeholders})", tables, use_cache=False)
+        result = {'changed': pd.DataFrame(), 'deleted': [], 'token': tuple(token), 'expired': True}
+        if not success:
+            return result
+        current = {row['table_name']: (int(row['last_seq']), int(row['pruned_seq'])) for row in rows}
+        self.db.note_change_sequences({table: seq for table, (seq, _) in current.items()})
+        new_token = tuple(current.get(table, (0, 0))[0] for table in tables)
+        if token[0] < current.get(self.table, (0, 0))[1]:
+            return dict(result, token=new_token)
+        
+        # One branch per moved table: the own table's versions, then rows whose joined
+        # row changed; joined tables outside a projection cannot change its rows
+        aliases = [self.alias or self.table] + [alias for _, alias, _ in self.display_joins]
+        if columns is not None:
+            columns = self._projection(columns, self.key_columns)
+            shown = {self.alias or self.table} | {self.display_columns[c][0] for c in columns
+                                                   if c in self.display_columns}
+        branches, params = [], []
+        for alias, since, now in zip(aliases, token, new_token):
+            if now > since and (columns is None or alias in shown):
+                condition = f"{alias}.row_version > %s"
+                branches.append(f"({self._base_select(columns, [(condition, ())])} WHERE {condition})")
+                params.append(since)
+        changed = pd.DataFrame()
+        if branches:
+            changed = self._read_frame(" UNION ALL ".join(branches), tuple(params))
+            if len(branches) > 1 and not changed.empty:
+                changed = changed.drop_duplicates(list(self.key_columns), ignore_index=True)
+        
+        deleted = []
+        if new_token[0] > token[0]:
+            success, rows = self.db.fetch_query(
+                "SELECT key1, key2 FROM CHANGE_TOMBSTONE WHERE table_name = %s AND seq > %s ORDER BY seq",
+                (self.table, token[0]), use_cache=False)
+            if not success:
+                return result
+            width = len(self.key_columns)
+            deleted = [(row['key1'], row['key2'])[:width] for row in rows]
+        return {'changed': changed, 'deleted': deleted, 'token': new_token, 'expired': False}
+    
+    def merge_changes(self, frame: pd.DataFrame, changes: Dict) -> pd.DataFrame:
+        """A new frame with changes_since's deltas applied to frame (a read_all or page result).
+        
+        Deleted and changed rows are dropped, then the changed rows are added
+        back and the result is sorted by key; frame itself is not modified.
+        """
+        keys = list(self.key_columns)
+        changed = changes['changed']
+        removed = set(changes['deleted'])
+        if not changed.empty:
+            removed |= set(changed[keys].itertuples(index=False, name=None))
+        if removed and not frame.empty:
+            if len(keys) == 1:
+                mask = frame[keys[0]].isin([key[0] for key in removed])
+            else:
+                mask = pd.MultiIndex.from_frame(frame[keys]).isin(list(removed))
+            frame = frame[~mask]
+        if changed.empty:
+            return frame.reset_index(drop=True)
+        if frame.empty:
+            return changed.sort_values(keys, ignore_index=True)
+        merged = pd.concat([frame, changed], ignore_index=True)
+        for column in self.category_columns:
+            # concat falls back to object dtype when the category sets differ
+            if column in merged and merged[column].dtype != 'category':
+                merged[column] = merged[column].astype('category')
+        return merged.sort_values(keys, ignore_index=True)
+    
+    def _writable_columns(self, rows: List[Dict]) -> List[str]:
+        allowed = list(dict.fromkeys(self.key_columns + self.insert_columns))
+        present = set().union(*(row.keys() for row in rows))
+        return [c for c in allowed if c in present]
+    
+    def _bulk_write(self, rows, chunk_size: int, key: tuple = None) -> Dict:
+        rows = _load_rows(rows)
+        report = {'rows': len(rows), 'succeeded': 0, 'failed': []}
+        if not rows:
+            return report
+        columns = self._writable_columns(rows)
+        if not columns:
+            raise ValueError(f"No {self.table} columns found in rows; expected some of "
+                             f"{list(self.key_columns + self.insert_columns)}")
+        
+        placeholders = ", ".join(["%s"] * len(columns))
+        query = f"INSERT INTO {self.table} ({', '.join(columns)}) VALUES ({placeholders})"
+        if key is not None:
+            missing = [c for c in key if c not in columns]
+            if missing:
+                raise ValueError(f"Upsert key columns missing from rows: {missing}")
+            updates = [c for c in columns if c not in key] or [key[0]]
+            query += " ON DUPLICATE KEY UPDATE " + ", ".join(f"{c} = VALUES({c})" for c in updates)
+        
+        for start in range(0, len(rows), chunk_size):
+            chunk = [tuple(row.get(c) for c in columns) for row in rows[start:start + chunk_size]]
+            success, msg = self.db.execute_batch(query, chunk)
+            if success:
+                report['succeeded'] += len(chunk)
+                continue
+            if self.db.in_transaction():
+                # The enclosing transaction() block is doomed; replaying rows cannot save it
+                report['failed'] += [{'row': start + offset, 'error': msg} for offset in range(len(chunk))]
+                break
+            # The chunk was rolled back; replay it row by row to isolate the bad rows
+            for offset, params in enumerate(chunk):
+                success, msg = self.db.execute_query(query, params)
+                if success:
+                    report['succeeded'] += 1
+                else:
+                    report['failed'].append({'row': start + offset, 'error': msg})
+        if self.maintains_rollups and report['succeeded']:
+            # One set-based recompute is cheaper than a delta per loaded row
+            RollupOperations(self.db).rebuild()
+        return report
+    
+    def bulk_create(self, rows, chunk_size: int = 1000) -> Dict:
+        """Insert many rows with batched multi-row INSERTs, one transaction per chunk.
+        
+        rows may be a list of dicts, a DataFrame or a CSV file path. Returns
+        counts plus the index and error of every row that failed. Inside a
+        transaction() block the chunks join that transaction, and the first
+        failed chunk stops the load.
+        """
+        return self._bulk_write(rows, chunk_size)
+    
+    def bulk_upsert(self, rows, key: tuple = None, chunk_size: int = 1000) -> Dict:
+        """Like bulk_create, but rows whose key already exists are updated in place.
+        
+        key must name the primary key or a unique key; it defaults to the
+        primary key.
+        """
+        if isinstance(key, str):
+            key = (key,)
+        return self._bulk_write(rows, chunk_size, tuple(key or self.key_columns))
+
+class FilteredQuery:
+    """Composable, parameterized filter over one Operations class's View All query.
+    
+    Every method returns a new FilteredQuery, so partial filters can be shared
+    and extended. Predicates run in SQL; only the requested rows are fetched.
+    """
+    
+    def __init__(self, ops: 'TableOperations', where: tuple = (), order_by: str = None,
+                 descending: bool = False, limit: int = None, columns: tuple = None):
+        self.ops = ops
+        self.conditions = tuple(where)
+        self.order_column = order_by
+        self.descending = descending
+        self.row_limit = limit
+        self.columns = columns
+    
+    def _replace(self, **changes) -> 'FilteredQuery':
+        state = {'where': self.conditions, 'order_by': self.order_column,
+                 'descending': self.descending, 'limit': self.row_limit, 'columns': self.columns}
+        state.update(changes)
+        return FilteredQuery(self.ops, **state)
+    
+    def where(self, condition: str, *params) -> 'FilteredQuery':
+        """AND a raw SQL condition with %s placeholders; column names use the select_sql aliases"""
+        return self._replace(where=self.conditions + ((condition, tuple(params)),))
+    
+    def where_in(self, column: str, values) -> 'FilteredQuery':
+        """column IN (values); an empty or None values list leaves the query unchanged"""
+        values = [v for v in (values or ()) if v is not None]
+        if not values:
+            return self
+        return self.where(f"{column} IN ({', '.join(['%s'] * len(values))})", *values)
+    
+    def between(self, column: str, low=None, high=None) -> 'FilteredQuery':
+        """Inclusive range on column; either bound may be None for an open range"""
+        query = self
+        if low is not None:
+            query = query.where(f"{column} >= %s", low)
+        if high is not None:
+            query = query.where(f"{column} <= %s", high)
+        return query
+    
+    def order_by(self, column: str = None, descending: bool = False) -> 'FilteredQuery':
+        """Sort by one of the class's sort_columns (ties broken by the key); None sorts by key"""
+        if column is not None and column not in self.ops.key_columns + self.ops.sort_columns:
+            raise ValueError(f"Cannot order {self.ops.table} by {column!r}")
+        return self._replace(order_by=column, descending=descending)
+    
+    def limit(self, count: Optional[int]) -> 'FilteredQuery':
+        return self._replace(limit=count)
+    
+    def select(self, *columns) -> 'FilteredQuery':
+        """Fetch only these readable_columns (plus the sort columns); no arguments selects everything"""
+        if not columns:
+            return self._replace(columns=None)
+        self.ops._projection(columns)
+        return self._replace(columns=tuple(columns))
+    
+    def _where_sql(self) -> Tuple[str, list]:
+        if not self.conditions:
+            return "", []
+        sql = " WHERE " + " AND ".join(f"({c})" for c, _ in self.conditions)
+        return sql, [value for _, values in self.conditions for value in values]
+    
+    def sql(self) -> Tuple[str, tuple]:
+        """The SELECT and its parameters, as fetch() would run them"""
+        where, params = self._where_sql()
+        ops = self.ops
+        columns = ([self.order_column] if self.order_column else []) + [
+            c for c in ops.key_columns if c != self.order_column]
+        direction = "DESC" if self.descending else "ASC"
+        query = ops._base_select(self.columns and ops._projection(self.columns, tuple(columns)),
+                                 self.conditions) + where
+        query += " ORDER BY " + ", ".join(f"{ops._qualify(c)} {direction}" for c in columns)
+        if self.row_limit is not None:
+            query += " LIMIT %s"
+            params.append(int(self.row_limit))
+        return query, tuple(params)
+    
+    def fetch(self) -> pd.DataFrame:
+        """All matching rows, sorted and limited"""
+        return self.ops._read_frame(*self.sql())
+    
+    def count(self) -> int:
+        """Number of matching rows, ignoring sort and limit"""
+        where, params = self._where_sql()
+        ops = self.ops
+        # Count the keys, joining only what the conditions reference; every display
+        # join is a LEFT JOIN on a primary key, so skipping one cannot change the count
+        query = (f"SELECT COUNT(*) AS n FROM ({ops._base_select(ops.key_columns, self.conditions)}"
+                 f"{where}) AS filtered")
+        success, result = ops.db.fetch_query(query, tuple(params))
+        return int(result[0]['n']) if success and result else 0
+    
+    def change_tables(self) -> Tuple[str, ...]:
+        """The source's change_tables() plus any table the conditions read (e.g. GRANT_TOPIC)"""
+        tables = self.ops.change_tables()
+        return tables + tuple(sorted(tables_in(self.sql()[0]) - set(tables)))
+    
+    def change_token(self) -> Optional[tuple]:
+        """Change sequences of change_tables(): moves whenever the filtered result can"""
+        return self.ops.change_token(self.change_tables())
+    
+    def read_page(self, after_key: tuple = None, limit: int = 50,
+                  columns=None) -> Tuple[pd.DataFrame, Optional[tuple]]:
+        """Keyset-paginated read of the matching rows, in this query's sort order.
+        
+        columns, when given, takes the place of the select() projection.
+        """
+        return self.ops.read_page(after_key, limit, self.order_column, self.descending,
+                                  where=self.conditions,
+                                  columns=self.columns if columns is None else columns)
+
+def _load_rows(rows) -> List[Dict]:
+    """Normalise bulk input (list of dicts, DataFrame or CSV path) to plain-Python dicts"""
+    if isinstance(rows, (str, os.PathLike)):
+        rows = pd.read_csv(rows)
+    if isinstance(rows, pd.DataFrame):
+        rows = rows.to_dict('records')
+    return [{k: _to_db_value(v) for k, v in row.items()} for row in rows]
+
+def _to_db_value(value):
+    """Convert pandas/NumPy scalars into values pymysql can escape"""
+    if value is None:
+        return None
+    if isinstance(value, float) and value != value:
+        return None
+    if value is pd.NA or value is pd.NaT:
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    if hasattr(value, 'item') and not isinstance(value, (str, bytes)):
+        value = value.item()
+        if isinstance(value, float) and value != value:
+            return None
+    return value
+
+def _key_value(value):
+    """Turn a typed frame value back into the exact SQL value it was read from"""
+    value = _to_db_value(value)
+    if isinstance(value, datetime) and value == datetime.combine(value.date(), datetime.min.time()):
+        return value.date()
+    if isinstance(value, float):
+        # DECIMAL(15, 2) values round-trip exactly through the shortest float repr
+        return Decimal(repr(value))
+    return value
+
+def _keyset_condition(columns: List[str], values: list, descending: bool) -> Tuple[str, list]:
+    """Build the lexicographic "row comes after values" predicate for keyset paging.
+    
+    Expanded to OR-of-ANDs rather than a row constructor so MySQL can use a
+    range scan, with NULLs ordered the way MySQL orders them (first ascending,
+    last descending).
+    """
+    terms, params = [], []
+    for i, (column, value) in enumerate(zip(columns, values)):
+        parts, part_params = [], []
+        for prev_column, prev_value in zip(columns[:i], values[:i]):
+            if prev_value is None:
+                parts.append(f"{prev_column} IS NULL")
+            else:
+                parts.append(f"{prev_column} = %s")
+                part_params.append(prev_value)
+        if value is None:
+            if descending:
+                continue
+            parts.append(f"{column} IS NOT NULL")
+        elif descending:
+            parts.append(f"({column} < %s OR {column} IS NULL)")
+            part_params.append(value)
+        else:
+            parts.append(f"{column} > %s")
+            part_params.append(value)
+        terms.append("(" + " AND ".join(parts) + ")")
+        params.extend(part_params)
+    return (" OR ".join(terms) if terms else "FALSE"), params
+
+# ==================== DIVISION OPERATIONS ====================
+class DivisionOperations(TableOperations):
+    table = "DIVISION"
+    record_name = "Division"
+    key_columns = ("division_id",)
+    insert_columns = ("name", "description")
+    label_column = "name"
+    sort_columns = ("name",)
+    
+    def create(self, name: str, description: str = None) -> Tuple[bool, str]:
+        query = "INSERT INTO DIVISION (name, description) VALUES (%s, %s)"
+        return self.db.execute_query(query, (name, description))
     
     def update(self, division_id: int, name: str, description: str = None) -> Tuple[bool, str]:
         query = "UPDATE DIVISION SET name = %s, description = %s WHERE division_id = %s"
@@ -128,24 +2309,18 @@ class DivisionOperations:
         return self.db.execute_query(query, (division_id,))
 
 # ==================== REGION OPERATIONS ====================
-class RegionOperations:
-    def __init__(self, db: DatabaseConnection):
-        self.db = db
+class RegionOperations(TableOperations):
+    table = "REGION"
+    record_name = "Region"
+    key_columns = ("region_id",)
+    insert_columns = ("name",)
+    label_column = "name"
+    sort_columns = ("name",)
     
     def create(self, name: str) -> Tuple[bool, str]:
         query = "INSERT INTO REGION (name) VALUES (%s)"
         return self.db.execute_query(query, (name,))
     
-    def read_all(self) -> pd.DataFrame:
-        success, result = self.db.fetch_query("SELECT * FROM REGION")
-        return pd.DataFrame(result) if success else pd.DataFrame()
-    
-    def read_by_id(self, region_id: int) -> Dict:
-        success, result = self.db.fetch_query(
-            "SELECT * FROM REGION WHERE region_id = %s", (region_id,)
-        )
-        return result[0] if success and result else {}
-    
     def update(self, region_id: int, name: str) -> Tuple[bool, str]:
         query = "UPDATE REGION SET name = %s WHERE region_id = %s"
         return self.db.execute_query(query, (name, region_id))
@@ -155,24 +2330,19 @@ class RegionOperations:
         return self.db.execute_query(query, (region_id,))
 
 # ==================== TOPIC OPERATIONS ====================
-class TopicOperations:
-    def __init__(self, db: DatabaseConnection):
-        self.db = db
+class TopicOperations(TableOperations):
+    table = "TOPIC"
+    record_name = "Topic"
+    key_columns = ("topic_id",)
+    insert_columns = ("name", "category")
+    label_column = "name"
+    sort_columns = ("name", "category")
+    category_columns = ("category",)
     
     def create(self, name: str, category: str = None) -> Tuple[bool, str]:
         query = "INSERT INTO TOPIC (name, category) VALUES (%s, %s)"
         return self.db.execute_query(query, (name, category))
     
-    def read_all(self) -> pd.DataFrame:
-        success, result = self.db.fetch_query("SELECT * FROM TOPIC")
-        return pd.DataFrame(result) if success else pd.DataFrame()
-    
-    def read_by_id(self, topic_id: int) -> Dict:
-        success, result = self.db.fetch_query(
-            "SELECT * FROM TOPIC WHERE topic_id = %s", (topic_id,)
-        )
-        return result[0] if success and result else {}
-    
     def update(self, topic_id: int, name: str, category: str = None) -> Tuple[bool, str]:
         query = "UPDATE TOPIC SET name = %s, category = %s WHERE topic_id = %s"
         return self.db.execute_query(query, (name, category, topic_id))
@@ -182,25 +2352,20 @@ class TopicOperations:
         return self.db.execute_query(query, (topic_id,))
 
 # ==================== GRANTEE OPERATIONS ====================
-class GranteeOperations:
-    def __init__(self, db: DatabaseConnection):
-        self.db = db
+class GranteeOperations(TableOperations):
+    table = "GRANTEE"
+    record_name = "Grantee"
+    key_columns = ("grantee_id",)
+    insert_columns = ("name", "email", "addr", "phone", "grantee_type")
+    label_column = "name"
+    sort_columns = ("name", "grantee_type")
+    category_columns = ("grantee_type",)
     
     def create(self, name: str, email: str = None, addr: str = None, 
                phone: str = None, grantee_type: str = None) -> Tuple[bool, str]:
         query = "INSERT INTO GRANTEE (name, email, addr, phone, grantee_type) VALUES (%s, %s, %s, %s, %s)"
         return self.db.execute_query(query, (name, email, addr, phone, grantee_type))
     
-    def read_all(self) -> pd.DataFrame:
-        success, result = self.db.fetch_query("SELECT * FROM GRANTEE")
-        return pd.DataFrame(result) if success else pd.DataFrame()
-    
-    def read_by_id(self, grantee_id: int) -> Dict:
-        success, result = self.db.fetch_query(
-            "SELECT * FROM GRANTEE WHERE grantee_id = %s", (grantee_id,)
-        )
-        return result[0] if success and result else {}
-    
     def update(self, grantee_id: int, name: str, email: str = None, 
                addr: str = None, phone: str = None, grantee_type: str = None) -> Tuple[bool, str]:
         query = """UPDATE GRANTEE SET name = %s, email = %s, addr = %s, 
@@ -212,9 +2377,22 @@ class GranteeOperations:
         return self.db.execute_query(query, (grantee_id,))
 
 # ==================== GRANT OPERATIONS ====================
-class GrantOperations:
-    def __init__(self, db: DatabaseConnection):
-        self.db = db
+class GrantOperations(TableOperations):
+    table = "GRANT_TABLE"
+    record_name = "Grant"
+    alias = "g"
+    key_columns = ("grant_id",)
+    insert_columns = ("purpose", "date_awarded", "duration", "close_date", "start_date",
+                      "amount", "region_id", "division_id")
+    label_column = "purpose"
+    label_length = 30
+    label_fulltext = True
+    sort_columns = ("date_awarded", "start_date", "close_date", "amount")
+    category_columns = ("region_name", "division_name")
+    display_joins = (("REGION", "r", "g.region_id = r.region_id"),
+                     ("DIVISION", "d", "g.division_id = d.division_id"))
+    display_columns = {"region_name": ("r", "name"), "division_name": ("d", "name")}
+    maintains_rollups = True
     
     def create(self, purpose: str, date_awarded, duration: int, 
                close_date, start_date, amount: float, 
@@ -222,22 +2400,70 @@ class GrantOperations:
         query = """INSERT INTO GRANT_TABLE (purpose, date_awarded, duration, close_date, 
                    start_date, amount, region_id, division_id) 
                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)"""
-        return self.db.execute_query(query, (purpose, date_awarded, duration, close_date, 
-                                              start_date, amount, region_id, division_id))
-    
-    def read_all(self) -> pd.DataFrame:
-        query = """SELECT g.*, r.name as region_name, d.name as division_name 
-                   FROM GRANT_TABLE g 
-                   LEFT JOIN REGION r ON g.region_id = r.region_id
-                   LEFT JOIN DIVISION d ON g.division_id = d.division_id"""
-        success, result = self.db.fetch_query(query)
-        return pd.DataFrame(result) if success else pd.DataFrame()
+        
+        def work(cursor):
+            cursor.execute(query, (purpose, date_awarded, duration, close_date,
+                                   start_date, amount, region_id, division_id))
+            # A new grant has no topics yet
+            _apply_rollup_delta(cursor, cursor.lastrowid, 1,
+                                ('ROLLUP_REGION', 'ROLLUP_DIVISION', 'ROLLUP_TOTAL', 'ROLLUP_ACTIVITY'))
+            return "Query executed successfully"
+        return self.db.run_in_transaction(work)
     
-    def read_by_id(self, grant_id: int) -> Dict:
-        success, result = self.db.fetch_query(
-            "SELECT * FROM GRANT_TABLE WHERE grant_id = %s", (grant_id,)
-        )
-        return result[0] if success and result else {}
+    def create_full(self, grant: Dict, milestones: List[Dict] = (), topics: List[int] = (),
+                    grantees: List = ()) -> Tuple[bool, any]:
+        """Create a grant with its milestones, topics and grantees in one transaction.
+        
+        grant holds create()'s arguments; milestones are dicts of
+        milestone_desc, due_date and completion; grantees are grantee ids or
+        (grantee_id, associated_body) pairs. Each child table is written with
+        one multi-row INSERT. Returns (True, new grant_id) or (False, error
+        message), in which case nothing was written.
+        """
+        grant_values = tuple(grant.get(c) for c in self.insert_columns)
+        milestone_query = ("INSERT INTO TOTAL_MILESTONE (grant_id, milestone_desc, due_date, completion) "
+                           "VALUES (%s, %s, %s, %s)")
+        topic_query = "INSERT INTO GRANT_TOPIC (grant_id, topic_id) VALUES (%s, %s)"
+        grantee_query = ("INSERT INTO GRANTEE_UNIVS (grantee_id, grant_id, associated_body) "
+                         "VALUES (%s, %s, %s)")
+        
+        def work(cursor):
+            cursor.execute(f"INSERT INTO GRANT_TABLE ({', '.join(self.insert_columns)}) "
+                           f"VALUES ({', '.join(['%s'] * len(self.insert_columns))})", grant_values)
+            grant_id = cursor.lastrowid
+            if milestones:
+                cursor.executemany(milestone_query, [
+                    (grant_id, m.get('milestone_desc'), m.get('due_date'), m.get('completion', 0))
+                    for m in milestones])
+            if topics:
+                cursor.executemany(topic_query, [(grant_id, topic_id) for topic_id in topics])
+            if grantees:
+                cursor.executemany(grantee_query, [
+                    (g[0], grant_id, g[1]) if isinstance(g, (tuple, list)) else (g, grant_id, None)
+                    for g in grantees])
+            # Topics are linked already, so one delta covers every rollup
+            _apply_rollup_delta(cursor, grant_id, 1)
+            _apply_milestone_delta(cursor, "m.grant_id = %s", (grant_id,), 1)
+            return grant_id
+        return self.db.run_in_transaction(work)
+    
+    def filter(self, region_ids: List[int] = None, division_ids: List[int] = None,
+               topic_ids: List[int] = None, start_from=None, start_to=None,
+               close_from=None, close_to=None, min_amount: float = None,
+               max_amount: float = None) -> FilteredQuery:
+        """Grants matching every given filter; chain .order_by(), .limit() and .fetch() or .read_page()"""
+        query = (FilteredQuery(self)
+                 .where_in("g.region_id", region_ids)
+                 .where_in("g.division_id", division_ids)
+                 .between("g.start_date", start_from, start_to)
+                 .between("g.close_date", close_from, close_to)
+                 .between("g.amount", min_amount, max_amount))
+        if topic_ids:
+            topic_ids = list(topic_ids)
+            query = query.where(
+                "EXISTS (SELECT 1 FROM GRANT_TOPIC gt WHERE gt.grant_id = g.grant_id "
+                f"AND gt.topic_id IN ({', '.join(['%s'] * len(topic_ids))}))", *topic_ids)
+        return query
     
     def update(self, grant_id: int, purpose: str, date_awarded, 
                duration: int, close_date, start_date, 
@@ -245,17 +2471,41 @@ class GrantOperations:
         query = """UPDATE GRANT_TABLE SET purpose = %s, date_awarded = %s, duration = %s, 
                    close_date = %s, start_date = %s, amount = %s, region_id = %s, 
                    division_id = %s WHERE grant_id = %s"""
-        return self.db.execute_query(query, (purpose, date_awarded, duration, close_date, 
-                                              start_date, amount, region_id, division_id, grant_id))
+        
+        def work(cursor):
+            _lock_grant(cursor, grant_id)
+            _apply_rollup_delta(cursor, grant_id, -1)
+            cursor.execute(query, (purpose, date_awarded, duration, close_date,
+                                   start_date, amount, region_id, division_id, grant_id))
+            _apply_rollup_delta(cursor, grant_id, 1)
+            return "Query executed successfully"
+        return self.db.run_in_transaction(work)
     
     def delete(self, grant_id: int) -> Tuple[bool, str]:
         query = "DELETE FROM GRANT_TABLE WHERE grant_id = %s"
-        return self.db.execute_query(query, (grant_id,))
+        
+        def work(cursor):
+            _lock_grant(cursor, grant_id)
+            # Includes the topic rollups of the GRANT_TOPIC links the delete cascades to,
+            # and the milestones it cascades to
+            _apply_rollup_delta(cursor, grant_id, -1)
+            _apply_milestone_delta(cursor, "m.grant_id = %s", (grant_id,), -1)
+            cursor.execute(query, (grant_id,))
+            return "Query executed successfully"
+        return self.db.run_in_transaction(work)
 
 # ==================== GRANTBENEFICIARY OPERATIONS ====================
-class GrantBeneficiaryOperations:
-    def __init__(self, db: DatabaseConnection):
-        self.db = db
+class GrantBeneficiaryOperations(TableOperations):
+    table = "GRANTBENEFICIARY"
+    record_name = "GrantBeneficiary"
+    alias = "gb"
+    key_columns = ("beneficiary_id",)
+    insert_columns = ("grantee_id", "institution", "description", "county_of_institute")
+    label_column = "institution"
+    sort_columns = ("institution", "county_of_institute")
+    category_columns = ("county_of_institute", "grantee_name")
+    display_joins = (("GRANTEE", "g", "gb.grantee_id = g.grantee_id"),)
+    display_columns = {"grantee_name": ("g", "name")}
     
     def create(self, grantee_id: int, institution: str, 
                description: str = None, county_of_institute: str = None) -> Tuple[bool, str]:
@@ -263,19 +2513,6 @@ class GrantBeneficiaryOperations:
                    VALUES (%s, %s, %s, %s)"""
         return self.db.execute_query(query, (grantee_id, institution, description, county_of_institute))
     
-    def read_all(self) -> pd.DataFrame:
-        query = """SELECT gb.*, g.name as grantee_name 
-                   FROM GRANTBENEFICIARY gb 
-                   LEFT JOIN GRANTEE g ON gb.grantee_id = g.grantee_id"""
-        success, result = self.db.fetch_query(query)
-        return pd.DataFrame(result) if success else pd.DataFrame()
-    
-    def read_by_id(self, beneficiary_id: int) -> Dict:
-        success, result = self.db.fetch_query(
-            "SELECT * FROM GRANTBENEFICIARY WHERE beneficiary_id = %s", (beneficiary_id,)
-        )
-        return result[0] if success and result else {}
-    
     def update(self, beneficiary_id: int, grantee_id: int, institution: str, 
                description: str = None, county_of_institute: str = None) -> Tuple[bool, str]:
         query = """UPDATE GRANTBENEFICIARY SET grantee_id = %s, institution = %s, 
@@ -288,70 +2525,178 @@ class GrantBeneficiaryOperations:
         return self.db.execute_query(query, (beneficiary_id,))
 
 # ==================== MILESTONE OPERATIONS ====================
-class MilestoneOperations:
-    def __init__(self, db: DatabaseConnection):
-        self.db = db
+class MilestoneOperations(TableOperations):
+    table = "TOTAL_MILESTONE"
+    record_name = "Milestone"
+    alias = "m"
+    key_columns = ("milestone_id",)
+    insert_columns = ("grant_id", "milestone_desc", "due_date", "completion")
+    label_column = "milestone_desc"
+    label_length = 30
+    label_fulltext = True
+    sort_columns = ("grant_id", "due_date", "completion")
+    category_columns = ("grant_purpose",)
+    display_joins = (("GRANT_TABLE", "g", "m.grant_id = g.grant_id"),)
+    display_columns = {"grant_purpose": ("g", "purpose")}
+    # A grant is at risk when its elapsed share of the schedule runs this many
+    # percentage points ahead of its weighted completion, or when at least
+    # this share of the milestones due so far are overdue
+    RISK_MARGIN = 25
+    RISK_SLIP_RATE = 0.5
+    maintains_rollups = True
     
     def create(self, grant_id: int, milestone_desc: str, 
                due_date, completion: int = 0) -> Tuple[bool, str]:
         query = """INSERT INTO TOTAL_MILESTONE (grant_id, milestone_desc, due_date, completion) 
                    VALUES (%s, %s, %s, %s)"""
-        return self.db.execute_query(query, (grant_id, milestone_desc, due_date, completion))
+        
+        def work(cursor):
+            cursor.execute(query, (grant_id, milestone_desc, due_date, completion))
+            _apply_milestone_delta(cursor, "m.milestone_id = %s", (cursor.lastrowid,), 1)
+            return "Query executed successfully"
+        return self.db.run_in_transaction(work)
     
-    def read_all(self) -> pd.DataFrame:
-        query = """SELECT m.*, g.purpose as grant_purpose 
-                   FROM TOTAL_MILESTONE m 
-                   LEFT JOIN GRANT_TABLE g ON m.grant_id = g.grant_id"""
-        success, result = self.db.fetch_query(query)
-        return pd.DataFrame(result) if success else pd.DataFrame()
+    def filter(self, grant_ids: List[int] = None, region_ids: List[int] = None,
+               division_ids: List[int] = None, topic_ids: List[int] = None, due_from=None,
+               due_to=None, min_completion: int = None, max_completion: int = None) -> FilteredQuery:
+        """Milestones matching every given filter; region, division and topic apply to the parent grant"""
+        query = (FilteredQuery(self)
+                 .where_in("m.grant_id", grant_ids)
+                 .where_in("g.region_id", region_ids)
+                 .where_in("g.division_id", division_ids)
+                 .between("m.due_date", due_from, due_to)
+                 .between("m.completion", min_completion, max_completion))
+        if topic_ids:
+            topic_ids = list(topic_ids)
+            query = query.where(
+                "EXISTS (SELECT 1 FROM GRANT_TOPIC gt WHERE gt.grant_id = m.grant_id "
+                f"AND gt.topic_id IN ({', '.join(['%s'] * len(topic_ids))}))", *topic_ids)
+        return query
     
-    def read_by_id(self, milestone_id: int) -> Dict:
-        success, result = self.db.fetch_query(
-            "SELECT * FROM TOTAL_MILESTONE WHERE milestone_id = %s", (milestone_id,)
-        )
-        return result[0] if success and result else {}
+    def read_by_grant(self, grant_id: int, columns=None) -> pd.DataFrame:
+        if columns is None:
+            return self._read_frame(
+                "SELECT * FROM TOTAL_MILESTONE WHERE grant_id = %s", (grant_id,)
+            )
+        return self._read_frame(f"{self._base_select(columns)} WHERE m.grant_id = %s", (grant_id,))
     
-    def read_by_grant(self, grant_id: int) -> pd.DataFrame:
-        success, result = self.db.fetch_query(
-            "SELECT * FROM TOTAL_MILESTONE WHERE grant_id = %s", (grant_id,)
-        )
-        return pd.DataFrame(result) if success else pd.DataFrame()
+    def overdue(self, as_of=None, limit: int = 500) -> pd.DataFrame:
+        """Milestones past their due date and below 100% completion, most overdue first"""
+        as_of = as_of or datetime.now().date()
+        query = """SELECT m.milestone_id, m.grant_id, g.purpose AS grant_purpose, m.milestone_desc,
+                          m.due_date, m.completion, DATEDIFF(%s, m.due_date) AS days_overdue
+                   FROM TOTAL_MILESTONE m
+                   JOIN GRANT_TABLE g ON m.grant_id = g.grant_id
+                   WHERE m.due_date < %s AND m.completion < 100
+                   ORDER BY m.due_date, m.milestone_id
+                   LIMIT %s"""
+        return self._read_frame(query, (as_of, as_of, int(limit)))
+    
+    def grant_health(self, as_of=None, at_risk_only: bool = False, limit: int = None) -> pd.DataFrame:
+        """Per-grant milestone health computed in one set-based query.
+        
+        Columns: milestone and overdue counts, weighted_completion (each
+        milestone weighted by the days of schedule it covers since the
+        previous one, or since the grant started), slip_rate (overdue share of
+        the milestones due so far), elapsed (share of the grant's duration
+        already passed, 0-100), risk_gap (elapsed minus weighted completion)
+        and the at_risk flag. Rows are ordered by risk_gap, largest first.
+        """
+        as_of = as_of or datetime.now().date()
+        query = """SELECT s.*,
+                          s.elapsed - s.weighted_completion AS risk_gap,
+                          (COALESCE(s.elapsed - s.weighted_completion >= %s, 0)
+                           OR COALESCE(s.slip_rate, 0) >= %s) AS at_risk
+                   FROM (
+                       SELECT h.*,
+                              h.overdue / NULLIF(h.due_so_far, 0) AS slip_rate,
+                              100 * LEAST(GREATEST(DATEDIFF(%s, h.start_date)
+                                                   / NULLIF(h.duration * 30.4375, 0), 0), 1) AS elapsed
+                       FROM (
+                           SELECT w.grant_id, MAX(w.purpose) AS purpose, MAX(w.start_date) AS start_date,
+                                  MAX(w.close_date) AS close_date, MAX(w.duration) AS duration,
+                                  COUNT(*) AS milestones,
+                                  CAST(SUM(w.due_date < %s AND w.completion < 100) AS SIGNED) AS overdue,
+                                  CAST(SUM(w.due_date <= %s) AS SIGNED) AS due_so_far,
+                                  SUM(w.weight * w.completion) / SUM(w.weight) AS weighted_completion
+                           FROM (
+                               SELECT m.grant_id, LEFT(g.purpose, 80) AS purpose, g.start_date,
+                                      g.close_date, g.duration,
+                                      m.due_date, COALESCE(m.completion, 0) AS completion,
+                                      COALESCE(GREATEST(DATEDIFF(m.due_date, COALESCE(
+                                          LAG(m.due_date) OVER (PARTITION BY m.grant_id
+                                                                ORDER BY m.due_date, m.milestone_id),
+                                          g.start_date)), 1), 1) AS weight
+                               FROM TOTAL_MILESTONE m
+                               JOIN GRANT_TABLE g ON m.grant_id = g.grant_id
+                           ) w
+                           -- The grant columns are constant per grant_id; MAX() just carries them
+                           GROUP BY w.grant_id
+                       ) h
+                   ) s"""
+        params = [self.RISK_MARGIN, self.RISK_SLIP_RATE, as_of, as_of, as_of]
+        if at_risk_only:
+            query += """
+                   WHERE s.elapsed - s.weighted_completion >= %s OR COALESCE(s.slip_rate, 0) >= %s"""
+            params += [self.RISK_MARGIN, self.RISK_SLIP_RATE]
+        query += " ORDER BY risk_gap DESC, s.grant_id"
+        if limit is not None:
+            query += " LIMIT %s"
+            params.append(int(limit))
+        frame = self._read_frame(query, tuple(params))
+        if 'at_risk' in frame:
+            # assign() copies, leaving a cached frame untouched
+            frame = frame.assign(at_risk=frame['at_risk'].astype(bool))
+        return frame
     
     def update(self, milestone_id: int, grant_id: int, milestone_desc: str, 
                due_date, completion: int) -> Tuple[bool, str]:
         query = """UPDATE TOTAL_MILESTONE SET grant_id = %s, milestone_desc = %s, 
                    due_date = %s, completion = %s WHERE milestone_id = %s"""
-        return self.db.execute_query(query, (grant_id, milestone_desc, due_date, 
-                                              completion, milestone_id))
+        
+        def work(cursor):
+            # Locked up front, as in _lock_grant, so the delta's shared read is never upgraded
+            cursor.execute("SELECT milestone_id FROM TOTAL_MILESTONE WHERE milestone_id = %s FOR UPDATE",
+                           (milestone_id,))
+            _apply_milestone_delta(cursor, "m.milestone_id = %s", (milestone_id,), -1)
+            cursor.execute(query, (grant_id, milestone_desc, due_date, completion, milestone_id))
+            _apply_milestone_delta(cursor, "m.milestone_id = %s", (milestone_id,), 1)
+            return "Query executed successfully"
+        return self.db.run_in_transaction(work)
     
     def delete(self, milestone_id: int) -> Tuple[bool, str]:
         query = "DELETE FROM TOTAL_MILESTONE WHERE milestone_id = %s"
-        return self.db.execute_query(query, (milestone_id,))
+        
+        def work(cursor):
+            cursor.execute("SELECT milestone_id FROM TOTAL_MILESTONE WHERE milestone_id = %s FOR UPDATE",
+                           (milestone_id,))
+            _apply_milestone_delta(cursor, "m.milestone_id = %s", (milestone_id,), -1)
+            cursor.execute(query, (milestone_id,))
+            return "Query executed successfully"
+        return self.db.run_in_transaction(work)
 
 # ==================== GRANTEE_UNIVS OPERATIONS ====================
-class GranteeUnivsOperations:
-    def __init__(self, db: DatabaseConnection):
-        self.db = db
+class GranteeUnivsOperations(TableOperations):
+    table = "GRANTEE_UNIVS"
+    record_name = "GranteeUniv"
+    alias = "gu"
+    key_columns = ("grantee_id", "grant_id")
+    insert_columns = ("associated_body",)
+    category_columns = ("associated_body", "grantee_name", "grant_purpose")
+    display_joins = (("GRANTEE", "g", "gu.grantee_id = g.grantee_id"),
+                     ("GRANT_TABLE", "gt", "gu.grant_id = gt.grant_id"))
+    display_columns = {"grantee_name": ("g", "name"), "grant_purpose": ("gt", "purpose")}
     
     def create(self, grantee_id: int, grant_id: int, associated_body: str = None) -> Tuple[bool, str]:
         query = "INSERT INTO GRANTEE_UNIVS (grantee_id, grant_id, associated_body) VALUES (%s, %s, %s)"
         return self.db.execute_query(query, (grantee_id, grant_id, associated_body))
     
-    def read_all(self) -> pd.DataFrame:
-        query = """SELECT gu.*, g.name as grantee_name, gt.purpose as grant_purpose 
-                   FROM GRANTEE_UNIVS gu
-                   LEFT JOIN GRANTEE g ON gu.grantee_id = g.grantee_id
-                   LEFT JOIN GRANT_TABLE gt ON gu.grant_id = gt.grant_id"""
-        success, result = self.db.fetch_query(query)
-        return pd.DataFrame(result) if success else pd.DataFrame()
-    
     def read_by_grantee(self, grantee_id: int) -> pd.DataFrame:
         query = """SELECT gu.*, gt.purpose, gt.amount 
                    FROM GRANTEE_UNIVS gu
                    LEFT JOIN GRANT_TABLE gt ON gu.grant_id = gt.grant_id
                    WHERE gu.grantee_id = %s"""
-        success, result = self.db.fetch_query(query, (grantee_id,))
-        return pd.DataFrame(result) if success else pd.DataFrame()
+        return self._read_frame(query, (grantee_id,))
     
     def update(self, grantee_id: int, grant_id: int, associated_body: str = None) -> Tuple[bool, str]:
         query = "UPDATE GRANTEE_UNIVS SET associated_body = %s WHERE grantee_id = %s AND grant_id = %s"
@@ -362,29 +2707,368 @@ class GranteeUnivsOperations:
         return self.db.execute_query(query, (grantee_id, grant_id))
 
 # ==================== GRANT_TOPIC OPERATIONS ====================
-class GrantTopicOperations:
-    def __init__(self, db: DatabaseConnection):
-        self.db = db
+class GrantTopicOperations(TableOperations):
+    table = "GRANT_TOPIC"
+    record_name = "GrantTopic"
+    alias = "gt_rel"
+    key_columns = ("grant_id", "topic_id")
+    category_columns = ("grant_purpose", "topic_name")
+    display_joins = (("GRANT_TABLE", "g", "gt_rel.grant_id = g.grant_id"),
+                     ("TOPIC", "t", "gt_rel.topic_id = t.topic_id"))
+    display_columns = {"grant_purpose": ("g", "purpose"), "topic_name": ("t", "name")}
+    maintains_rollups = True
     
     def create(self, grant_id: int, topic_id: int) -> Tuple[bool, str]:
         query = "INSERT INTO GRANT_TOPIC (grant_id, topic_id) VALUES (%s, %s)"
-        return self.db.execute_query(query, (grant_id, topic_id))
-    
-    def read_all(self) -> pd.DataFrame:
-        query = """SELECT gt_rel.*, g.purpose as grant_purpose, t.name as topic_name 
-                   FROM GRANT_TOPIC gt_rel
-                   LEFT JOIN GRANT_TABLE g ON gt_rel.grant_id = g.grant_id
-                   LEFT JOIN TOPIC t ON gt_rel.topic_id = t.topic_id"""
-        success, result = self.db.fetch_query(query)
-        return pd.DataFrame(result) if success else pd.DataFrame()
+        
+        def work(cursor):
+            _lock_grant(cursor, grant_id, exclusive=False)
+            cursor.execute(query, (grant_id, topic_id))
+            _apply_rollup_delta(cursor, grant_id, 1, ('ROLLUP_TOPIC',), topic_id)
+            return "Query executed successfully"
+        return self.db.run_in_transaction(work)
     
     def read_by_grant(self, grant_id: int) -> pd.DataFrame:
         query = """SELECT t.* FROM GRANT_TOPIC gt
                    JOIN TOPIC t ON gt.topic_id = t.topic_id
                    WHERE gt.grant_id = %s"""
-        success, result = self.db.fetch_query(query, (grant_id,))
-        return pd.DataFrame(result) if success else pd.DataFrame()
+        return self._read_frame(query, (grant_id,))
     
     def delete(self, grant_id: int, topic_id: int) -> Tuple[bool, str]:
         query = "DELETE FROM GRANT_TOPIC WHERE grant_id = %s AND topic_id = %s"
-        return self.db.execute_query(query, (grant_id, topic_id))
+        
+        def work(cursor):
+            _lock_grant(cursor, grant_id, exclusive=False)
+            _apply_rollup_delta(cursor, grant_id, -1, ('ROLLUP_TOPIC',), topic_id)
+            cursor.execute(query, (grant_id, topic_id))
+            return "Query executed successfully"
+        return self.db.run_in_transaction(work)
+
+# ==================== STATS OPERATIONS ====================
+class StatsOperations:
+    def __init__(self, db: DatabaseConnection):
+        self.db = db
+    
+    def summary(self) -> Dict:
+        """Dashboard figures computed server-side in a single round trip"""
+        # Grant, milestone and active counts, the total and the average completion come
+        # from the maintained rollups instead of scans; active grants read one
+        # ROLLUP_ACTIVITY row per start or close day up to today, however many grants
+        # there are
+        query = """SELECT
+                       (SELECT COALESCE(MAX(grant_count), 0) FROM ROLLUP_TOTAL) AS total_grants,
+                       (SELECT COUNT(*) FROM GRANTEE) AS total_grantees,
+                       (SELECT COALESCE(MAX(milestone_count), 0) FROM ROLLUP_MILESTONE) AS total_milestones,
+                       (SELECT COUNT(*) FROM TOPIC) AS total_topics,
+                       (SELECT COALESCE(MAX(total_amount), 0) FROM ROLLUP_TOTAL) AS total_awarded,
+                       (SELECT COALESCE(SUM(starts), 0)
+                               - COALESCE(SUM(CASE WHEN activity_date < CURDATE() THEN closes END), 0)
+                        FROM ROLLUP_ACTIVITY WHERE activity_date <= CURDATE()) AS active_grants,
+                       (SELECT COALESCE(MAX(completion_sum) / NULLIF(MAX(completion_count), 0), 0)
+                        FROM ROLLUP_MILESTONE) AS avg_completion"""
+        success, result = self.db.fetch_query(query)
+        return result[0] if success and result else {}
+
+# ==================== ROLLUP OPERATIONS ====================
+# Rollup table -> (group column, group expression, FROM clause with the grant as g, row filter)
+ROLLUPS = {
+    'ROLLUP_REGION': ("region_id", "g.region_id", "GRANT_TABLE g", "g.region_id IS NOT NULL"),
+    'ROLLUP_DIVISION': ("division_id", "g.division_id", "GRANT_TABLE g", "g.division_id IS NOT NULL"),
+    'ROLLUP_TOPIC': ("topic_id", "gt.topic_id",
+                     "GRANT_TOPIC gt JOIN GRANT_TABLE g ON g.grant_id = gt.grant_id", "1 = 1"),
+    'ROLLUP_TOTAL': ("total_id", "1", "GRANT_TABLE g", "1 = 1"),
+}
+_ROLLUP_MEASURES = "grant_count, total_amount, total_duration, duration_count"
+
+# Grants that are active from start_date through close_date (see ROLLUP_ACTIVITY)
+_ACTIVE_CONDITION = "start_date <= close_date"
+
+# Rollups behind StatsOperations.summary(), from migrations/006_summary_rollups.sql:
+# table -> (key column, measure columns, fresh aggregation)
+SUMMARY_ROLLUPS = {
+    'ROLLUP_ACTIVITY': ("activity_date", ("starts", "closes"),
+                        "SELECT activity_date, SUM(starts) AS starts, SUM(closes) AS closes FROM ("
+                        f"SELECT start_date AS activity_date, 1 AS starts, 0 AS closes FROM GRANT_TABLE "
+                        f"WHERE {_ACTIVE_CONDITION} UNION ALL "
+                        f"SELECT close_date, 0, 1 FROM GRANT_TABLE WHERE {_ACTIVE_CONDITION}"
+                        ") d GROUP BY activity_date"),
+    'ROLLUP_MILESTONE': ("total_id", ("milestone_count", "completion_sum", "completion_count"),
+                         "SELECT 1 AS total_id, COUNT(*) AS milestone_count, "
+                         "COALESCE(SUM(completion), 0) AS completion_sum, "
+                         "COUNT(completion) AS completion_count FROM TOTAL_MILESTONE"),
+}
+
+def _apply_rollup_delta(cursor, grant_id: int, sign: int, tables=(*ROLLUPS, 'ROLLUP_ACTIVITY'),
+                        topic_id: int = None):
+    """Add (sign=1) or remove (sign=-1) one grant's contribution to the given rollups.
+    
+    Runs inside the caller's transaction, reading the grant's current row, so
+    call it with -1 before and +1 after the write that changes the grant.
+    """
+    for table in tables:
+        if table == 'ROLLUP_ACTIVITY':
+            # One row for the start day and one for the close day
+            for column, starts, closes in (("start_date", sign, 0), ("close_date", 0, sign)):
+                cursor.execute(
+                    f"INSERT INTO ROLLUP_ACTIVITY (activity_date, starts, closes) "
+                    f"SELECT g.{column}, %s, %s FROM GRANT_TABLE g "
+                    f"WHERE g.grant_id = %s AND {_ACTIVE_CONDITION} "
+                    "ON DUPLICATE KEY UPDATE starts = starts + VALUES(starts), "
+                    "closes = closes + VALUES(closes)",
+                    (starts, closes, grant_id))
+            continue
+        column, group, source, condition = ROLLUPS[table]
+        params = [sign, sign, sign, sign, grant_id]
+        where = f"g.grant_id = %s AND {condition}"
+        if topic_id is not None and table == 'ROLLUP_TOPIC':
+            where += " AND gt.topic_id = %s"
+            params.append(topic_id)
+        cursor.execute(
+            f"INSERT INTO {table} ({column}, {_ROLLUP_MEASURES}) "
+            f"SELECT {group}, %s, %s * COALESCE(g.amount, 0), %s * COALESCE(g.duration, 0), "
+            f"%s * (g.duration IS NOT NULL) FROM {source} WHERE {where} "
+            "ON DUPLICATE KEY UPDATE grant_count = grant_count + VALUES(grant_count), "
+            "total_amount = total_amount + VALUES(total_amount), "
+            "total_duration = total_duration + VALUES(total_duration), "
+            "duration_count = duration_count + VALUES(duration_count)",
+            tuple(params))
+
+def _apply_milestone_delta(cursor, where: str, params: tuple, sign: int):
+    """Add (sign=1) or remove (sign=-1) the milestones matching where (alias m) in ROLLUP_MILESTONE.
+    
+    Like _apply_rollup_delta, call it with -1 before and +1 after the write.
+    """
+    cursor.execute(
+        "INSERT INTO ROLLUP_MILESTONE (total_id, milestone_count, completion_sum, completion_count) "
+        "SELECT 1, %s * COUNT(*), %s * COALESCE(SUM(m.completion), 0), %s * COUNT(m.completion) "
+        f"FROM TOTAL_MILESTONE m WHERE {where} "
+        "ON DUPLICATE KEY UPDATE milestone_count = milestone_count + VALUES(milestone_count), "
+        "completion_sum = completion_sum + VALUES(completion_sum), "
+        "completion_count = completion_count + VALUES(completion_count)",
+        (sign, sign, sign) + tuple(params))
+
+def _lock_grant(cursor, grant_id: int, exclusive: bool = True):
+    # Taken up front so the delta's shared read never has to be upgraded (deadlock)
+    lock = "FOR UPDATE" if exclusive else "LOCK IN SHARE MODE"
+    cursor.execute(f"SELECT grant_id FROM GRANT_TABLE WHERE grant_id = %s {lock}", (grant_id,))
+
+class RollupOperations:
+    """Funding totals per region, division and topic, read from the incrementally maintained rollups"""
+    
+    # group -> (rollup table, dimension table, key column)
+    GROUPS = {
+        'region': ('ROLLUP_REGION', 'REGION', 'region_id'),
+        'division': ('ROLLUP_DIVISION', 'DIVISION', 'division_id'),
+        'topic': ('ROLLUP_TOPIC', 'TOPIC', 'topic_id'),
+    }
+    
+    def __init__(self, db: DatabaseConnection):
+        self.db = db
+    
+    def by_group(self, group: str) -> pd.DataFrame:
+        """Grant count, total and average amount and average duration (months) per group"""
+        if group not in self.GROUPS:
+            raise ValueError(f"Unknown rollup group {group!r}; expected one of {list(self.GROUPS)}")
+        table, dimension, key = self.GROUPS[group]
+        query = f"""SELECT r.{key}, d.name, r.grant_count, r.total_amount,
+                          r.total_amount / r.grant_count AS avg_amount,
+                          r.total_duration / NULLIF(r.duration_count, 0) AS avg_duration
+                   FROM {table} r JOIN {dimension} d ON d.{key} = r.{key}
+                   WHERE r.grant_count > 0
+                   ORDER BY r.total_amount DESC"""
+        success, result = self.db.fetch_frame(query, categories=('name',))
+        return result if success else pd.DataFrame()
+    
+    def by_region(self) -> pd.DataFrame:
+        return self.by_group('region')
+    
+    def by_division(self) -> pd.DataFrame:
+        return self.by_group('division')
+    
+    def by_topic(self) -> pd.DataFrame:
+        return self.by_group('topic')
+    
+    def totals(self) -> Dict:
+        """Grant count, total amount and average duration over every grant, in O(1)"""
+        success, result = self.db.fetch_query(
+            """SELECT grant_count, total_amount,
+                      total_duration / NULLIF(duration_count, 0) AS avg_duration
+               FROM ROLLUP_TOTAL WHERE total_id = 1""")
+        if success and result:
+            return result[0]
+        return {'grant_count': 0, 'total_amount': 0, 'avg_duration': None}
+    
+    @staticmethod
+    def _aggregate_sql(table: str) -> str:
+        column, group, source, condition = ROLLUPS[table]
+        return (f"SELECT {group} AS {column}, COUNT(*) AS grant_count, "
+                "COALESCE(SUM(g.amount), 0) AS total_amount, "
+                "COALESCE(SUM(g.duration), 0) AS total_duration, "
+                f"COUNT(g.duration) AS duration_count FROM {source} WHERE {condition} "
+                f"GROUP BY {group}")
+    
+    @classmethod
+    def _tables(cls) -> List[Tuple[str, str, List[str], str]]:
+        """(table, key column, measure columns, fresh aggregation) for every rollup"""
+        tables = [(table, column, _ROLLUP_MEASURES.split(", "), cls._aggregate_sql(table))
+                  for table, (column, *_) in ROLLUPS.items()]
+        tables += [(table, column, list(measures), aggregate)
+                   for table, (column, measures, aggregate) in SUMMARY_ROLLUPS.items()]
+        return tables
+    
+    def rebuild(self) -> Tuple[bool, str]:
+        """Recompute every rollup from GRANT_TABLE, GRANT_TOPIC and TOTAL_MILESTONE in one transaction"""
+        tables = self._tables()
+        
+        def work(cursor):
+            for table, column, measures, aggregate in tables:
+                cursor.execute(f"DELETE FROM {table}")
+                cursor.execute(f"INSERT INTO {table} ({column}, {', '.join(measures)}) " + aggregate)
+            return f"Rebuilt {len(tables)} rollup tables"
+        return self.db.run_in_transaction(work)
+    
+    def verify(self) -> List[str]:
+        """Differences between the stored rollups and a fresh aggregation; empty when consistent"""
+        problems = []
+        for table, column, measures, aggregate in self._tables():
+            success, stored = self.db.fetch_query(
+                f"SELECT {column}, {', '.join(measures)} FROM {table}", use_cache=False)
+            if not success:
+                return [f"{table}: {stored}"]
+            success, fresh = self.db.fetch_query(aggregate, use_cache=False)
+            if not success:
+                return [f"{table}: {fresh}"]
+            # Rounded to the columns' two decimals, so binary floating point sums (SQLite) compare equal
+            expected = {row[column]: tuple(round(row[m], 2) for m in measures) for row in fresh}
+            actual = {row[column]: tuple(round(row[m], 2) for m in measures) for row in stored
+                      if any(row[m] for m in measures)}
+            for key in sorted(set(expected) | set(actual), key=str):
+                if expected.get(key) != actual.get(key):
+                    problems.append(f"{table} {column}={key}: stored {actual.get(key)}, "
+                                    f"expected {expected.get(key)}")
+        return problems
+
+# ==================== CHANGE OPERATIONS ====================
+class ChangeOperations:
+    """Change sequences and tombstones kept by the triggers in migrations/005_change_tracking.sql"""
+    
+    def __init__(self, db: DatabaseConnection):
+        self.db = db
+    
+    def sequences(self, tables: tuple = None) -> Optional[Dict[str, int]]:
+        """Latest change sequence number per table (all tracked tables by default), read uncached.
+        
+        One indexed round trip; comparing the result with an earlier one tells
+        which tables changed in between. Cached reads of the tables that moved
+        are invalidated. None when the sequences cannot be read.
+        """
+        query = "SELECT table_name, last_seq FROM CHANGE_SEQUENCE"
+        params = None
+        if tables:
+            query += f" WHERE table_name IN ({', '.join(['%s'] * len(tables))})"
+            params = tuple(tables)
+        success, rows = self.db.fetch_query(query, params, use_cache=False)
+        if not success:
+            return None
+        sequences = {row['table_name']: int(row['last_seq']) for row in rows}
+        self.db.note_change_sequences(sequences)
+        return sequences
+    
+    def prune(self, keep_days: float = 7) -> Tuple[bool, str]:
+        """Delete tombstones older than keep_days (0 deletes all of them).
+        
+        Tokens taken before the newest pruned tombstone of their table expire,
+        and their holders re-read the table instead of merging deltas.
+        """
+        # Correlated subqueries rather than multi-table UPDATE/DELETE, which SQLite lacks
+        def work(cursor):
+            cursor.execute("""UPDATE CHANGE_SEQUENCE
+                              SET pruned_seq = GREATEST(pruned_seq, COALESCE(
+                                  (SELECT MAX(t.seq) FROM CHANGE_TOMBSTONE t
+                                   WHERE t.table_name = CHANGE_SEQUENCE.table_name
+                                     AND t.deleted_at <= NOW() - INTERVAL %s SECOND), 0))""",
+                           (int(keep_days * 86400),))
+            # By sequence number, so tombstones written meanwhile are never dropped unrecorded
+            cursor.execute("""DELETE FROM CHANGE_TOMBSTONE
+                              WHERE seq <= (SELECT s.pruned_seq FROM CHANGE_SEQUENCE s
+                                            WHERE s.table_name = CHANGE_TOMBSTONE.table_name)""")
+            return f"Pruned {max(cursor.rowcount, 0)} tombstones"
+        return self.db.run_in_transaction(work)
+
+# ==================== SEARCH OPERATIONS ====================
+_SEARCH_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+class SearchOperations:
+    """Ranked full-text search over the FULLTEXT indexes from migrations/002_fulltext_search.sql"""
+    
+    # entity -> (table, id column, MATCH columns, title SQL, detail SQL)
+    SOURCES = {
+        'grant': ("GRANT_TABLE", "grant_id", "purpose",
+                  "LEFT(purpose, 80)", "CONCAT('$', FORMAT(amount, 2))"),
+        'milestone': ("TOTAL_MILESTONE", "milestone_id", "milestone_desc",
+                      "LEFT(milestone_desc, 80)", "CONCAT('Grant #', grant_id)"),
+        'beneficiary': ("GRANTBENEFICIARY", "beneficiary_id", "institution, description",
+                        "LEFT(institution, 80)", "LEFT(description, 80)"),
+        'grantee': ("GRANTEE", "grantee_id", "name", "LEFT(name, 80)", "grantee_type"),
+    }
+    MIN_TOKEN_LENGTH = 3  # InnoDB's default innodb_ft_min_token_size
+    
+    def __init__(self, db: DatabaseConnection):
+        self.db = db
+    
+    @classmethod
+    def boolean_query(cls, text: str) -> str:
+        """User input as a BOOLEAN MODE query requiring every word, each as a prefix"""
+        words = [w for w in _SEARCH_TOKEN.findall(text or '') if len(w) >= cls.MIN_TOKEN_LENGTH]
+        return " ".join(f"+{w}*" for w in words)
+    
+    def search(self, query: str, entities: List[str] = None, limit: int = 20) -> List[Dict]:
+        """Best matches across grants, milestones, beneficiaries and grantees in one round trip.
+        
+        Returns up to limit dicts with entity, id, title, detail and score,
+        highest score first. Each entity contributes at most limit candidates,
+        ranked by its own FULLTEXT index.
+        """
+        against = self.boolean_query(query)
+        entities = list(entities or self.SOURCES)
+        unknown = [e for e in entities if e not in self.SOURCES]
+        if unknown:
+            raise ValueError(f"Cannot search {unknown}; expected some of {list(self.SOURCES)}")
+        if not against or not entities:
+            return []
+        branches, params = [], []
+        for entity in entities:
+            table, key, columns, title, detail = self.SOURCES[entity]
+            match = f"MATCH({columns}) AGAINST (%s IN BOOLEAN MODE)"
+            branches.append(f"(SELECT '{entity}' AS entity, {key} AS id, {title} AS title, "
+                            f"{detail} AS detail, {match} AS score FROM {table} "
+                            f"WHERE {match} ORDER BY {match} DESC LIMIT %s)")
+            params += [against, against, against, int(limit)]
+        sql = " UNION ALL ".join(branches) + " ORDER BY score DESC LIMIT %s"
+        params.append(int(limit))
+        success, result = self.db.fetch_query(sql, tuple(params))
+        return list(result) if success else []
+
+# Entity name -> Operations class, as used for the app's ops dict, exports and tooling
+ENTITY_OPERATIONS = {
+    'division': DivisionOperations,
+    'region': RegionOperations,
+    'topic': TopicOperations,
+    'grantee': GranteeOperations,
+    'grant': GrantOperations,
+    'beneficiary': GrantBeneficiaryOperations,
+    'milestone': MilestoneOperations,
+    'grantee_univs': GranteeUnivsOperations,
+    'grant_topic': GrantTopicOperations,
+}
+
+# Record types, e.g. `from db_operations import Grant`
+Division = DivisionOperations.record_type
+Region = RegionOperations.record_type
+Topic = TopicOperations.record_type
+Grantee = GranteeOperations.record_type
+Grant = GrantOperations.record_type
+GrantBeneficiary = GrantBeneficiaryOperations.record_type
+Milestone = MilestoneOperations.record_type
+GranteeUniv = GranteeUnivsOperations.record_type
+GrantTopic = GrantTopicOperations.record_type
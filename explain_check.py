@@ -0,0 +1,165 @@
+"""EXPLAIN-based index check for the queries issued by db_operations.
+
+Every read method of the Operations classes is called against a recording
+connection to capture its SQL, and each captured statement is then EXPLAINed
+on the live database. A statement fails the check when MySQL plans a full
+table scan (access type ALL) for any table it touches, unless the method is
+an intentional whole-table read.
+
+The optimizer prefers full scans on tiny tables, so run this against a
+realistically sized database rather than the schema.sql sample data. It
+reads MySQL's plans, so it needs DB_BACKEND = 'mysql'; tests/test_explain_check.py
+runs it when that database is reachable.
+
+Usage:
+    python explain_check.py
+"""
+import sys
+from typing import Callable, Dict, List, Tuple
+
+import pandas as pd
+
+from db_operations import (DatabaseConnection, ENTITY_OPERATIONS, SearchOperations, StatsOperations,
+                           configured_database)
+
+# Representative values for keyset cursors on each sortable column
+SAMPLE_VALUES = {
+    'name': 'M',
+    'category': 'Research',
+    'grantee_type': 'University',
+    'institution': 'T',
+    'county_of_institute': 'Kings County',
+    'date_awarded': '2024-01-01',
+    'start_date': '2024-01-01',
+    'close_date': '2025-01-01',
+    'due_date': '2024-06-01',
+    'amount': 100000,
+    'completion': 50,
+    'grant_id': 1,
+}
+
+# Methods that read whole tables by design; reported, not failed
+FULL_SCAN_ALLOWED = {'read_all', 'options', 'labels', 'grant_health'}
+
+# Operations classes that are not tied to a single table
+EXTRA_OPERATIONS = {'stats': StatsOperations, 'search': SearchOperations}
+
+class RecordingConnection:
+    """Stands in for DatabaseConnection and records the SELECTs it is asked to run"""
+
+    def __init__(self):
+        self.queries = []
+
+    def fetch_query(self, query: str, params: tuple = None, use_cache: bool = True):
+        self.queries.append((query, params))
+        return True, []
+
+    def fetch_frame(self, query: str, params: tuple = None, categories: tuple = (), **kwargs):
+        self.queries.append((query, params))
+        return True, pd.DataFrame()
+
+    def fetch_records(self, query: str, params: tuple = None, record_type: type = None,
+                      categories: tuple = (), **kwargs):
+        self.queries.append((query, params))
+        return True, []
+
+def build_cases() -> List[Tuple[str, str, Callable]]:
+    """(entity, method, call) triples covering every read path"""
+    cases = []
+    for entity, cls in ENTITY_OPERATIONS.items():
+        key_sample = tuple(1 for _ in cls.key_columns)
+        cases.append((entity, 'read_all', lambda o: o.read_all()))
+        cases.append((entity, 'count', lambda o: o.count()))
+        cases.append((entity, 'read_page', lambda o: o.read_page(limit=50)))
+        cases.append((entity, 'read_page', lambda o, k=key_sample: o.read_page(after_key=k, limit=50)))
+        for column in cls.sort_columns:
+            after = (SAMPLE_VALUES.get(column, 1),) + key_sample
+            cases.append((entity, 'read_page',
+                          lambda o, c=column, a=after: o.read_page(after_key=a, limit=50, order_by=c)))
+        # The narrowest projection: keys only, no display joins
+        cases.append((entity, 'read_page', lambda o, c=cls.key_columns: o.read_page(limit=50, columns=c)))
+        cases.append((entity, 'read_by_id', lambda o, k=key_sample: o.read_by_id(*k)))
+        cases.append((entity, 'read_records', lambda o, k=key_sample: o.read_records(after_key=k, limit=50)))
+        if cls.label_column:
+            cases.append((entity, 'options', lambda o: o.options(limit=201)))
+            cases.append((entity, 'label_for', lambda o: o.label_for(1)))
+            cases.append((entity, 'search_options', lambda o: o.search_options('A', limit=50)))
+            cases.append((entity, 'search_options', lambda o: o.search_options('12', limit=50)))
+            cases.append((entity, 'search_options', lambda o: o.search_options('Research', limit=50)))
+        for method in ('read_by_grant', 'read_by_grantee'):
+            if hasattr(cls, method):
+                cases.append((entity, method, lambda o, m=method: getattr(o, m)(1)))
+    cases.append(('grant', 'filter', lambda o: o.filter(
+        min_amount=200000, close_from='2025-01-01', close_to='2025-12-31').order_by('amount', True)
+        .read_page(limit=50)))
+    cases.append(('grant', 'filter', lambda o: o.filter(region_ids=[1, 2], topic_ids=[3]).count()))
+    cases.append(('milestone', 'filter', lambda o: o.filter(
+        due_from='2024-01-01', due_to='2024-03-31', max_completion=50).read_page(limit=50)))
+    cases.append(('milestone', 'overdue', lambda o: o.overdue(as_of='2025-01-01')))
+    cases.append(('milestone', 'grant_health', lambda o: o.grant_health(at_risk_only=True, limit=500)))
+    cases.append(('stats', 'summary', lambda o: o.summary()))
+    cases.append(('search', 'search', lambda o: o.search('research program', limit=20)))
+    return cases
+
+def capture() -> List[Tuple[str, str, str, tuple]]:
+    recorder = RecordingConnection()
+    captured = []
+    for entity, method, call in build_cases():
+        if entity in EXTRA_OPERATIONS:
+            ops = EXTRA_OPERATIONS[entity](recorder)
+        else:
+            ops = ENTITY_OPERATIONS[entity](recorder)
+        start = len(recorder.queries)
+        call(ops)
+        for query, params in recorder.queries[start:]:
+            captured.append((entity, method, query, params))
+    return captured
+
+def full_scans(db: DatabaseConnection, query: str, params: tuple) -> Tuple[bool, List[str]]:
+    """Tables the plan reads with a full scan"""
+    success, plan = db.fetch_query("EXPLAIN " + query, params, use_cache=False)
+    if not success:
+        return False, [plan]
+    return True, [row.get('table') for row in plan if row.get('type') == 'ALL']
+
+def run(db: DatabaseConnection) -> Dict[str, int]:
+    summary = {'ok': 0, 'allowed': 0, 'failed': 0}
+    for entity, method, query, params in capture():
+        success, scanned = full_scans(db, query, params)
+        allowed = method in FULL_SCAN_ALLOWED
+        if not success:
+            status = 'ERROR'
+            summary['failed'] += 1
+        elif not scanned:
+            status = 'ok'
+            summary['ok'] += 1
+        elif allowed:
+            status = 'scan (allowed)'
+            summary['allowed'] += 1
+        else:
+            status = 'FULL SCAN'
+            summary['failed'] += 1
+        detail = f" [{', '.join(map(str, scanned))}]" if scanned else ''
+        print(f"{status:<15} {entity}.{method}{detail}")
+        if status in ('ERROR', 'FULL SCAN'):
+            print("    " + " ".join(query.split()))
+    return summary
+
+def main() -> int:
+    db = configured_database(pool_min_size=1, pool_max_size=1)
+    if db.dialect != 'mysql':
+        print(f"explain_check reads MySQL plans; the configured backend is {db.dialect}", file=sys.stderr)
+        return 1
+    success, msg = db.connect()
+    if not success:
+        print(msg, file=sys.stderr)
+        return 1
+    try:
+        summary = run(db)
+    finally:
+        db.disconnect()
+    print(f"\n{summary['ok']} indexed, {summary['allowed']} allowed scans, {summary['failed']} failed")
+    return 1 if summary['failed'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
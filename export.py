@@ -0,0 +1,149 @@
+"""Streaming export of tables and joins to CSV or Parquet.
+
+Rows are read through an unbuffered server-side cursor and written chunk by
+chunk, so memory use stays flat regardless of table size.
+
+Usage:
+    python export.py --entity grant grants.csv
+    python export.py --entity milestone milestones.parquet
+    python export.py --sql "SELECT * FROM GRANT_TABLE WHERE amount > 100000" big_grants.csv
+"""
+import argparse
+import csv
+import io
+import sys
+from contextlib import closing
+from typing import Optional, Tuple
+
+from pymysql import Error
+from pymysql.constants import FIELD_TYPE
+
+from db_operations import DatabaseConnection, ENTITY_OPERATIONS, configured_database
+
+FORMATS = ('csv', 'parquet')
+DEFAULT_CHUNK_SIZE = 10000
+
+def export_query(db: DatabaseConnection, query: str, dest, fmt: str = 'csv',
+                 params: tuple = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Tuple[bool, str]:
+    """Stream the result of query to dest (a path or binary file object)"""
+    if fmt not in FORMATS:
+        return False, f"Error: unknown format {fmt!r}; expected one of {FORMATS}"
+    try:
+        with closing(db.stream_query(query, params, chunk_size)) as chunks:
+            if fmt == 'csv':
+                rows = _write_csv(chunks, dest)
+            else:
+                rows = _write_parquet(chunks, dest)
+        return True, f"Exported {rows} rows"
+    except Error as e:
+        return False, f"Error: {str(e)}"
+    except ImportError:
+        return False, "Parquet export requires pyarrow (pip install pyarrow)"
+
+def export_entity(db: DatabaseConnection, entity: str, dest, fmt: str = 'csv',
+                  chunk_size: int = DEFAULT_CHUNK_SIZE) -> Tuple[bool, str]:
+    """Stream an entity's View All query (including its display joins) to dest"""
+    if entity not in ENTITY_OPERATIONS:
+        return False, f"Error: unknown entity {entity!r}"
+    query = ENTITY_OPERATIONS[entity](db).select_query()
+    return export_query(db, query, dest, fmt, chunk_size=chunk_size)
+
+def _open_binary(dest):
+    if hasattr(dest, 'write'):
+        return dest, False
+    return open(dest, 'wb'), True
+
+def _write_csv(chunks, dest) -> int:
+    out, owned = _open_binary(dest)
+    text = io.TextIOWrapper(out, encoding='utf-8', newline='')
+    try:
+        writer = csv.writer(text)
+        total = 0
+        header_written = False
+        for description, rows in chunks:
+            if not header_written:
+                writer.writerow([col[0] for col in description])
+                header_written = True
+            writer.writerows(rows)
+            total += len(rows)
+        text.flush()
+        return total
+    finally:
+        # Detach so closing the wrapper doesn't close a caller-owned file object
+        text.detach()
+        if owned:
+            out.close()
+
+def _arrow_type(pa, column: tuple):
+    """Arrow type for a cursor.description entry, so every chunk shares one schema"""
+    type_code, precision, scale = column[1], column[4], column[5]
+    if type_code in (FIELD_TYPE.TINY, FIELD_TYPE.SHORT, FIELD_TYPE.INT24,
+                     FIELD_TYPE.LONG, FIELD_TYPE.LONGLONG, FIELD_TYPE.YEAR):
+        return pa.int64()
+    if type_code in (FIELD_TYPE.FLOAT, FIELD_TYPE.DOUBLE):
+        return pa.float64()
+    if type_code in (FIELD_TYPE.DECIMAL, FIELD_TYPE.NEWDECIMAL):
+        # pymysql reports the display length as precision, which is never smaller
+        return pa.decimal128(min(max(precision or 38, 1), 38), scale or 0)
+    if type_code in (FIELD_TYPE.DATE, FIELD_TYPE.NEWDATE):
+        return pa.date32()
+    if type_code in (FIELD_TYPE.DATETIME, FIELD_TYPE.TIMESTAMP):
+        return pa.timestamp('us')
+    return pa.string()
+
+def _write_parquet(chunks, dest) -> int:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    total = 0
+    try:
+        for description, rows in chunks:
+            if writer is None:
+                schema = pa.schema([(col[0], _arrow_type(pa, col)) for col in description])
+                writer = pq.ParquetWriter(dest, schema)
+            if not rows:
+                # An empty result still gets a valid, schema-only file
+                continue
+            columns = list(zip(*rows))
+            batch = pa.record_batch(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema,
+            )
+            writer.write_batch(batch)
+            total += len(rows)
+    finally:
+        if writer is not None:
+            writer.close()
+    return total
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Stream a table or query to CSV/Parquet")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--entity', choices=sorted(ENTITY_OPERATIONS),
+                        help="entity to export, including its display joins")
+    source.add_argument('--sql', help="arbitrary SELECT to export instead of an entity")
+    parser.add_argument('output', help="destination file path")
+    parser.add_argument('--format', choices=FORMATS,
+                        help="output format (default: from the file extension, else csv)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ('parquet' if args.output.endswith('.parquet') else 'csv')
+    db = configured_database(pool_min_size=1, pool_max_size=1)
+    success, msg = db.connect()
+    if not success:
+        print(msg, file=sys.stderr)
+        return 1
+    try:
+        if args.sql:
+            success, msg = export_query(db, args.sql, args.output, fmt, chunk_size=args.chunk_size)
+        else:
+            success, msg = export_entity(db, args.entity, args.output, fmt, args.chunk_size)
+    finally:
+        db.disconnect()
+    print(msg, file=sys.stdout if success else sys.stderr)
+    return 0 if success else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,26 @@
+-- Secondary indexes for the date/amount filters, dashboard aggregates,
+-- picker searches and reverse-direction junction lookups
+
+CREATE INDEX idx_grant_start_date ON GRANT_TABLE (start_date);
+CREATE INDEX idx_grant_close_date ON GRANT_TABLE (close_date);
+CREATE INDEX idx_grant_date_awarded ON GRANT_TABLE (date_awarded);
+CREATE INDEX idx_grant_amount ON GRANT_TABLE (amount);
+
+CREATE INDEX idx_milestone_due_date ON TOTAL_MILESTONE (due_date);
+CREATE INDEX idx_milestone_completion ON TOTAL_MILESTONE (completion);
+
+CREATE INDEX idx_grantee_name ON GRANTEE (name);
+CREATE INDEX idx_grantee_type ON GRANTEE (grantee_type);
+
+CREATE INDEX idx_beneficiary_county ON GRANTBENEFICIARY (county_of_institute);
+CREATE INDEX idx_beneficiary_institution ON GRANTBENEFICIARY (institution);
+
+-- Junction tables are keyed (grant_id, topic_id) and (grantee_id, grant_id);
+-- these cover lookups that start from the other side
+CREATE INDEX idx_grant_topic_topic_grant ON GRANT_TOPIC (topic_id, grant_id);
+CREATE INDEX idx_grantee_univs_grant_grantee ON GRANTEE_UNIVS (grant_id, grantee_id);
+
+-- Picker type-ahead searches match names by prefix
+CREATE INDEX idx_division_name ON DIVISION (name);
+CREATE INDEX idx_region_name ON REGION (name);
+CREATE INDEX idx_topic_name ON TOPIC (name);
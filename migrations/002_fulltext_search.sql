@@ -0,0 +1,7 @@
+-- FULLTEXT indexes behind SearchOperations.search; InnoDB builds one
+-- FULLTEXT index per statement, so each gets its own
+
+CREATE FULLTEXT INDEX ft_grant_purpose ON GRANT_TABLE (purpose);
+CREATE FULLTEXT INDEX ft_milestone_desc ON TOTAL_MILESTONE (milestone_desc);
+CREATE FULLTEXT INDEX ft_beneficiary_text ON GRANTBENEFICIARY (institution, description);
+CREATE FULLTEXT INDEX ft_grantee_name ON GRANTEE (name);
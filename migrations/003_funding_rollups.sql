@@ -0,0 +1,56 @@
+-- Funding rollups by region, division and topic, plus an overall total.
+-- Kept current by GrantOperations and GrantTopicOperations, which apply
+-- each write's delta in the same transaction; RollupOperations.rebuild()
+-- recomputes them from scratch. Rows cascade away with their group.
+
+CREATE TABLE ROLLUP_REGION (
+    region_id INT PRIMARY KEY,
+    grant_count INT NOT NULL DEFAULT 0,
+    total_amount DECIMAL(20, 2) NOT NULL DEFAULT 0,
+    total_duration BIGINT NOT NULL DEFAULT 0,
+    duration_count INT NOT NULL DEFAULT 0,
+    FOREIGN KEY (region_id) REFERENCES REGION(region_id) ON DELETE CASCADE
+);
+
+CREATE TABLE ROLLUP_DIVISION (
+    division_id INT PRIMARY KEY,
+    grant_count INT NOT NULL DEFAULT 0,
+    total_amount DECIMAL(20, 2) NOT NULL DEFAULT 0,
+    total_duration BIGINT NOT NULL DEFAULT 0,
+    duration_count INT NOT NULL DEFAULT 0,
+    FOREIGN KEY (division_id) REFERENCES DIVISION(division_id) ON DELETE CASCADE
+);
+
+CREATE TABLE ROLLUP_TOPIC (
+    topic_id INT PRIMARY KEY,
+    grant_count INT NOT NULL DEFAULT 0,
+    total_amount DECIMAL(20, 2) NOT NULL DEFAULT 0,
+    total_duration BIGINT NOT NULL DEFAULT 0,
+    duration_count INT NOT NULL DEFAULT 0,
+    FOREIGN KEY (topic_id) REFERENCES TOPIC(topic_id) ON DELETE CASCADE
+);
+
+-- Single row (total_id = 1) covering every grant, including unassigned ones
+CREATE TABLE ROLLUP_TOTAL (
+    total_id TINYINT PRIMARY KEY,
+    grant_count INT NOT NULL DEFAULT 0,
+    total_amount DECIMAL(20, 2) NOT NULL DEFAULT 0,
+    total_duration BIGINT NOT NULL DEFAULT 0,
+    duration_count INT NOT NULL DEFAULT 0
+);
+
+INSERT INTO ROLLUP_REGION (region_id, grant_count, total_amount, total_duration, duration_count)
+SELECT region_id, COUNT(*), COALESCE(SUM(amount), 0), COALESCE(SUM(duration), 0), COUNT(duration)
+FROM GRANT_TABLE WHERE region_id IS NOT NULL GROUP BY region_id;
+
+INSERT INTO ROLLUP_DIVISION (division_id, grant_count, total_amount, total_duration, duration_count)
+SELECT division_id, COUNT(*), COALESCE(SUM(amount), 0), COALESCE(SUM(duration), 0), COUNT(duration)
+FROM GRANT_TABLE WHERE division_id IS NOT NULL GROUP BY division_id;
+
+INSERT INTO ROLLUP_TOPIC (topic_id, grant_count, total_amount, total_duration, duration_count)
+SELECT gt.topic_id, COUNT(*), COALESCE(SUM(g.amount), 0), COALESCE(SUM(g.duration), 0), COUNT(g.duration)
+FROM GRANT_TOPIC gt JOIN GRANT_TABLE g ON gt.grant_id = g.grant_id GROUP BY gt.topic_id;
+
+INSERT INTO ROLLUP_TOTAL (total_id, grant_count, total_amount, total_duration, duration_count)
+SELECT 1, COUNT(*), COALESCE(SUM(amount), 0), COALESCE(SUM(duration), 0), COUNT(duration)
+FROM GRANT_TABLE;
@@ -0,0 +1,4 @@
+-- Lets MilestoneOperations.grant_health walk each grant's milestones in
+-- due-date order straight from the index, without a filesort
+
+CREATE INDEX idx_milestone_grant_due ON TOTAL_MILESTONE (grant_id, due_date, completion);
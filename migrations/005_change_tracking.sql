@@ -0,0 +1,288 @@
+-- Change tracking for incremental refresh (TableOperations.changes_since).
+--
+-- Every row carries updated_at and row_version. row_version is drawn from a
+-- per-table counter in CHANGE_SEQUENCE by the triggers below, so it grows
+-- monotonically on every insert and update, whichever code path wrote the
+-- row. Deleted rows leave a tombstone in CHANGE_TOMBSTONE numbered from the
+-- same counter. The counter row stays locked until the writing transaction
+-- commits, so sequence numbers become visible in commit order and a reader
+-- holding token N never misses a change numbered below a later token.
+--
+-- Rows removed or re-keyed by ON DELETE CASCADE / SET NULL foreign keys do
+-- not fire triggers, so each parent's BEFORE DELETE trigger makes those
+-- changes itself first; the foreign key actions then find nothing left to do.
+
+CREATE TABLE CHANGE_SEQUENCE (
+    table_name VARCHAR(64) PRIMARY KEY,
+    last_seq BIGINT UNSIGNED NOT NULL DEFAULT 0,
+    -- Tombstones up to this sequence number have been pruned
+    pruned_seq BIGINT UNSIGNED NOT NULL DEFAULT 0
+);
+
+CREATE TABLE CHANGE_TOMBSTONE (
+    table_name VARCHAR(64) NOT NULL,
+    seq BIGINT UNSIGNED NOT NULL,
+    key1 INT NOT NULL,
+    key2 INT NOT NULL DEFAULT 0,
+    deleted_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (table_name, seq, key1, key2)
+);
+
+INSERT INTO CHANGE_SEQUENCE (table_name) VALUES
+    ('DIVISION'),
+    ('REGION'),
+    ('TOPIC'),
+    ('GRANTEE'),
+    ('GRANT_TABLE'),
+    ('GRANTBENEFICIARY'),
+    ('TOTAL_MILESTONE'),
+    ('GRANTEE_UNIVS'),
+    ('GRANT_TOPIC');
+
+ALTER TABLE DIVISION
+    ADD COLUMN row_version BIGINT UNSIGNED NOT NULL DEFAULT 0,
+    ADD COLUMN updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    ADD INDEX idx_division_row_version (row_version);
+
+ALTER TABLE REGION
+    ADD COLUMN row_version BIGINT UNSIGNED NOT NULL DEFAULT 0,
+    ADD COLUMN updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    ADD INDEX idx_region_row_version (row_version);
+
+ALTER TABLE TOPIC
+    ADD COLUMN row_version BIGINT UNSIGNED NOT NULL DEFAULT 0,
+    ADD COLUMN updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    ADD INDEX idx_topic_row_version (row_version);
+
+ALTER TABLE GRANTEE
+    ADD COLUMN row_version BIGINT UNSIGNED NOT NULL DEFAULT 0,
+    ADD COLUMN updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    ADD INDEX idx_grantee_row_version (row_version);
+
+ALTER TABLE GRANT_TABLE
+    ADD COLUMN row_version BIGINT UNSIGNED NOT NULL DEFAULT 0,
+    ADD COLUMN updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    ADD INDEX idx_grant_table_row_version (row_version);
+
+ALTER TABLE GRANTBENEFICIARY
+    ADD COLUMN row_version BIGINT UNSIGNED NOT NULL DEFAULT 0,
+    ADD COLUMN updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    ADD INDEX idx_grantbeneficiary_row_version (row_version);
+
+ALTER TABLE TOTAL_MILESTONE
+    ADD COLUMN row_version BIGINT UNSIGNED NOT NULL DEFAULT 0,
+    ADD COLUMN updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    ADD INDEX idx_total_milestone_row_version (row_version);
+
+ALTER TABLE GRANTEE_UNIVS
+    ADD COLUMN row_version BIGINT UNSIGNED NOT NULL DEFAULT 0,
+    ADD COLUMN updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    ADD INDEX idx_grantee_univs_row_version (row_version);
+
+ALTER TABLE GRANT_TOPIC
+    ADD COLUMN row_version BIGINT UNSIGNED NOT NULL DEFAULT 0,
+    ADD COLUMN updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    ADD INDEX idx_grant_topic_row_version (row_version);
+
+DELIMITER $$
+
+CREATE TRIGGER trg_division_insert BEFORE INSERT ON DIVISION FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'DIVISION';
+    SET NEW.row_version = (SELECT last_seq FROM CHANGE_SEQUENCE WHERE table_name = 'DIVISION');
+END$$
+
+CREATE TRIGGER trg_division_update BEFORE UPDATE ON DIVISION FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'DIVISION';
+    SET NEW.row_version = (SELECT last_seq FROM CHANGE_SEQUENCE WHERE table_name = 'DIVISION');
+END$$
+
+CREATE TRIGGER trg_division_cascade BEFORE DELETE ON DIVISION FOR EACH ROW
+BEGIN
+    UPDATE GRANT_TABLE SET division_id = NULL WHERE division_id = OLD.division_id;
+END$$
+
+CREATE TRIGGER trg_division_delete AFTER DELETE ON DIVISION FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'DIVISION';
+    INSERT INTO CHANGE_TOMBSTONE (table_name, seq, key1, key2)
+    SELECT table_name, last_seq, OLD.division_id, 0 FROM CHANGE_SEQUENCE WHERE table_name = 'DIVISION';
+END$$
+
+CREATE TRIGGER trg_region_insert BEFORE INSERT ON REGION FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'REGION';
+    SET NEW.row_version = (SELECT last_seq FROM CHANGE_SEQUENCE WHERE table_name = 'REGION');
+END$$
+
+CREATE TRIGGER trg_region_update BEFORE UPDATE ON REGION FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'REGION';
+    SET NEW.row_version = (SELECT last_seq FROM CHANGE_SEQUENCE WHERE table_name = 'REGION');
+END$$
+
+CREATE TRIGGER trg_region_cascade BEFORE DELETE ON REGION FOR EACH ROW
+BEGIN
+    UPDATE GRANT_TABLE SET region_id = NULL WHERE region_id = OLD.region_id;
+END$$
+
+CREATE TRIGGER trg_region_delete AFTER DELETE ON REGION FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'REGION';
+    INSERT INTO CHANGE_TOMBSTONE (table_name, seq, key1, key2)
+    SELECT table_name, last_seq, OLD.region_id, 0 FROM CHANGE_SEQUENCE WHERE table_name = 'REGION';
+END$$
+
+CREATE TRIGGER trg_topic_insert BEFORE INSERT ON TOPIC FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'TOPIC';
+    SET NEW.row_version = (SELECT last_seq FROM CHANGE_SEQUENCE WHERE table_name = 'TOPIC');
+END$$
+
+CREATE TRIGGER trg_topic_update BEFORE UPDATE ON TOPIC FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'TOPIC';
+    SET NEW.row_version = (SELECT last_seq FROM CHANGE_SEQUENCE WHERE table_name = 'TOPIC');
+END$$
+
+CREATE TRIGGER trg_topic_cascade BEFORE DELETE ON TOPIC FOR EACH ROW
+BEGIN
+    DELETE FROM GRANT_TOPIC WHERE topic_id = OLD.topic_id;
+END$$
+
+CREATE TRIGGER trg_topic_delete AFTER DELETE ON TOPIC FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'TOPIC';
+    INSERT INTO CHANGE_TOMBSTONE (table_name, seq, key1, key2)
+    SELECT table_name, last_seq, OLD.topic_id, 0 FROM CHANGE_SEQUENCE WHERE table_name = 'TOPIC';
+END$$
+
+CREATE TRIGGER trg_grantee_insert BEFORE INSERT ON GRANTEE FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'GRANTEE';
+    SET NEW.row_version = (SELECT last_seq FROM CHANGE_SEQUENCE WHERE table_name = 'GRANTEE');
+END$$
+
+CREATE TRIGGER trg_grantee_update BEFORE UPDATE ON GRANTEE FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'GRANTEE';
+    SET NEW.row_version = (SELECT last_seq FROM CHANGE_SEQUENCE WHERE table_name = 'GRANTEE');
+END$$
+
+CREATE TRIGGER trg_grantee_cascade BEFORE DELETE ON GRANTEE FOR EACH ROW
+BEGIN
+    DELETE FROM GRANTBENEFICIARY WHERE grantee_id = OLD.grantee_id;
+    DELETE FROM GRANTEE_UNIVS WHERE grantee_id = OLD.grantee_id;
+END$$
+
+CREATE TRIGGER trg_grantee_delete AFTER DELETE ON GRANTEE FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'GRANTEE';
+    INSERT INTO CHANGE_TOMBSTONE (table_name, seq, key1, key2)
+    SELECT table_name, last_seq, OLD.grantee_id, 0 FROM CHANGE_SEQUENCE WHERE table_name = 'GRANTEE';
+END$$
+
+CREATE TRIGGER trg_grant_table_insert BEFORE INSERT ON GRANT_TABLE FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'GRANT_TABLE';
+    SET NEW.row_version = (SELECT last_seq FROM CHANGE_SEQUENCE WHERE table_name = 'GRANT_TABLE');
+END$$
+
+CREATE TRIGGER trg_grant_table_update BEFORE UPDATE ON GRANT_TABLE FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'GRANT_TABLE';
+    SET NEW.row_version = (SELECT last_seq FROM CHANGE_SEQUENCE WHERE table_name = 'GRANT_TABLE');
+END$$
+
+CREATE TRIGGER trg_grant_table_cascade BEFORE DELETE ON GRANT_TABLE FOR EACH ROW
+BEGIN
+    DELETE FROM TOTAL_MILESTONE WHERE grant_id = OLD.grant_id;
+    DELETE FROM GRANTEE_UNIVS WHERE grant_id = OLD.grant_id;
+    DELETE FROM GRANT_TOPIC WHERE grant_id = OLD.grant_id;
+END$$
+
+CREATE TRIGGER trg_grant_table_delete AFTER DELETE ON GRANT_TABLE FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'GRANT_TABLE';
+    INSERT INTO CHANGE_TOMBSTONE (table_name, seq, key1, key2)
+    SELECT table_name, last_seq, OLD.grant_id, 0 FROM CHANGE_SEQUENCE WHERE table_name = 'GRANT_TABLE';
+END$$
+
+CREATE TRIGGER trg_grantbeneficiary_insert BEFORE INSERT ON GRANTBENEFICIARY FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'GRANTBENEFICIARY';
+    SET NEW.row_version = (SELECT last_seq FROM CHANGE_SEQUENCE WHERE table_name = 'GRANTBENEFICIARY');
+END$$
+
+CREATE TRIGGER trg_grantbeneficiary_update BEFORE UPDATE ON GRANTBENEFICIARY FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'GRANTBENEFICIARY';
+    SET NEW.row_version = (SELECT last_seq FROM CHANGE_SEQUENCE WHERE table_name = 'GRANTBENEFICIARY');
+END$$
+
+CREATE TRIGGER trg_grantbeneficiary_delete AFTER DELETE ON GRANTBENEFICIARY FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'GRANTBENEFICIARY';
+    INSERT INTO CHANGE_TOMBSTONE (table_name, seq, key1, key2)
+    SELECT table_name, last_seq, OLD.beneficiary_id, 0 FROM CHANGE_SEQUENCE WHERE table_name = 'GRANTBENEFICIARY';
+END$$
+
+CREATE TRIGGER trg_total_milestone_insert BEFORE INSERT ON TOTAL_MILESTONE FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'TOTAL_MILESTONE';
+    SET NEW.row_version = (SELECT last_seq FROM CHANGE_SEQUENCE WHERE table_name = 'TOTAL_MILESTONE');
+END$$
+
+CREATE TRIGGER trg_total_milestone_update BEFORE UPDATE ON TOTAL_MILESTONE FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'TOTAL_MILESTONE';
+    SET NEW.row_version = (SELECT last_seq FROM CHANGE_SEQUENCE WHERE table_name = 'TOTAL_MILESTONE');
+END$$
+
+CREATE TRIGGER trg_total_milestone_delete AFTER DELETE ON TOTAL_MILESTONE FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'TOTAL_MILESTONE';
+    INSERT INTO CHANGE_TOMBSTONE (table_name, seq, key1, key2)
+    SELECT table_name, last_seq, OLD.milestone_id, 0 FROM CHANGE_SEQUENCE WHERE table_name = 'TOTAL_MILESTONE';
+END$$
+
+CREATE TRIGGER trg_grantee_univs_insert BEFORE INSERT ON GRANTEE_UNIVS FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'GRANTEE_UNIVS';
+    SET NEW.row_version = (SELECT last_seq FROM CHANGE_SEQUENCE WHERE table_name = 'GRANTEE_UNIVS');
+END$$
+
+CREATE TRIGGER trg_grantee_univs_update BEFORE UPDATE ON GRANTEE_UNIVS FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'GRANTEE_UNIVS';
+    SET NEW.row_version = (SELECT last_seq FROM CHANGE_SEQUENCE WHERE table_name = 'GRANTEE_UNIVS');
+END$$
+
+CREATE TRIGGER trg_grantee_univs_delete AFTER DELETE ON GRANTEE_UNIVS FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'GRANTEE_UNIVS';
+    INSERT INTO CHANGE_TOMBSTONE (table_name, seq, key1, key2)
+    SELECT table_name, last_seq, OLD.grantee_id, OLD.grant_id FROM CHANGE_SEQUENCE WHERE table_name = 'GRANTEE_UNIVS';
+END$$
+
+CREATE TRIGGER trg_grant_topic_insert BEFORE INSERT ON GRANT_TOPIC FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'GRANT_TOPIC';
+    SET NEW.row_version = (SELECT last_seq FROM CHANGE_SEQUENCE WHERE table_name = 'GRANT_TOPIC');
+END$$
+
+CREATE TRIGGER trg_grant_topic_update BEFORE UPDATE ON GRANT_TOPIC FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'GRANT_TOPIC';
+    SET NEW.row_version = (SELECT last_seq FROM CHANGE_SEQUENCE WHERE table_name = 'GRANT_TOPIC');
+END$$
+
+CREATE TRIGGER trg_grant_topic_delete AFTER DELETE ON GRANT_TOPIC FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'GRANT_TOPIC';
+    INSERT INTO CHANGE_TOMBSTONE (table_name, seq, key1, key2)
+    SELECT table_name, last_seq, OLD.grant_id, OLD.topic_id FROM CHANGE_SEQUENCE WHERE table_name = 'GRANT_TOPIC';
+END$$
+
+DELIMITER ;
@@ -0,0 +1,34 @@
+-- Rollups behind the dashboard's active grant count and milestone figures.
+-- Kept current by GrantOperations and MilestoneOperations in the same
+-- transaction as each write, like the funding rollups in 003;
+-- RollupOperations.rebuild() recomputes them from scratch.
+
+-- Grants starting and closing on each day. A grant is active on every day
+-- from its start_date through its close_date, so the grants active today are
+-- the starts up to today minus the closes before today. Grants without both
+-- dates, or closing before they start, are never active and are left out.
+CREATE TABLE ROLLUP_ACTIVITY (
+    activity_date DATE PRIMARY KEY,
+    starts INT NOT NULL DEFAULT 0,
+    closes INT NOT NULL DEFAULT 0
+);
+
+-- Single row (total_id = 1) covering every milestone
+CREATE TABLE ROLLUP_MILESTONE (
+    total_id TINYINT PRIMARY KEY,
+    milestone_count INT NOT NULL DEFAULT 0,
+    completion_sum BIGINT NOT NULL DEFAULT 0,
+    completion_count INT NOT NULL DEFAULT 0
+);
+
+INSERT INTO ROLLUP_ACTIVITY (activity_date, starts, closes)
+SELECT activity_date, SUM(starts), SUM(closes) FROM (
+    SELECT start_date AS activity_date, 1 AS starts, 0 AS closes
+    FROM GRANT_TABLE WHERE start_date <= close_date
+    UNION ALL
+    SELECT close_date, 0, 1 FROM GRANT_TABLE WHERE start_date <= close_date
+) d GROUP BY activity_date;
+
+INSERT INTO ROLLUP_MILESTONE (total_id, milestone_count, completion_sum, completion_count)
+SELECT 1, COUNT(*), COALESCE(SUM(completion), 0), COUNT(completion)
+FROM TOTAL_MILESTONE;
@@ -0,0 +1,3 @@
+-- SQLite has no FULLTEXT indexes; SearchOperations.search runs on SQLite as
+-- a scan with the same boolean prefix matching (mysql_match() in
+-- sqlite_backend.py). Recorded as applied so the version numbers line up.
@@ -0,0 +1,306 @@
+-- Change tracking for incremental refresh, SQLite dialect of
+-- migrations/005_change_tracking.sql: same tables, columns, indexes and
+-- sequence numbering.
+--
+-- SQLite triggers cannot assign NEW columns, so row_version and updated_at
+-- are stamped by AFTER INSERT / AFTER UPDATE triggers that update the row
+-- again; the update trigger skips statements that set row_version
+-- themselves, which is how it ignores its own update. Foreign key actions
+-- fire triggers in SQLite, so ON DELETE CASCADE / SET NULL needs no helper
+-- triggers, and with a single writer sequence numbers are visible in commit
+-- order.
+
+CREATE TABLE CHANGE_SEQUENCE (
+    table_name VARCHAR(64) PRIMARY KEY,
+    last_seq BIGINT NOT NULL DEFAULT 0,
+    -- Tombstones up to this sequence number have been pruned
+    pruned_seq BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE CHANGE_TOMBSTONE (
+    table_name VARCHAR(64) NOT NULL,
+    seq BIGINT NOT NULL,
+    key1 INT NOT NULL,
+    key2 INT NOT NULL DEFAULT 0,
+    deleted_at TIMESTAMP NOT NULL DEFAULT (datetime('now', 'localtime')),
+    PRIMARY KEY (table_name, seq, key1, key2)
+);
+
+INSERT INTO CHANGE_SEQUENCE (table_name) VALUES
+    ('DIVISION'),
+    ('REGION'),
+    ('TOPIC'),
+    ('GRANTEE'),
+    ('GRANT_TABLE'),
+    ('GRANTBENEFICIARY'),
+    ('TOTAL_MILESTONE'),
+    ('GRANTEE_UNIVS'),
+    ('GRANT_TOPIC');
+
+-- ALTER TABLE cannot add a column defaulting to the current time; existing
+-- rows are stamped once, and the triggers stamp every later write
+
+ALTER TABLE DIVISION ADD COLUMN row_version BIGINT NOT NULL DEFAULT 0;
+ALTER TABLE DIVISION ADD COLUMN updated_at TIMESTAMP;
+UPDATE DIVISION SET updated_at = datetime('now', 'localtime');
+CREATE INDEX idx_division_row_version ON DIVISION (row_version);
+
+ALTER TABLE REGION ADD COLUMN row_version BIGINT NOT NULL DEFAULT 0;
+ALTER TABLE REGION ADD COLUMN updated_at TIMESTAMP;
+UPDATE REGION SET updated_at = datetime('now', 'localtime');
+CREATE INDEX idx_region_row_version ON REGION (row_version);
+
+ALTER TABLE TOPIC ADD COLUMN row_version BIGINT NOT NULL DEFAULT 0;
+ALTER TABLE TOPIC ADD COLUMN updated_at TIMESTAMP;
+UPDATE TOPIC SET updated_at = datetime('now', 'localtime');
+CREATE INDEX idx_topic_row_version ON TOPIC (row_version);
+
+ALTER TABLE GRANTEE ADD COLUMN row_version BIGINT NOT NULL DEFAULT 0;
+ALTER TABLE GRANTEE ADD COLUMN updated_at TIMESTAMP;
+UPDATE GRANTEE SET updated_at = datetime('now', 'localtime');
+CREATE INDEX idx_grantee_row_version ON GRANTEE (row_version);
+
+ALTER TABLE GRANT_TABLE ADD COLUMN row_version BIGINT NOT NULL DEFAULT 0;
+ALTER TABLE GRANT_TABLE ADD COLUMN updated_at TIMESTAMP;
+UPDATE GRANT_TABLE SET updated_at = datetime('now', 'localtime');
+CREATE INDEX idx_grant_table_row_version ON GRANT_TABLE (row_version);
+
+ALTER TABLE GRANTBENEFICIARY ADD COLUMN row_version BIGINT NOT NULL DEFAULT 0;
+ALTER TABLE GRANTBENEFICIARY ADD COLUMN updated_at TIMESTAMP;
+UPDATE GRANTBENEFICIARY SET updated_at = datetime('now', 'localtime');
+CREATE INDEX idx_grantbeneficiary_row_version ON GRANTBENEFICIARY (row_version);
+
+ALTER TABLE TOTAL_MILESTONE ADD COLUMN row_version BIGINT NOT NULL DEFAULT 0;
+ALTER TABLE TOTAL_MILESTONE ADD COLUMN updated_at TIMESTAMP;
+UPDATE TOTAL_MILESTONE SET updated_at = datetime('now', 'localtime');
+CREATE INDEX idx_total_milestone_row_version ON TOTAL_MILESTONE (row_version);
+
+ALTER TABLE GRANTEE_UNIVS ADD COLUMN row_version BIGINT NOT NULL DEFAULT 0;
+ALTER TABLE GRANTEE_UNIVS ADD COLUMN updated_at TIMESTAMP;
+UPDATE GRANTEE_UNIVS SET updated_at = datetime('now', 'localtime');
+CREATE INDEX idx_grantee_univs_row_version ON GRANTEE_UNIVS (row_version);
+
+ALTER TABLE GRANT_TOPIC ADD COLUMN row_version BIGINT NOT NULL DEFAULT 0;
+ALTER TABLE GRANT_TOPIC ADD COLUMN updated_at TIMESTAMP;
+UPDATE GRANT_TOPIC SET updated_at = datetime('now', 'localtime');
+CREATE INDEX idx_grant_topic_row_version ON GRANT_TOPIC (row_version);
+
+DELIMITER $$
+
+CREATE TRIGGER trg_division_insert AFTER INSERT ON DIVISION FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'DIVISION';
+    UPDATE DIVISION SET row_version = (SELECT last_seq FROM CHANGE_SEQUENCE WHERE table_name = 'DIVISION'),
+        updated_at = datetime('now', 'localtime')
+    WHERE rowid = NEW.rowid;
+END$$
+
+CREATE TRIGGER trg_division_update AFTER UPDATE ON DIVISION FOR EACH ROW
+WHEN NEW.row_version = OLD.row_version
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'DIVISION';
+    UPDATE DIVISION SET row_version = (SELECT last_seq FROM CHANGE_SEQUENCE WHERE table_name = 'DIVISION'),
+        updated_at = datetime('now', 'localtime')
+    WHERE rowid = NEW.rowid;
+END$$
+
+CREATE TRIGGER trg_division_delete AFTER DELETE ON DIVISION FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'DIVISION';
+    INSERT INTO CHANGE_TOMBSTONE (table_name, seq, key1, key2)
+    SELECT table_name, last_seq, OLD.division_id, 0 FROM CHANGE_SEQUENCE WHERE table_name = 'DIVISION';
+END$$
+
+CREATE TRIGGER trg_region_insert AFTER INSERT ON REGION FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'REGION';
+    UPDATE REGION SET row_version = (SELECT last_seq FROM CHANGE_SEQUENCE WHERE table_name = 'REGION'),
+        updated_at = datetime('now', 'localtime')
+    WHERE rowid = NEW.rowid;
+END$$
+
+CREATE TRIGGER trg_region_update AFTER UPDATE ON REGION FOR EACH ROW
+WHEN NEW.row_version = OLD.row_version
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'REGION';
+    UPDATE REGION SET row_version = (SELECT last_seq FROM CHANGE_SEQUENCE WHERE table_name = 'REGION'),
+        updated_at = datetime('now', 'localtime')
+    WHERE rowid = NEW.rowid;
+END$$
+
+CREATE TRIGGER trg_region_delete AFTER DELETE ON REGION FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'REGION';
+    INSERT INTO CHANGE_TOMBSTONE (table_name, seq, key1, key2)
+    SELECT table_name, last_seq, OLD.region_id, 0 FROM CHANGE_SEQUENCE WHERE table_name = 'REGION';
+END$$
+
+CREATE TRIGGER trg_topic_insert AFTER INSERT ON TOPIC FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'TOPIC';
+    UPDATE TOPIC SET row_version = (SELECT last_seq FROM CHANGE_SEQUENCE WHERE table_name = 'TOPIC'),
+        updated_at = datetime('now', 'localtime')
+    WHERE rowid = NEW.rowid;
+END$$
+
+CREATE TRIGGER trg_topic_update AFTER UPDATE ON TOPIC FOR EACH ROW
+WHEN NEW.row_version = OLD.row_version
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'TOPIC';
+    UPDATE TOPIC SET row_version = (SELECT last_seq FROM CHANGE_SEQUENCE WHERE table_name = 'TOPIC'),
+        updated_at = datetime('now', 'localtime')
+    WHERE rowid = NEW.rowid;
+END$$
+
+CREATE TRIGGER trg_topic_delete AFTER DELETE ON TOPIC FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'TOPIC';
+    INSERT INTO CHANGE_TOMBSTONE (table_name, seq, key1, key2)
+    SELECT table_name, last_seq, OLD.topic_id, 0 FROM CHANGE_SEQUENCE WHERE table_name = 'TOPIC';
+END$$
+
+CREATE TRIGGER trg_grantee_insert AFTER INSERT ON GRANTEE FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'GRANTEE';
+    UPDATE GRANTEE SET row_version = (SELECT last_seq FROM CHANGE_SEQUENCE WHERE table_name = 'GRANTEE'),
+        updated_at = datetime('now', 'localtime')
+    WHERE rowid = NEW.rowid;
+END$$
+
+CREATE TRIGGER trg_grantee_update AFTER UPDATE ON GRANTEE FOR EACH ROW
+WHEN NEW.row_version = OLD.row_version
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'GRANTEE';
+    UPDATE GRANTEE SET row_version = (SELECT last_seq FROM CHANGE_SEQUENCE WHERE table_name = 'GRANTEE'),
+        updated_at = datetime('now', 'localtime')
+    WHERE rowid = NEW.rowid;
+END$$
+
+CREATE TRIGGER trg_grantee_delete AFTER DELETE ON GRANTEE FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'GRANTEE';
+    INSERT INTO CHANGE_TOMBSTONE (table_name, seq, key1, key2)
+    SELECT table_name, last_seq, OLD.grantee_id, 0 FROM CHANGE_SEQUENCE WHERE table_name = 'GRANTEE';
+END$$
+
+CREATE TRIGGER trg_grant_table_insert AFTER INSERT ON GRANT_TABLE FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'GRANT_TABLE';
+    UPDATE GRANT_TABLE SET row_version = (SELECT last_seq FROM CHANGE_SEQUENCE WHERE table_name = 'GRANT_TABLE'),
+        updated_at = datetime('now', 'localtime')
+    WHERE rowid = NEW.rowid;
+END$$
+
+CREATE TRIGGER trg_grant_table_update AFTER UPDATE ON GRANT_TABLE FOR EACH ROW
+WHEN NEW.row_version = OLD.row_version
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'GRANT_TABLE';
+    UPDATE GRANT_TABLE SET row_version = (SELECT last_seq FROM CHANGE_SEQUENCE WHERE table_name = 'GRANT_TABLE'),
+        updated_at = datetime('now', 'localtime')
+    WHERE rowid = NEW.rowid;
+END$$
+
+CREATE TRIGGER trg_grant_table_delete AFTER DELETE ON GRANT_TABLE FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'GRANT_TABLE';
+    INSERT INTO CHANGE_TOMBSTONE (table_name, seq, key1, key2)
+    SELECT table_name, last_seq, OLD.grant_id, 0 FROM CHANGE_SEQUENCE WHERE table_name = 'GRANT_TABLE';
+END$$
+
+CREATE TRIGGER trg_grantbeneficiary_insert AFTER INSERT ON GRANTBENEFICIARY FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'GRANTBENEFICIARY';
+    UPDATE GRANTBENEFICIARY SET row_version = (SELECT last_seq FROM CHANGE_SEQUENCE WHERE table_name = 'GRANTBENEFICIARY'),
+        updated_at = datetime('now', 'localtime')
+    WHERE rowid = NEW.rowid;
+END$$
+
+CREATE TRIGGER trg_grantbeneficiary_update AFTER UPDATE ON GRANTBENEFICIARY FOR EACH ROW
+WHEN NEW.row_version = OLD.row_version
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'GRANTBENEFICIARY';
+    UPDATE GRANTBENEFICIARY SET row_version = (SELECT last_seq FROM CHANGE_SEQUENCE WHERE table_name = 'GRANTBENEFICIARY'),
+        updated_at = datetime('now', 'localtime')
+    WHERE rowid = NEW.rowid;
+END$$
+
+CREATE TRIGGER trg_grantbeneficiary_delete AFTER DELETE ON GRANTBENEFICIARY FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'GRANTBENEFICIARY';
+    INSERT INTO CHANGE_TOMBSTONE (table_name, seq, key1, key2)
+    SELECT table_name, last_seq, OLD.beneficiary_id, 0 FROM CHANGE_SEQUENCE WHERE table_name = 'GRANTBENEFICIARY';
+END$$
+
+CREATE TRIGGER trg_total_milestone_insert AFTER INSERT ON TOTAL_MILESTONE FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'TOTAL_MILESTONE';
+    UPDATE TOTAL_MILESTONE SET row_version = (SELECT last_seq FROM CHANGE_SEQUENCE WHERE table_name = 'TOTAL_MILESTONE'),
+        updated_at = datetime('now', 'localtime')
+    WHERE rowid = NEW.rowid;
+END$$
+
+CREATE TRIGGER trg_total_milestone_update AFTER UPDATE ON TOTAL_MILESTONE FOR EACH ROW
+WHEN NEW.row_version = OLD.row_version
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'TOTAL_MILESTONE';
+    UPDATE TOTAL_MILESTONE SET row_version = (SELECT last_seq FROM CHANGE_SEQUENCE WHERE table_name = 'TOTAL_MILESTONE'),
+        updated_at = datetime('now', 'localtime')
+    WHERE rowid = NEW.rowid;
+END$$
+
+CREATE TRIGGER trg_total_milestone_delete AFTER DELETE ON TOTAL_MILESTONE FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'TOTAL_MILESTONE';
+    INSERT INTO CHANGE_TOMBSTONE (table_name, seq, key1, key2)
+    SELECT table_name, last_seq, OLD.milestone_id, 0 FROM CHANGE_SEQUENCE WHERE table_name = 'TOTAL_MILESTONE';
+END$$
+
+CREATE TRIGGER trg_grantee_univs_insert AFTER INSERT ON GRANTEE_UNIVS FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'GRANTEE_UNIVS';
+    UPDATE GRANTEE_UNIVS SET row_version = (SELECT last_seq FROM CHANGE_SEQUENCE WHERE table_name = 'GRANTEE_UNIVS'),
+        updated_at = datetime('now', 'localtime')
+    WHERE rowid = NEW.rowid;
+END$$
+
+CREATE TRIGGER trg_grantee_univs_update AFTER UPDATE ON GRANTEE_UNIVS FOR EACH ROW
+WHEN NEW.row_version = OLD.row_version
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'GRANTEE_UNIVS';
+    UPDATE GRANTEE_UNIVS SET row_version = (SELECT last_seq FROM CHANGE_SEQUENCE WHERE table_name = 'GRANTEE_UNIVS'),
+        updated_at = datetime('now', 'localtime')
+    WHERE rowid = NEW.rowid;
+END$$
+
+CREATE TRIGGER trg_grantee_univs_delete AFTER DELETE ON GRANTEE_UNIVS FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'GRANTEE_UNIVS';
+    INSERT INTO CHANGE_TOMBSTONE (table_name, seq, key1, key2)
+    SELECT table_name, last_seq, OLD.grantee_id, OLD.grant_id FROM CHANGE_SEQUENCE WHERE table_name = 'GRANTEE_UNIVS';
+END$$
+
+CREATE TRIGGER trg_grant_topic_insert AFTER INSERT ON GRANT_TOPIC FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'GRANT_TOPIC';
+    UPDATE GRANT_TOPIC SET row_version = (SELECT last_seq FROM CHANGE_SEQUENCE WHERE table_name = 'GRANT_TOPIC'),
+        updated_at = datetime('now', 'localtime')
+    WHERE rowid = NEW.rowid;
+END$$
+
+CREATE TRIGGER trg_grant_topic_update AFTER UPDATE ON GRANT_TOPIC FOR EACH ROW
+WHEN NEW.row_version = OLD.row_version
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'GRANT_TOPIC';
+    UPDATE GRANT_TOPIC SET row_version = (SELECT last_seq FROM CHANGE_SEQUENCE WHERE table_name = 'GRANT_TOPIC'),
+        updated_at = datetime('now', 'localtime')
+    WHERE rowid = NEW.rowid;
+END$$
+
+CREATE TRIGGER trg_grant_topic_delete AFTER DELETE ON GRANT_TOPIC FOR EACH ROW
+BEGIN
+    UPDATE CHANGE_SEQUENCE SET last_seq = last_seq + 1 WHERE table_name = 'GRANT_TOPIC';
+    INSERT INTO CHANGE_TOMBSTONE (table_name, seq, key1, key2)
+    SELECT table_name, last_seq, OLD.grant_id, OLD.topic_id FROM CHANGE_SEQUENCE WHERE table_name = 'GRANT_TOPIC';
+END$$
+
+DELIMITER ;
@@ -0,0 +1,43 @@
+"""Rebuild or verify the rollup tables from migrations/003_funding_rollups.sql and
+migrations/006_summary_rollups.sql.
+
+Writes through GrantOperations, GrantTopicOperations and MilestoneOperations keep the rollups
+current incrementally; use this after loading data by other means, or to
+check that the maintained totals still match a fresh aggregation.
+
+Usage:
+    python rollups.py verify
+    python rollups.py rebuild
+"""
+import argparse
+import sys
+from typing import Optional
+
+from db_operations import RollupOperations, configured_database
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Rebuild or verify the funding rollups")
+    parser.add_argument('command', choices=('rebuild', 'verify'))
+    args = parser.parse_args(argv)
+
+    db = configured_database(pool_min_size=1, pool_max_size=1)
+    success, msg = db.connect()
+    if not success:
+        print(msg, file=sys.stderr)
+        return 1
+    try:
+        rollups = RollupOperations(db)
+        if args.command == 'rebuild':
+            success, msg = rollups.rebuild()
+            print(msg, file=sys.stdout if success else sys.stderr)
+            return 0 if success else 1
+        problems = rollups.verify()
+        for problem in problems:
+            print(problem)
+        print(f"{len(problems)} mismatched rollup rows" if problems else "Rollups are consistent")
+        return 1 if problems else 0
+    finally:
+        db.disconnect()
+
+if __name__ == "__main__":
+    sys.exit(main())
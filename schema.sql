@@ -1,5 +1,15 @@
 -- Grant Management System Database Schema
 -- Drop existing tables if they exist
+-- (indexes and later changes are applied on top of this baseline by migrations/)
+DROP TABLE IF EXISTS schema_migrations;
+DROP TABLE IF EXISTS CHANGE_TOMBSTONE;
+DROP TABLE IF EXISTS CHANGE_SEQUENCE;
+DROP TABLE IF EXISTS ROLLUP_REGION;
+DROP TABLE IF EXISTS ROLLUP_DIVISION;
+DROP TABLE IF EXISTS ROLLUP_TOPIC;
+DROP TABLE IF EXISTS ROLLUP_TOTAL;
+DROP TABLE IF EXISTS ROLLUP_ACTIVITY;
+DROP TABLE IF EXISTS ROLLUP_MILESTONE;
 DROP TABLE IF EXISTS GRANTEE_UNIVS;
 DROP TABLE IF EXISTS TOTAL_MILESTONE;
 DROP TABLE IF EXISTS GRANT_TOPIC;
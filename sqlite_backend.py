@@ -0,0 +1,680 @@
+"""Embedded SQLite backend behind the same Operations API.
+
+SQLiteConnection is a DatabaseConnection whose pooled connections are SQLite
+connections dressed up as pymysql ones: the same cursor classes, exception
+types and error codes, and pymysql FIELD_TYPE codes in cursor.description.
+Every Operations class, AsyncDatabase, the HTTP API and app.py therefore run
+on it unchanged:
+
+    db = SQLiteConnection('grant_management.db')   # or ':memory:' for tests
+    db.bootstrap('schema.sql')
+    GrantOperations(db).read_page(limit=50)
+
+The Operations classes speak MySQL; translate_sql() rewrites each statement
+into SQLite's dialect once and memoizes the result, so a repeated query hands
+sqlite3 the identical string and its compiled statement is reused from the
+connection's statement cache. The schema comes from schema_sqlite.sql and the
+migrations from migrations/, with the files in migrations/sqlite/ replacing
+the MySQL-only ones (see DatabaseConnection.dialect).
+
+File databases run in WAL mode, so readers never wait for the single writer;
+a write waits up to busy_timeout for the write lock and then fails like a
+MySQL lock wait timeout, which run_in_transaction retries. ':memory:'
+databases are shared by the pool's connections and live until disconnect();
+they suit tests and single-user scripts rather than concurrent writers.
+
+Differences from MySQL: no read replicas; search scans instead of using
+FULLTEXT indexes (same boolean prefix semantics, simpler relevance); DECIMAL
+values come back as float; DATE, DATETIME and TIMESTAMP converters are
+registered with the sqlite3 module, which applies to every sqlite3
+connection opened with detect_types in this process.
+"""
+import itertools
+import re
+import sqlite3
+import threading
+from collections import deque
+from contextlib import contextmanager
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+import pymysql
+from pymysql.constants import CR, ER, FIELD_TYPE
+
+from db_operations import DatabaseConnection
+
+# ==================== SQL TRANSLATION ====================
+_LITERAL = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\"")
+_MASK = re.compile(r'\x00(\d+)\x00')
+_MYSQL_ESCAPES = {'0': '\0', 'b': '\b', 'n': '\n', 'r': '\r', 't': '\t', 'Z': '\x1a'}
+
+_NAMED_PARAMETER = re.compile(r'%\((\w+)\)s')
+_DUPLICATE_KEY = re.compile(r'\bON\s+DUPLICATE\s+KEY\s+UPDATE\b', re.IGNORECASE)
+_VALUES_REFERENCE = re.compile(r'\bVALUES\s*\(\s*(\w+)\s*\)', re.IGNORECASE)
+_LOCKING_READ = re.compile(r'\s+(?:FOR\s+UPDATE|LOCK\s+IN\s+SHARE\s+MODE)\b', re.IGNORECASE)
+_MATCH_AGAINST = re.compile(
+    r'\bMATCH\s*\(([^()]*)\)\s*AGAINST\s*\(\s*(\?|:\w+)\s+IN\s+BOOLEAN\s+MODE\s*\)', re.IGNORECASE)
+_NOW_MINUS_SECONDS = re.compile(r'\bNOW\(\)\s*-\s*INTERVAL\s+(\?|:\w+|\d+)\s+SECOND\b', re.IGNORECASE)
+_DIVISION = re.compile(r'(?<![/*])/(?![/*])')
+_LIKE = re.compile(r'\bLIKE\s+(\?|:\w+)(?!\s+ESCAPE\b)', re.IGNORECASE)
+_PLAIN_RENAMES = [
+    (re.compile(r'\bINSERT\s+IGNORE\b', re.IGNORECASE), 'INSERT OR IGNORE'),
+    (re.compile(r'\bGREATEST\s*\(', re.IGNORECASE), 'MAX('),
+    (re.compile(r'\bLEAST\s*\(', re.IGNORECASE), 'MIN('),
+    (re.compile(r'\bCHAR_LENGTH\s*\(', re.IGNORECASE), 'length('),
+    (re.compile(r'\bFORMAT\s*\(', re.IGNORECASE), 'mysql_format('),
+    (re.compile(r'\bAS\s+(?:SIGNED|UNSIGNED)(?:\s+INTEGER)?\b', re.IGNORECASE), 'AS INTEGER'),
+    (re.compile(r'\bAS\s+CHAR\b', re.IGNORECASE), 'AS TEXT'),
+    (re.compile(r'\bCURDATE\(\)', re.IGNORECASE), "date('now', 'localtime')"),
+    (re.compile(r'\bNOW\(\)', re.IGNORECASE), "datetime('now', 'localtime')"),
+]
+# Calls rewritten argument by argument; the builders get the translated argument list
+_CALL_REWRITES = [
+    (re.compile(r'\bCONCAT\s*\(', re.IGNORECASE), lambda args: "(" + " || ".join(args) + ")"),
+    (re.compile(r'\bLEFT\s*\(', re.IGNORECASE), lambda args: f"substr({args[0]}, 1, {args[1]})"),
+    (re.compile(r'\bDATEDIFF\s*\(', re.IGNORECASE),
+     lambda args: f"CAST(julianday(date({args[0]})) - julianday(date({args[1]})) AS INTEGER)"),
+]
+
+def _sqlite_literal(literal: str) -> str:
+    """A MySQL string literal ('...' or "...", backslash escapes) as a SQLite one"""
+    quote, body = literal[0], literal[1:-1]
+    if '\\' not in body and quote == "'":
+        return literal
+    chars, i = [], 0
+    while i < len(body):
+        ch = body[i]
+        if ch == '\\' and i + 1 < len(body):
+            chars.append(_MYSQL_ESCAPES.get(body[i + 1], body[i + 1]))
+            i += 2
+            continue
+        if ch == quote and body[i + 1:i + 2] == quote:
+            i += 1
+        chars.append(ch)
+        i += 1
+    return "'" + ''.join(chars).replace("'", "''") + "'"
+
+def _call_arguments(sql: str, start: int) -> Tuple[List[str], int]:
+    """Top-level arguments of the call whose '(' ends just before start, and the index after its ')'"""
+    args, depth, begin = [], 0, start
+    for i in range(start, len(sql)):
+        ch = sql[i]
+        if ch == '(':
+            depth += 1
+        elif ch == ')':
+            if depth == 0:
+                args.append(sql[begin:i].strip())
+                return args, i + 1
+            depth -= 1
+        elif ch == ',' and depth == 0:
+            args.append(sql[begin:i].strip())
+            begin = i + 1
+    raise ValueError(f"Unbalanced parentheses in {sql!r}")
+
+def _rewrite_calls(sql: str, pattern, build) -> str:
+    # Rightmost first: no other call of the same function can sit inside its arguments
+    while True:
+        matches = list(pattern.finditer(sql))
+        if not matches:
+            return sql
+        match = matches[-1]
+        args, end = _call_arguments(sql, match.end())
+        sql = sql[:match.start()] + build(args) + sql[end:]
+
+def _unwrap_compound(sql: str) -> str:
+    """(SELECT ...) UNION ALL (SELECT ...) as SELECT * FROM (...) UNION ALL SELECT * FROM (...).
+
+    SQLite does not parenthesize compound members, and only allows ORDER BY
+    and LIMIT inside them when they are subqueries.
+    """
+    if not sql.lstrip().startswith('('):
+        return sql
+    pieces, last, depth, start = [], 0, 0, 0
+    for i, ch in enumerate(sql):
+        if ch == '(':
+            if depth == 0:
+                start = i
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+            if depth == 0 and re.match(r'\(\s*SELECT\b', sql[start:i], re.IGNORECASE):
+                pieces += [sql[last:start], "SELECT * FROM ", sql[start:i + 1]]
+                last = i + 1
+    pieces.append(sql[last:])
+    return ''.join(pieces)
+
+@lru_cache(maxsize=2048)
+def translate_sql(query: str, formatted: bool = True) -> str:
+    """query, written for MySQL through pymysql, in SQLite's dialect.
+
+    formatted says whether pymysql would have interpolated parameters into
+    the query (it only does when params are given), turning %s and %(name)s
+    into ? and :name and %% into %. String literals are left alone apart
+    from MySQL's backslash escapes. Results are memoized, so the same query
+    always yields the same string object.
+    """
+    literals = []
+
+    def mask(match):
+        literals.append(_sqlite_literal(match.group(0)))
+        return f"\x00{len(literals) - 1}\x00"
+    sql = _LITERAL.sub(mask, query)
+
+    if formatted:
+        sql = _NAMED_PARAMETER.sub(r':\1', sql).replace('%s', '?').replace('%%', '%')
+    duplicate = _DUPLICATE_KEY.search(sql)
+    if duplicate:
+        # Without a conflict target, DO UPDATE applies to whichever unique key conflicted
+        updates = _VALUES_REFERENCE.sub(r'excluded.\1', sql[duplicate.end():])
+        sql = sql[:duplicate.start()] + "ON CONFLICT DO UPDATE SET" + updates
+    sql = _LOCKING_READ.sub('', sql)
+    sql = _MATCH_AGAINST.sub(r'mysql_match(\2, \1)', sql)
+    sql = _NOW_MINUS_SECONDS.sub(r"datetime('now', 'localtime', '-' || \1 || ' seconds')", sql)
+    for pattern, replacement in _PLAIN_RENAMES:
+        sql = pattern.sub(replacement, sql)
+    for pattern, build in _CALL_REWRITES:
+        sql = _rewrite_calls(sql, pattern, build)
+    # MySQL's / never truncates; SQLite's does between integers
+    sql = _DIVISION.sub('* 1.0 /', sql)
+    # MySQL's LIKE escapes with backslash by default, SQLite's has no escape character
+    sql = _LIKE.sub(r"LIKE \1 ESCAPE '\\'", sql)
+    sql = _unwrap_compound(sql)
+    return _MASK.sub(lambda match: literals[int(match.group(1))], sql)
+
+# ==================== SQL FUNCTIONS ====================
+_WORD = re.compile(r'\w+', re.UNICODE)
+_BOOLEAN_TERM = re.compile(r'([+-]?)(\w+)(\*?)', re.UNICODE)
+
+@lru_cache(maxsize=256)
+def _boolean_terms(query: str) -> tuple:
+    return tuple((op, word.lower(), bool(star)) for op, word, star in _BOOLEAN_TERM.findall(query or ''))
+
+def _mysql_match(query, *texts) -> float:
+    """MATCH(texts) AGAINST (query IN BOOLEAN MODE): + terms required, - terms excluded, word* prefixes.
+
+    The score is the number of matching words, not InnoDB's relevance, but
+    it is 0 exactly when InnoDB's would be.
+    """
+    terms = _boolean_terms(query)
+    text = ' '.join(t for t in texts if t is not None).lower()
+    # Most rows lack a required term altogether; reject them before splitting into words
+    if any(op == '+' and term not in text for op, term, _ in terms):
+        return 0.0
+    words = _WORD.findall(text)
+    score = 0
+    for op, term, prefix in terms:
+        hits = sum(1 for w in words if (w.startswith(term) if prefix else w == term))
+        if (op == '+' and not hits) or (op == '-' and hits):
+            return 0.0
+        if op != '-':
+            score += hits
+    return float(score)
+
+def _mysql_format(value, places):
+    """FORMAT(value, places): rounded, with thousands separators"""
+    if value is None or places is None:
+        return None
+    return f"{Decimal(str(value)):,.{max(int(places), 0)}f}"
+
+# ==================== VALUE CONVERSION ====================
+def _parse_date(raw: bytes):
+    return date.fromisoformat(raw.decode()[:10])
+
+def _parse_datetime(raw: bytes):
+    return datetime.fromisoformat(raw.decode())
+
+sqlite3.register_converter('DATE', _parse_date)
+sqlite3.register_converter('DATETIME', _parse_datetime)
+sqlite3.register_converter('TIMESTAMP', _parse_datetime)
+sqlite3.register_converter('DECIMAL', lambda raw: float(raw))
+
+def _adapt(value):
+    """A parameter as sqlite3 can bind it, stored the way MySQL prints it"""
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+def _bind(args):
+    if args is None:
+        return ()
+    if isinstance(args, dict):
+        return {key: _adapt(value) for key, value in args.items()}
+    if isinstance(args, (list, tuple)):
+        return tuple(_adapt(value) for value in args)
+    return (_adapt(args),)
+
+_ISO_DATE = re.compile(r'\d{4}-\d{2}-\d{2}$')
+_ISO_DATETIME = re.compile(r'\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(?:\.\d+)?$')
+
+def _lenient(parse):
+    def convert(value):
+        if not isinstance(value, str):
+            return value
+        try:
+            return parse(value.encode())
+        except ValueError:
+            return value
+    return convert
+
+def _column_type(values: list):
+    """(FIELD_TYPE code, converter or None) for a result column, from its first values.
+
+    SQLite only knows the declared type of plain column references, so
+    expressions are typed by what they hold; ISO date strings from
+    expressions such as MAX(start_date) are converted as DATE columns.
+    """
+    kinds = {type(v) for v in values if v is not None}
+    if not kinds:
+        return FIELD_TYPE.VAR_STRING, None
+    if kinds <= {int, bool}:
+        return FIELD_TYPE.LONGLONG, None
+    if kinds <= {int, bool, float}:
+        return FIELD_TYPE.DOUBLE, None
+    if kinds == {datetime}:
+        return FIELD_TYPE.DATETIME, None
+    if kinds <= {date}:
+        return FIELD_TYPE.DATE, None
+    if kinds == {bytes}:
+        return FIELD_TYPE.BLOB, None
+    if kinds == {str}:
+        present = [v for v in values if v is not None]
+        if all(_ISO_DATE.match(v) for v in present):
+            return FIELD_TYPE.DATE, _lenient(_parse_date)
+        if all(_ISO_DATETIME.match(v) for v in present):
+            return FIELD_TYPE.DATETIME, _lenient(_parse_datetime)
+    return FIELD_TYPE.VAR_STRING, None
+
+# ==================== ERRORS ====================
+def _mysql_error(error: sqlite3.Error) -> pymysql.err.MySQLError:
+    """The pymysql exception, with the MySQL error code, that callers already handle for error"""
+    message = str(error)
+    lowered = message.lower()
+    if isinstance(error, sqlite3.IntegrityError):
+        if 'check constraint' in lowered:
+            # schema_sqlite.sql's type checks; MySQL's strict mode raises 1366 for these
+            return pymysql.err.DataError(ER.TRUNCATED_WRONG_VALUE_FOR_FIELD, message)
+        if 'foreign key' in lowered:
+            return pymysql.err.IntegrityError(ER.NO_REFERENCED_ROW_2, message)
+        if 'not null' in lowered:
+            return pymysql.err.IntegrityError(ER.BAD_NULL_ERROR, message)
+        return pymysql.err.IntegrityError(ER.DUP_ENTRY, message)
+    if isinstance(error, sqlite3.OperationalError):
+        if 'locked' in lowered or 'busy' in lowered:
+            return pymysql.err.OperationalError(ER.LOCK_WAIT_TIMEOUT, message)
+        if 'interrupted' in lowered:
+            return pymysql.err.OperationalError(ER.QUERY_INTERRUPTED, message)
+        if 'no such table' in lowered:
+            return pymysql.err.ProgrammingError(ER.NO_SUCH_TABLE, message)
+        if 'no such column' in lowered:
+            return pymysql.err.ProgrammingError(ER.BAD_FIELD_ERROR, message)
+        if 'unable to open' in lowered or 'disk i/o' in lowered:
+            return pymysql.err.OperationalError(CR.CR_CONN_HOST_ERROR, message)
+        return pymysql.err.ProgrammingError(ER.PARSE_ERROR, message)
+    if isinstance(error, sqlite3.ProgrammingError) and 'closed' in lowered:
+        return pymysql.err.InterfaceError(CR.CR_SERVER_GONE_ERROR, message)
+    if isinstance(error, (sqlite3.ProgrammingError, sqlite3.DataError, sqlite3.NotSupportedError)):
+        return pymysql.err.ProgrammingError(ER.PARSE_ERROR, message)
+    return pymysql.err.InternalError(ER.UNKNOWN_ERROR, message)
+
+@contextmanager
+def _mysql_errors():
+    try:
+        yield
+    except sqlite3.Error as e:
+        raise _mysql_error(e) from e
+    except ValueError as e:
+        # A DATE/DECIMAL converter met a value it cannot read, e.g. text stored
+        # before the column had its CHECK constraint
+        raise pymysql.err.DataError(ER.TRUNCATED_WRONG_VALUE_FOR_FIELD,
+                                    f"Incorrect value in a typed column: {e}") from e
+
+# ==================== PYMYSQL-STYLE CONNECTION ====================
+# Statements that neither write nor manage transactions run outside any transaction
+_READ_STATEMENT = re.compile(
+    r'\s*(?:SELECT|WITH|EXPLAIN|PRAGMA|VALUES|BEGIN|COMMIT|ROLLBACK|SAVEPOINT|RELEASE|END)\b',
+    re.IGNORECASE)
+_DDL_STATEMENT = re.compile(r'\s*(?:CREATE|DROP|ALTER)\b', re.IGNORECASE)
+# Rows read ahead to type the result columns
+TYPE_SAMPLE_ROWS = 1000
+
+class Cursor:
+    """pymysql-style cursor over a sqlite3 cursor; rows are tuples, or dicts for DictCursor classes"""
+
+    def __init__(self, connection: 'Connection', as_dict: bool = False):
+        self.connection = connection
+        self.as_dict = as_dict
+        self.description = None
+        self.rowcount = -1
+        self.lastrowid = None
+        self.arraysize = 1
+        # Set by DatabaseConnection.execute_batch; SQLite binds batch rows one by one
+        self.max_stmt_length = None
+        self._cursor = None
+        self._head = deque()
+        self._converters = None
+        self._names = None
+
+    def execute(self, query: str, args=None) -> int:
+        sql = translate_sql(query, args is not None)
+        db = self.connection._prepare(sql)
+        with _mysql_errors():
+            self._cursor = db.execute(sql, _bind(args))
+            self.lastrowid = self._cursor.lastrowid
+            self.rowcount = self._cursor.rowcount
+            self._describe()
+        return self.rowcount
+
+    def executemany(self, query: str, args) -> int:
+        sql = translate_sql(query, True)
+        db = self.connection._prepare(sql)
+        with _mysql_errors():
+            self._cursor = db.executemany(sql, (_bind(row) for row in args))
+            self.lastrowid = self._cursor.lastrowid
+            self.rowcount = self._cursor.rowcount
+            self._describe()
+        return self.rowcount
+
+    def _describe(self):
+        self._head.clear()
+        self._converters = None
+        if self._cursor.description is None:
+            self.description = self._names = None
+            return
+        self._head.extend(self._cursor.fetchmany(TYPE_SAMPLE_ROWS))
+        self._names = tuple(column[0] for column in self._cursor.description)
+        columns = list(zip(*self._head)) if self._head else [()] * len(self._names)
+        types = [_column_type(list(values)) for values in columns]
+        self.description = tuple((name, code, None, None, None, None, True)
+                                 for name, (code, _) in zip(self._names, types))
+        converters = [convert for _, convert in types]
+        if any(converters):
+            self._converters = converters
+
+    def _shape(self, rows: list) -> list:
+        if self._converters:
+            converters = self._converters
+            rows = [tuple(value if convert is None else convert(value)
+                          for value, convert in zip(row, converters)) for row in rows]
+        if self.as_dict:
+            names = self._names
+            rows = [dict(zip(names, row)) for row in rows]
+        return rows
+
+    def fetchmany(self, size: int = None) -> list:
+        if self._cursor is None or self._names is None:
+            return []
+        size = self.arraysize if size is None else size
+        rows = []
+        while self._head and len(rows) < size:
+            rows.append(self._head.popleft())
+        if len(rows) < size:
+            with _mysql_errors():
+                rows += self._cursor.fetchmany(size - len(rows))
+        return self._shape(rows)
+
+    def fetchone(self):
+        rows = self.fetchmany(1)
+        return rows[0] if rows else None
+
+    def fetchall(self) -> list:
+        if self._cursor is None or self._names is None:
+            return []
+        rows = list(self._head)
+        self._head.clear()
+        with _mysql_errors():
+            rows += self._cursor.fetchall()
+        return self._shape(rows)
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def nextset(self):
+        return None
+
+    def close(self):
+        if self._cursor is not None:
+            self._cursor.close()
+            self._cursor = None
+        self._head.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+_CONNECTION_IDS = itertools.count(1)
+
+class Connection:
+    """pymysql-style connection to a SQLite database.
+
+    As with pymysql (autocommit off), the first write opens a transaction
+    that lasts until commit() or rollback(); reads outside one run without
+    it, so they never pin an old WAL snapshot. DDL outside begin() commits
+    what came before it and runs on its own, as MySQL's implicit commit does.
+    """
+
+    client_flag = 0
+
+    def __init__(self, target: str, uri: bool = False, busy_timeout: float = 5.0,
+                 pragmas: Tuple[str, ...] = (), statement_cache_size: int = 256):
+        self._settings = (target, uri, busy_timeout, pragmas, statement_cache_size)
+        self._db = None
+        self._explicit = False
+        self._thread_id = next(_CONNECTION_IDS)
+        self._open()
+
+    def _open(self):
+        target, uri, busy_timeout, pragmas, statement_cache_size = self._settings
+        with _mysql_errors():
+            db = sqlite3.connect(target, uri=uri, timeout=busy_timeout, isolation_level=None,
+                                 detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False,
+                                 cached_statements=statement_cache_size)
+            try:
+                db.create_function('mysql_match', -1, _mysql_match, deterministic=True)
+                db.create_function('mysql_format', 2, _mysql_format, deterministic=True)
+                for pragma in pragmas:
+                    db.execute(f"PRAGMA {pragma}")
+            except sqlite3.Error:
+                db.close()
+                raise
+        self._db = db
+        self._explicit = False
+
+    @property
+    def open(self) -> bool:
+        return self._db is not None
+
+    def ping(self, reconnect: bool = True):
+        if self._db is None:
+            if not reconnect:
+                raise pymysql.err.InterfaceError(CR.CR_SERVER_GONE_ERROR, "Connection is closed")
+            self._open()
+
+    def thread_id(self) -> int:
+        return self._thread_id
+
+    def _handle(self) -> sqlite3.Connection:
+        if self._db is None:
+            raise pymysql.err.InterfaceError(CR.CR_SERVER_GONE_ERROR, "Connection is closed")
+        return self._db
+
+    def _prepare(self, sql: str) -> sqlite3.Connection:
+        """The sqlite3 connection, in the transaction state sql should run in"""
+        db = self._handle()
+        if _READ_STATEMENT.match(sql):
+            return db
+        with _mysql_errors():
+            if _DDL_STATEMENT.match(sql) and not self._explicit:
+                if db.in_transaction:
+                    db.execute("COMMIT")
+            elif not db.in_transaction:
+                # Take the write lock up front: upgrading a read transaction can fail without waiting
+                db.execute("BEGIN IMMEDIATE")
+        return db
+
+    def cursor(self, cursor: type = None) -> Cursor:
+        self._handle()
+        return Cursor(self, as_dict=cursor is not None and issubclass(cursor, pymysql.cursors.DictCursorMixin))
+
+    def begin(self):
+        db = self._handle()
+        with _mysql_errors():
+            if db.in_transaction:
+                db.execute("COMMIT")
+            db.execute("BEGIN IMMEDIATE")
+        self._explicit = True
+
+    def commit(self):
+        db = self._handle()
+        self._explicit = False
+        with _mysql_errors():
+            if db.in_transaction:
+                db.execute("COMMIT")
+
+    def rollback(self):
+        db = self._handle()
+        self._explicit = False
+        with _mysql_errors():
+            if db.in_transaction:
+                db.execute("ROLLBACK")
+
+    def escape(self, value) -> str:
+        """value as a SQL literal"""
+        if value is None:
+            return 'NULL'
+        if isinstance(value, bool):
+            return str(int(value))
+        if isinstance(value, (int, float, Decimal)):
+            return str(value)
+        return "'" + str(_adapt(value)).replace("'", "''") + "'"
+
+    def interrupt(self):
+        """Abort the statement running on this connection; it fails with QUERY_INTERRUPTED"""
+        db = self._db
+        if db is not None:
+            db.interrupt()
+
+    def close(self):
+        db, self._db = self._db, None
+        if db is not None:
+            try:
+                # Refreshes the planner statistics the queries of this connection needed
+                db.execute("PRAGMA optimize")
+            except sqlite3.Error:
+                pass
+            db.close()
+
+# ==================== DATABASE CONNECTION ====================
+MEMORY_DATABASE = ':memory:'
+
+class SQLiteConnection(DatabaseConnection):
+    """DatabaseConnection for an embedded SQLite database file (or ':memory:')"""
+
+    dialect = 'sqlite'
+
+    def __init__(self, database: str = 'grant_management.db', busy_timeout: float = 5.0,
+                 cache_kib: int = 16384, mmap_bytes: int = 256 * 1024 * 1024,
+                 statement_cache_size: int = 256, **settings):
+        if settings.get('replicas'):
+            raise ValueError("SQLiteConnection does not support read replicas")
+        super().__init__(database=database, **settings)
+        self.busy_timeout = busy_timeout
+        self.statement_cache_size = statement_cache_size
+        self.pragmas = ('foreign_keys = ON', 'synchronous = NORMAL', 'temp_store = MEMORY',
+                        f"cache_size = {-int(cache_kib)}")
+        if database == MEMORY_DATABASE:
+            # Every connection of the pool must see the same in-memory database
+            self._target, self._uri = f"file:grants_{id(self)}?mode=memory&cache=shared", True
+            self.pragmas += ('read_uncommitted = ON',)
+        else:
+            self._target, self._uri = database, False
+            self.pragmas = ('journal_mode = WAL',) + self.pragmas + (f"mmap_size = {int(mmap_bytes)}",)
+        # Holds an in-memory database open while the pool has no connections
+        self._keeper = None
+        self._keeper_lock = threading.Lock()
+
+    def _new_connection(self):
+        return Connection(self._target, self._uri, self.busy_timeout, self.pragmas,
+                          self.statement_cache_size)
+
+    def _open_pool(self):
+        if self._uri:
+            with self._keeper_lock:
+                if self._keeper is None:
+                    self._keeper = self._new_connection()
+        super()._open_pool()
+
+    def connect(self):
+        success, message = super().connect()
+        return (True, f"Connected to SQLite database {self.database}") if success else (success, message)
+
+    def disconnect(self):
+        super().disconnect()
+        with self._keeper_lock:
+            if self._keeper is not None:
+                self._keeper.close()
+                self._keeper = None
+
+    def kill_queries(self, thread_ident: int) -> int:
+        """Interrupt the statements running on connections held by a thread.
+
+        Interrupted under the registry lock, so a connection the thread
+        releases meanwhile is not interrupted under its next user.
+        """
+        with self._active_lock:
+            held = list(self._active.get(thread_ident, ()))
+            for conn, _ in held:
+                conn.interrupt()
+        return len(held)
+
+    def explain(self, query: str, params: tuple = None) -> List[Dict]:
+        """EXPLAIN QUERY PLAN rows for a DML statement, bypassing the cache and query hooks"""
+        if not re.match(r'\s*\(?\s*(?:SELECT|INSERT|UPDATE|DELETE|REPLACE)\b', query, re.IGNORECASE):
+            return []
+        try:
+            with self.connection() as conn:
+                with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+                    cursor.execute("EXPLAIN QUERY PLAN " + query, params or None)
+                    return list(cursor.fetchall())
+        except pymysql.err.MySQLError as e:
+            return [{'error': str(e)}]
+
+    def max_allowed_packet(self) -> int:
+        # No packets: SQLite binds each row of a batch separately (SQLITE_MAX_LENGTH is 1 GB)
+        return 1_000_000_000
+
+    @contextmanager
+    def _script_connection(self, use_database: bool = True):
+        """Dedicated connection for running SQL scripts, kept out of the pool"""
+        if self._uri:
+            self._open_pool()
+        conn = self._new_connection()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def create_database(self) -> Tuple[bool, str]:
+        """Create the database file if it doesn't exist"""
+        try:
+            with self._script_connection():
+                pass
+            return True, f"Database {self.database} created/verified"
+        except pymysql.err.MySQLError as e:
+            return False, f"Error: {str(e)}"
+
+    def _has_baseline_tables(self) -> bool:
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = 'GRANT_TABLE'")
+                return cursor.fetchone()[0] > 0
+            finally:
+                cursor.close()
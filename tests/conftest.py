@@ -0,0 +1,39 @@
+"""Shared fixtures: every test gets its own copy of a SQLite database built once per session.
+
+The tests run on the embedded backend (sqlite_backend.py), so they need no
+MySQL server; copying the bootstrapped file keeps per-test setup to a few
+milliseconds.
+"""
+import os
+import shutil
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from db_operations import open_database  # noqa: E402
+
+SCHEMA = os.path.join(ROOT, 'schema.sql')
+
+@pytest.fixture(scope='session')
+def template_database(tmp_path_factory):
+    """Path of a database with the schema, migrations and sample data installed"""
+    path = str(tmp_path_factory.mktemp('template') / 'grant_management.db')
+    db = open_database('sqlite', database=path)
+    success, message = db.bootstrap(SCHEMA)
+    db.disconnect()
+    assert success, message
+    return path
+
+@pytest.fixture
+def db(template_database, tmp_path):
+    """A connected SQLiteConnection on a private copy of the template database"""
+    path = str(tmp_path / 'grant_management.db')
+    shutil.copyfile(template_database, path)
+    db = open_database('sqlite', database=path)
+    success, message = db.connect()
+    assert success, message
+    yield db
+    db.disconnect()
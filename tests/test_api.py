@@ -0,0 +1,78 @@
+"""HTTP API status codes, paging and ETags, driven through the WSGI callable"""
+import io
+import json
+import sys
+
+import pytest
+
+from api import Api
+from db_operations import GrantTopicOperations
+
+@pytest.fixture
+def app(db):
+    return Api(db)
+
+def call(app, method, path, query='', body=None, headers=None):
+    """(status code, headers, body bytes) of one request"""
+    data = json.dumps(body).encode() if body is not None else b''
+    environ = {'REQUEST_METHOD': method, 'PATH_INFO': path, 'QUERY_STRING': query,
+               'CONTENT_LENGTH': str(len(data)), 'wsgi.input': io.BytesIO(data),
+               'wsgi.errors': sys.stderr, **(headers or {})}
+    response = {}
+
+    def start_response(status, response_headers):
+        response['status'] = int(status.split()[0])
+        response['headers'] = dict(response_headers)
+    body = b''.join(app(environ, start_response))
+    return response['status'], response['headers'], body
+
+@pytest.mark.parametrize('limit', ['0', '-5', 'ten', '1.5'])
+def test_bad_limit_is_a_400(app, limit):
+    status, _, body = call(app, 'GET', '/grant', f'limit={limit}')
+    assert status == 400
+    assert json.loads(body)['ok'] is False
+
+def test_cursor_pages_through_every_row(app, db):
+    ids, cursor = [], None
+    while True:
+        status, _, body = call(app, 'GET', '/grant', 'limit=2' + (f'&cursor={cursor}' if cursor else ''))
+        assert status == 200
+        page = json.loads(body)
+        ids += [row['grant_id'] for row in page['rows']]
+        cursor = page['next']
+        if cursor is None:
+            break
+    status, _, body = call(app, 'GET', '/grant', 'limit=500')
+    assert ids == [row['grant_id'] for row in json.loads(body)['rows']]
+
+@pytest.mark.parametrize('method, path, query, status', [
+    ('GET', '/nope', '', 404),
+    ('GET', '/grant', 'bogus=1', 400),
+    ('GET', '/grant', 'cursor=%%%', 400),
+    ('GET', '/grant', 'order_by=purpose', 400),
+    ('GET', '/grant/abc', '', 400),
+    ('GET', '/grant/999999', '', 404),
+    ('PUT', '/grant_topic/1,1', '', 405),
+    ('PATCH', '/grant/1', '', 405),
+])
+def test_error_statuses(app, method, path, query, status):
+    assert call(app, method, path, query, body={} if method != 'GET' else None)[0] == status
+
+def test_create_then_read(app):
+    status, _, body = call(app, 'POST', '/region', body={'name': 'Antarctica'})
+    assert status == 201
+    status, _, body = call(app, 'GET', '/region', 'limit=500')
+    assert 'Antarctica' in [row['name'] for row in json.loads(body)['rows']]
+
+def test_etag_follows_tables_a_filter_reads(app, db):
+    status, headers, _ = call(app, 'GET', '/grant', 'topic_ids=1')
+    etag = headers['ETag']
+    assert call(app, 'GET', '/grant', 'topic_ids=1', headers={'HTTP_IF_NONE_MATCH': etag})[0] == 304
+    linked = {row['grant_id'] for row in
+              db.fetch_query("SELECT grant_id FROM GRANT_TOPIC WHERE topic_id = 1", use_cache=False)[1]}
+    unlinked = [row['grant_id'] for row in db.fetch_query("SELECT grant_id FROM GRANT_TABLE")[1]
+                if row['grant_id'] not in linked]
+    assert GrantTopicOperations(db).create(unlinked[0], 1)[0]
+    status, headers, body = call(app, 'GET', '/grant', 'topic_ids=1', headers={'HTTP_IF_NONE_MATCH': etag})
+    assert status == 200 and headers['ETag'] != etag
+    assert len(json.loads(body)['rows']) == len(linked) + 1
@@ -0,0 +1,47 @@
+"""AsyncDatabase timeouts: the facade default, per-call overrides, None for no limit, and kills"""
+import asyncio
+import time
+
+import pytest
+
+from async_operations import AsyncDatabase
+
+# Counts far enough that it only ends by being interrupted
+ENDLESS_QUERY = ("WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 1000000000) "
+                 "SELECT COUNT(*) AS n FROM c")
+
+@pytest.fixture
+def adb(db):
+    adb = AsyncDatabase(db, max_workers=1, timeout=0.2)
+    yield adb
+    adb.close()
+
+def test_default_timeout_applies(adb):
+    with pytest.raises(asyncio.TimeoutError):
+        adb.run_sync(adb.run(time.sleep, 1))
+
+def test_none_means_no_limit(adb):
+    assert adb.run_sync(adb.run(lambda: time.sleep(0.4) or 'done', timeout=None)) == 'done'
+    grants = adb.grant.with_timeout(None)
+    assert not adb.run_sync(grants.read_all()).empty
+
+def test_per_call_timeout_overrides_default(adb):
+    assert adb.run_sync(adb.run(lambda: time.sleep(0.3) or 'done', timeout=1)) == 'done'
+
+def test_timed_out_query_is_killed_and_worker_reused(adb, db):
+    async def scenario():
+        return await asyncio.gather(
+            adb.run(db.fetch_query, ENDLESS_QUERY, use_cache=False),
+            adb.run(db.fetch_query, "SELECT COUNT(*) AS n FROM GRANT_TABLE", use_cache=False,
+                    timeout=None),
+            return_exceptions=True)
+    started = time.perf_counter()
+    slow, fast = adb.run_sync(scenario())
+    assert isinstance(slow, asyncio.TimeoutError)
+    # Only the timed-out statement was interrupted, not the next call on the same worker
+    assert fast == (True, [{'n': 6}])
+    assert time.perf_counter() - started < 5
+
+def test_gather_returns_results_in_order(adb):
+    regions, divisions = adb.run_sync(adb.gather(adb.region.read_all(), adb.division.read_all()))
+    assert 'region_id' in regions and 'division_id' in divisions
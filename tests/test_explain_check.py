@@ -0,0 +1,20 @@
+"""explain_check.py against the configured MySQL database; skipped when there is none to reach"""
+import pytest
+
+import explain_check
+from db_operations import configured_database
+
+@pytest.fixture(scope='module')
+def mysql_db():
+    db = configured_database(pool_min_size=1, pool_max_size=1)
+    if db.dialect != 'mysql':
+        pytest.skip(f"explain_check reads MySQL plans; the configured backend is {db.dialect}")
+    success, message = db.connect()
+    if not success:
+        pytest.skip(f"No MySQL database reachable: {message}")
+    yield db
+    db.disconnect()
+
+def test_every_read_path_is_indexed(mysql_db):
+    summary = explain_check.run(mysql_db)
+    assert summary['failed'] == 0, summary
@@ -0,0 +1,38 @@
+"""Keyset pagination: bounds, NULL sort keys and filtered pages"""
+import pytest
+
+from db_operations import GrantOperations, MilestoneOperations
+
+def read_all_pages(source, key, limit, **kwargs):
+    """key column values of every row, following next keys until the last page"""
+    keys, after_key = [], None
+    while True:
+        page, after_key = source.read_page(after_key=after_key, limit=limit, **kwargs)
+        keys += list(page[key])
+        if after_key is None:
+            return keys
+
+@pytest.mark.parametrize('limit', [0, -5])
+def test_read_page_rejects_limit_below_one(db, limit):
+    with pytest.raises(ValueError):
+        GrantOperations(db).read_page(limit=limit)
+
+def test_read_page_last_page_has_no_next_key(db):
+    grants = GrantOperations(db)
+    total = len(grants.read_all())
+    page, next_key = grants.read_page(limit=total)
+    assert len(page) == total and next_key is None
+    page, next_key = grants.read_page(limit=total - 1)
+    assert len(page) == total - 1 and next_key is not None
+
+@pytest.mark.parametrize('descending', [False, True])
+@pytest.mark.parametrize('limit', [1, 2, 4])
+def test_pages_cover_every_row_once_across_null_sort_keys(db, limit, descending):
+    db.execute_query("UPDATE TOTAL_MILESTONE SET completion = NULL WHERE milestone_id IN (1, 2, 5)")
+    milestones = MilestoneOperations(db)
+    keys = read_all_pages(milestones, 'milestone_id', limit, order_by='completion', descending=descending)
+    assert sorted(keys) == sorted(milestones.read_all()['milestone_id'])
+
+def test_filtered_pages_match_filtered_fetch(db):
+    query = GrantOperations(db).filter(topic_ids=[1]).order_by('amount', True)
+    assert read_all_pages(query, 'grant_id', 1) == list(query.fetch()['grant_id'])
@@ -0,0 +1,97 @@
+"""Maintained rollups: the dashboard summary and funding totals match a fresh aggregation after writes"""
+from datetime import date, timedelta
+
+from db_operations import GrantOperations, MilestoneOperations, RollupOperations, StatsOperations
+
+def scanned_summary(db):
+    """The summary figures the rollups replace, computed by scanning the base tables"""
+    success, rows = db.fetch_query(
+        """SELECT (SELECT COUNT(*) FROM GRANT_TABLE) AS total_grants,
+                  (SELECT COUNT(*) FROM TOTAL_MILESTONE) AS total_milestones,
+                  (SELECT COUNT(*) FROM GRANT_TABLE
+                   WHERE start_date <= CURDATE() AND close_date >= CURDATE()) AS active_grants,
+                  (SELECT COALESCE(AVG(completion), 0) FROM TOTAL_MILESTONE) AS avg_completion""",
+        use_cache=False)
+    assert success, rows
+    return rows[0]
+
+def assert_summary_consistent(db):
+    summary = StatsOperations(db).summary()
+    expected = scanned_summary(db)
+    for figure in ('total_grants', 'total_milestones', 'active_grants'):
+        assert summary[figure] == expected[figure], figure
+    assert round(float(summary['avg_completion']), 4) == round(float(expected['avg_completion']), 4)
+    assert RollupOperations(db).verify() == []
+
+def grant(start, close, amount=1000):
+    return {'purpose': 'Rollup test', 'date_awarded': start, 'duration': 12, 'close_date': close,
+            'start_date': start, 'amount': amount, 'region_id': 1, 'division_id': 1}
+
+def test_sample_data_is_consistent(db):
+    assert_summary_consistent(db)
+
+def test_grant_writes_keep_active_count(db):
+    today = date.today()
+    grants = GrantOperations(db)
+    # Active today, closing today, starting tomorrow, and closed yesterday
+    for start, close in ((today - timedelta(days=30), today + timedelta(days=30)),
+                         (today - timedelta(days=30), today),
+                         (today + timedelta(days=1), today + timedelta(days=60)),
+                         (today - timedelta(days=60), today - timedelta(days=1))):
+        assert grants.create(*grant(start, close).values())[0]
+    assert_summary_consistent(db)
+
+    # Closing before it starts is never active
+    success, grant_id = grants.create_full(grant(today, today - timedelta(days=1)))
+    assert success, grant_id
+    assert_summary_consistent(db)
+
+    # Moving a grant out of today's window and deleting another
+    values = grant(today - timedelta(days=90), today - timedelta(days=10))
+    assert grants.update(grant_id, *values.values())[0]
+    assert grants.update(1, *values.values())[0]
+    assert grants.delete(2)[0]
+    assert_summary_consistent(db)
+
+def test_milestone_writes_keep_totals(db):
+    milestones = MilestoneOperations(db)
+    assert milestones.create(1, 'Kickoff', date.today(), 10)[0]
+    assert milestones.create(1, 'Report', date.today(), None)[0]
+    assert_summary_consistent(db)
+    assert milestones.update(1, 2, 'Moved and finished', date.today(), 100)[0]
+    assert milestones.delete(2)[0]
+    assert_summary_consistent(db)
+
+def test_grant_with_milestones_created_and_deleted(db):
+    grants = GrantOperations(db)
+    today = date.today()
+    success, grant_id = grants.create_full(
+        grant(today, today + timedelta(days=365)),
+        milestones=[{'milestone_desc': 'First', 'due_date': today, 'completion': 40},
+                    {'milestone_desc': 'Second', 'due_date': today, 'completion': 90}],
+        topics=[1])
+    assert success, grant_id
+    assert_summary_consistent(db)
+    # The delete cascades to the grant's milestones
+    assert grants.delete(grant_id)[0]
+    assert_summary_consistent(db)
+
+def test_bulk_loads_rebuild_the_rollups(db):
+    today = date.today()
+    report = GrantOperations(db).bulk_create(
+        [grant(today - timedelta(days=i), today + timedelta(days=i)) for i in range(5)])
+    assert report['succeeded'] == 5
+    report = MilestoneOperations(db).bulk_create(
+        [{'grant_id': 1, 'milestone_desc': f'Bulk {i}', 'due_date': today, 'completion': i * 10}
+         for i in range(5)])
+    assert report['succeeded'] == 5
+    assert_summary_consistent(db)
+
+def test_rebuild_repairs_drift(db):
+    db.execute_query("DELETE FROM ROLLUP_ACTIVITY")
+    db.execute_query("UPDATE ROLLUP_MILESTONE SET milestone_count = milestone_count + 7")
+    rollups = RollupOperations(db)
+    assert any(problem.startswith('ROLLUP_MILESTONE') for problem in rollups.verify())
+    success, message = rollups.rebuild()
+    assert success, message
+    assert_summary_consistent(db)
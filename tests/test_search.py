@@ -0,0 +1,23 @@
+"""Type-ahead and full-text search"""
+from db_operations import GrantOperations, GranteeOperations, MilestoneOperations, SearchOperations
+
+def test_fulltext_labels_match_word_prefixes(db):
+    grants = GrantOperations(db)
+    ids = [grant_id for grant_id, _ in grants.search_options('resea')]
+    assert ids and all('research' in grants.label_for(i).lower() for i in ids)
+    # Words of the term may start any word of the label, in any order
+    assert grants.search_options('grant resea') == grants.search_options('resea grant')
+
+def test_fulltext_labels_match_ids_and_ignore_short_words(db):
+    assert [i for i, _ in GrantOperations(db).search_options('2')] == [2]
+    assert MilestoneOperations(db).search_options('a') == []
+
+def test_other_labels_match_by_prefix(db):
+    grantees = GranteeOperations(db)
+    name = grantees.read_all()['name'].iloc[0]
+    assert any(label.startswith(name[:3]) for _, label in grantees.search_options(name[:3]))
+
+def test_search_ranks_across_entities(db):
+    hits = SearchOperations(db).search('research')
+    assert hits and {'grant'} <= {hit['entity'] for hit in hits}
+    assert [hit['score'] for hit in hits] == sorted((hit['score'] for hit in hits), reverse=True)
@@ -0,0 +1,96 @@
+"""The SQLite backend behaves like MySQL behind the Operations API: types, error codes and bookkeeping"""
+from datetime import date
+
+import pymysql
+import pytest
+
+from db_operations import (GrantBeneficiaryOperations, GrantOperations, GrantTopicOperations,
+                           MilestoneOperations, RollupOperations, list_migrations)
+
+GRANT = ('Parity test grant', date(2025, 1, 10), 12, date(2026, 1, 10), date(2025, 2, 1), 1234.5, 1, 2)
+
+def new_grant_id(grants):
+    return int(grants.read_all()['grant_id'].max())
+
+def test_grant_round_trip_keeps_types(db):
+    grants = GrantOperations(db)
+    assert grants.create(*GRANT) == (True, "Query executed successfully")
+    grant_id = new_grant_id(grants)
+    grant = grants.read_by_id(grant_id)
+    assert (grant.purpose, grant.date_awarded, grant.close_date, grant.amount) == (
+        'Parity test grant', date(2025, 1, 10), date(2026, 1, 10), 1234.5)
+
+    assert grants.update(grant_id, 'Renamed', *GRANT[1:])[0]
+    assert grants.read_by_id(grant_id).purpose == 'Renamed'
+    assert grants.delete(grant_id)[0]
+    assert grants.read_by_id(grant_id) is None
+
+@pytest.mark.parametrize('write, code', [
+    # Unknown grantee: foreign key
+    (lambda db: GrantBeneficiaryOperations(db).create(9999, 'Nowhere'), 1452),
+    # Existing link: primary key
+    (lambda db: GrantTopicOperations(db).create(1, 1), 1062),
+    # Text in a DATE column: strict mode
+    (lambda db: GrantOperations(db).create('Bad date', 'soon', 12, '2026-01-01', '2025-01-01', 10), 1366),
+    # Text in a DECIMAL column
+    (lambda db: GrantOperations(db).create('Bad amount', '2025-01-01', 12, '2026-01-01', '2025-01-01',
+                                           'lots'), 1366),
+])
+def test_rejected_writes_report_mysql_error_codes(db, write, code):
+    success, message = write(db)
+    assert not success
+    assert message.startswith(f"Error: ({code},"), message
+
+def test_failed_transaction_writes_nothing(db):
+    grants = GrantOperations(db)
+    before = grants.count()
+    with pytest.raises(pymysql.err.IntegrityError):
+        with db.transaction():
+            grants.create(*GRANT)
+            GrantTopicOperations(db).create(1, 1)
+    assert grants.count() == before
+
+def test_rollups_follow_topic_links(db):
+    links = GrantTopicOperations(db)
+    assert links.create(1, 2)[0]
+    assert RollupOperations(db).verify() == []
+    assert links.delete(1, 2)[0]
+    assert links.delete(2, 2)[0]
+    assert RollupOperations(db).verify() == []
+
+def test_rollup_averages_are_not_truncated(db):
+    # A 13-month grant makes the averages fractional, which integer division would truncate
+    assert GrantOperations(db).create(*GRANT[:2], 13, *GRANT[3:6], 1, 2)[0]
+    success, rows = db.fetch_query("SELECT AVG(duration) AS avg_duration FROM GRANT_TABLE", use_cache=False)
+    assert success, rows
+    assert RollupOperations(db).totals()['avg_duration'] == pytest.approx(float(rows[0]['avg_duration']))
+    by_region = RollupOperations(db).by_region()
+    success, rows = db.fetch_query("SELECT region_id, AVG(duration) AS avg_duration FROM GRANT_TABLE "
+                                   "WHERE region_id IS NOT NULL GROUP BY region_id", use_cache=False)
+    expected = {row['region_id']: float(row['avg_duration']) for row in rows}
+    assert {row.region_id: row.avg_duration for row in by_region.itertuples()} == pytest.approx(expected)
+
+def test_changes_since_reports_updates_and_deletes(db):
+    milestones = MilestoneOperations(db)
+    token = milestones.change_token()
+    assert milestones.update(1, 1, 'Changed', date(2025, 6, 1), 75)[0]
+    assert milestones.delete(2)[0]
+    changes = milestones.changes_since(token)
+    assert not changes['expired']
+    assert list(changes['changed']['milestone_id']) == [1]
+    assert changes['deleted'] == [(2,)]
+    # Nothing has changed since the returned token
+    later = milestones.changes_since(changes['token'])
+    assert later['changed'].empty and later['deleted'] == []
+
+def test_grant_delete_cascades_are_tracked(db):
+    milestones = MilestoneOperations(db)
+    token = milestones.change_token()
+    owned = sorted(milestones.read_by_grant(1)['milestone_id'])
+    assert GrantOperations(db).delete(1)[0]
+    assert sorted(key for key, in milestones.changes_since(token)['deleted']) == owned
+
+def test_every_migration_is_applied(db):
+    applied, pending = db.migration_status()
+    assert pending == []
+    assert [version for version, _ in applied] == [version for version, _, _ in list_migrations()]